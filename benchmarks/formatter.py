@@ -0,0 +1,90 @@
+"""
+Benchmark Formatter.format() with some typical module format strings.
+
+If a git revision is given then the formatter from that revision is also
+benchmarked so that the two can be compared.
+
+    python benchmarks/formatter.py [REVISION]
+"""
+from __future__ import print_function
+
+import os
+import sys
+
+from subprocess import check_output
+from timeit import repeat
+from types import ModuleType
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from py3status.formatter import Formatter  # noqa e402
+
+NUMBER = 2000
+
+TESTS = [
+    ('{volume}%', {'volume': 55}),
+    ('{name} {value:.2f}%', {'name': 'cpu', 'value': 12.3456}),
+    ('[[{artist} - ]{title}]|{file}', {'title': 'Song', 'file': 'song.mp3'}),
+    (
+        r'[\?if=is_up&color=good UP]|[\?color=bad DOWN] {ip}',
+        {'is_up': True, 'ip': '10.0.0.1'},
+    ),
+    (
+        r'[\?color=cpu CPU: {cpu:.2f}%], '
+        r'[\?color=mem Mem: {used:.2f}/{total:.2f} GB ({percent:.2f}%)]',
+        {'cpu': 3.2, 'used': 2.1, 'total': 16, 'percent': 13.1},
+    ),
+    (
+        r'\?color=bad [\?not_zero {count} new]|\?show no mail',
+        {'count': 0},
+    ),
+]
+
+
+class Module:
+    color_cpu = '#00FF00'
+    color_good = '#00FF00'
+
+    class py3:
+        COLOR_BAD = '#FF0000'
+        COLOR_GOOD = '#00FF00'
+
+
+def load_formatter(revision):
+    """
+    Load the Formatter class from the given git revision.
+    """
+    source = check_output(
+        ['git', 'show', '{}:py3status/formatter.py'.format(revision)], cwd=ROOT
+    )
+    module = ModuleType('formatter_{}'.format(revision))
+    exec(compile(source, 'formatter.py', 'exec'), module.__dict__)
+    return module.Formatter
+
+
+def bench(formatter_class):
+    formatter = formatter_class()
+    module = Module()
+    results = []
+    for format_string, params in TESTS:
+        formatter.format(format_string, module, params)
+        best = min(repeat(
+            lambda: formatter.format(format_string, module, params),
+            number=NUMBER, repeat=5
+        ))
+        results.append(best * 1000000.0 / NUMBER)
+    return results
+
+
+if __name__ == '__main__':
+    columns = [('current', Formatter)]
+    if len(sys.argv) > 1:
+        columns.insert(0, (sys.argv[1], load_formatter(sys.argv[1])))
+
+    results = [bench(formatter) for name, formatter in columns]
+    print('time per format (us)')
+    print(''.join(['{:>12}'.format(name) for name, formatter in columns]))
+    for index, (format_string, params) in enumerate(TESTS):
+        row = ['{:>12.2f}'.format(result[index]) for result in results]
+        print('{}  {}'.format(''.join(row), format_string))
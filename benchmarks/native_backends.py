@@ -0,0 +1,60 @@
+"""
+Benchmark the diskdata and wifi modules reading the kernel directly against
+running df and iw.
+
+Prints the time per update and the number of processes forked for each.  The
+wifi comparison needs a wireless device with wireless extensions and iw.
+
+    python benchmarks/native_backends.py
+"""
+from __future__ import print_function
+
+import os
+import sys
+
+from timeit import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from py3status.modules import diskdata, wifi  # noqa e402
+from py3status.py3 import Py3  # noqa e402
+
+UPDATES = 100
+
+
+def forks():
+    return sum(x['calls'] for x in Py3._executor.stats().values())
+
+
+def bench(name, function):
+    before = forks()
+    try:
+        elapsed = timeit(function, number=UPDATES)
+    except (IOError, OSError, Py3.CommandError) as e:
+        print('{:>20} failed: {}'.format(name, e))
+        return
+    print('{:>20} {:>12.3f} {:>8}'.format(
+        name, elapsed * 1000 / UPDATES, forks() - before
+    ))
+
+
+def get_module(module):
+    instance = module.Py3status()
+    instance.py3 = Py3()
+    return instance
+
+
+if __name__ == '__main__':
+    print('{:>20} {:>12} {:>8}'.format('', 'update (ms)', 'forks'))
+
+    disk = get_module(diskdata)
+    bench('diskdata native', lambda: disk._get_free_space_native(None))
+    bench('diskdata df', lambda: disk._get_free_space_df(None))
+
+    wireless = get_module(wifi)
+    wireless.post_config_hook()
+    bench('wifi native', lambda: wireless._get_native_data(True))
+    if wireless.py3.check_commands(['iw', '/sbin/iw']):
+        bench('wifi iw', lambda: wireless._get_iw_data(True))
+    else:
+        print('{:>20} skipped: iw is not installed'.format('wifi iw'))
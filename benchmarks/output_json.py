@@ -0,0 +1,73 @@
+"""
+Benchmark creating the json for a module with a large composite output when
+a single item of it changes.
+
+Compares json encoding every item with the JsonCache.
+
+    python benchmarks/output_json.py
+"""
+from __future__ import print_function
+
+import os
+import sys
+
+from json import dumps, loads
+from random import randint, seed
+from timeit import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from py3status.output import JsonCache  # noqa e402
+
+UPDATES = 500
+
+
+def make_output(items, changed=None, value=0):
+    # a new output is created each update as modules do
+    output = []
+    for index in range(items):
+        output.append({
+            'full_text': 'item {} value {}'.format(
+                index, value if index == changed else 0
+            ),
+            'name': 'group',
+            'instance': 'first {}'.format(index),
+            'color': '#00FF00',
+            'separator': False,
+            'separator_block_width': 0,
+        })
+    return output
+
+
+def bench(items):
+    seed(items)
+    updates = [
+        make_output(items, randint(0, items - 1), x) for x in range(UPDATES)
+    ]
+
+    def plain():
+        for output in updates:
+            ','.join([dumps(x) for x in output])
+
+    def cached():
+        cache = JsonCache()
+        for output in updates:
+            cache.dumps(output)
+
+    # check both give the same result
+    cache = JsonCache()
+    for output in updates:
+        assert loads('[{}]'.format(cache.dumps(output))) == output
+
+    return timeit(plain, number=5), timeit(cached, number=5)
+
+
+if __name__ == '__main__':
+    print('{:>8} {:>18} {:>18}'.format(
+        'items', 'json.dumps (us)', 'JsonCache (us)'))
+    for items in [1, 10, 50, 200]:
+        plain, cached = bench(items)
+        # time per update in microseconds
+        per_update = 1000000.0 / (5 * UPDATES)
+        print('{:>8} {:>18.2f} {:>18.2f}'.format(
+            items, plain * per_update, cached * per_update))
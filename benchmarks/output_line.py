@@ -0,0 +1,82 @@
+"""
+Benchmark building the i3bar output line when a single module updates.
+
+Compares rebuilding the whole line each update with the OutputLine used for
+most bars and the OutputAssembler used for bars of at least
+OutputAssembler.MIN_SIZE blocks.
+
+    python benchmarks/output_line.py
+"""
+from __future__ import print_function
+
+import os
+import sys
+
+from json import dumps
+from random import randint, seed
+from timeit import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from py3status.output import OutputAssembler, OutputLine  # noqa e402
+
+UPDATES = 2000
+
+
+def make_block(index, value):
+    return dumps({
+        'full_text': 'module {} value {}'.format(index, value),
+        'name': 'module',
+        'instance': str(index),
+        'color': '#00FF00',
+    })
+
+
+def bench(blocks):
+    seed(blocks)
+    updates = [
+        (randint(0, blocks - 1), make_block(x, x)) for x in range(UPDATES)
+    ]
+
+    def full_rebuild():
+        output = [make_block(x, 0) for x in range(blocks)]
+        for index, out in updates:
+            output[index] = out
+            ','.join([x for x in output if x])
+
+    def build(output_class):
+        output = output_class(blocks)
+        for x in range(blocks):
+            output.set(x, make_block(x, 0))
+        output.get_line()
+        for index, out in updates:
+            output.set(index, out)
+            output.get_line()
+
+    # check both give the same result
+    result = [make_block(x, 0) for x in range(blocks)]
+    output = OutputAssembler(blocks)
+    for x in range(blocks):
+        output.set(x, result[x])
+    for index, out in updates:
+        result[index] = out
+        output.set(index, out)
+    assert ','.join(result) == output.get_line()
+
+    return [
+        timeit(function, number=5) for function in [
+            full_rebuild,
+            lambda: build(OutputLine),
+            lambda: build(OutputAssembler),
+        ]
+    ]
+
+
+if __name__ == '__main__':
+    print('{:>8} {:>18} {:>18} {:>18}'.format(
+        'blocks', 'full rebuild (us)', 'line (us)', 'assembler (us)'))
+    for blocks in [10, 50, 100, 150, 200]:
+        # time per update in microseconds
+        per_update = 1000000.0 / (5 * UPDATES)
+        print('{:>8} {:>18.2f} {:>18.2f} {:>18.2f}'.format(
+            blocks, *[x * per_update for x in bench(blocks)]))
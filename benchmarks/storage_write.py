@@ -0,0 +1,71 @@
+"""
+Benchmark saving a single changed storage key as the number of modules with
+stored data grows.
+
+Compares the pickle backend, which rewrites everything, with the sqlite
+backend, which only writes the changed row.
+
+    python benchmarks/storage_write.py
+"""
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+
+from timeit import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from py3status.storage import Storage  # noqa e402
+
+WRITES = 50
+
+
+class MockPy3statusWrapper:
+
+    def __init__(self, path, backend):
+        self.config = {
+            'py3_config': {
+                'py3status': {'storage': path, 'storage_backend': backend}
+            }
+        }
+
+    def log(self, *arg, **kw):
+        pass
+
+
+def bench(modules, backend):
+    directory = tempfile.mkdtemp()
+    try:
+        storage = Storage()
+        storage.init(
+            MockPy3statusWrapper(os.path.join(directory, 'bench.data'), backend),
+            False
+        )
+        storage.set_write_delay(0, 0)
+        for index in range(modules):
+            name = 'module {}'.format(index)
+            for key in range(5):
+                storage.storage_set(name, 'key {}'.format(key), 'x' * 100)
+
+        values = iter(range(WRITES * 2))
+
+        def write():
+            storage.storage_set('module 0', 'key 0', next(values))
+
+        return timeit(write, number=WRITES)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    print('{:>8} {:>16} {:>16}'.format('modules', 'pickle (ms)', 'sqlite (ms)'))
+    for modules in [1, 10, 100, 1000]:
+        # time per write in milliseconds
+        print('{:>8} {:>16.3f} {:>16.3f}'.format(
+            modules,
+            bench(modules, 'pickle') * 1000 / WRITES,
+            bench(modules, 'sqlite') * 1000 / WRITES,
+        ))
@@ -0,0 +1,78 @@
+from functools import partial
+from threading import Lock, Thread
+
+try:
+    import asyncio
+except ImportError:
+    # python 2
+    asyncio = None
+
+
+def is_coroutine_function(function):
+    """
+    Is the function an `async def` function.
+    """
+    return asyncio is not None and asyncio.iscoroutinefunction(function)
+
+
+def is_coroutine(item):
+    return asyncio is not None and asyncio.iscoroutine(item)
+
+
+class AsyncLoop:
+    """
+    Runs the coroutines of all modules on a single asyncio event loop in its
+    own thread.  The loop is only started when it is first needed.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.loop = None
+        self.thread = None
+        self.started = 0
+        self.finished = 0
+
+    def get_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = Thread(target=self.loop.run_forever)
+                self.thread.daemon = True
+                self.thread.start()
+            return self.loop
+
+    def run(self, coroutine, callback=None):
+        """
+        Schedule the coroutine on the loop and return a Future for its result.
+        If given, callback is called with the Future once it is done.
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.get_loop())
+        with self.lock:
+            self.started += 1
+        future.add_done_callback(self.done)
+        if callback:
+            future.add_done_callback(callback)
+        return future
+
+    def done(self, future):
+        with self.lock:
+            self.finished += 1
+
+    def run_in_executor(self, function, *args, **kw):
+        """
+        Return an awaitable for the result of calling the blocking function in
+        the loop's thread pool.  This must be called from the loop.
+        """
+        return self.get_loop().run_in_executor(None, partial(function, *args, **kw))
+
+    def stop(self):
+        with self.lock:
+            if self.loop is not None:
+                self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'running': self.started - self.finished,
+                'started': self.started,
+            }
@@ -1,12 +1,19 @@
+from __future__ import print_function
+
 import argparse
 import glob
 import json
 import os
 import socket
+import sys
 import threading
 
+from py3status.profiling import format_stats
+
 SERVER_ADDRESS = '/tmp/py3status_uds'
 MAX_SIZE = 1024
+# how long py3-cmd waits for a reply
+REPLY_TIMEOUT = 5
 
 REFRESH_EPILOG = """
 examples:
@@ -52,6 +59,18 @@ examples:
         # more options. however, there are no modules that
         # uses the aforementioned options.
 """
+STATS_EPILOG = """
+examples:
+    stats:
+        # show the stats for all modules
+        py3-cmd stats
+
+        # show the stats for some modules
+        py3-cmd stats sysdata "weather_yahoo chicago"
+
+        # show the stats as json
+        py3-cmd stats --json
+"""
 # EXEC_EPILOG = ''
 INFORMATION = [
     ('V', 'version', 'show version number and exit'),
@@ -60,6 +79,7 @@ INFORMATION = [
 SUBPARSERS = [
     ('click', 'click modules', '+'),
     ('refresh', 'refresh modules', '*'),
+    ('stats', 'show module execution statistics', '*'),
     # ('exec', 'execute methods', '+'),
 ]
 CLICK_OPTIONS = [
@@ -75,6 +95,9 @@ CLICK_OPTIONS = [
 REFRESH_OPTIONS = [
     ('all', 'refresh all modules')
 ]
+STATS_OPTIONS = [
+    ('json', 'output the statistics as json')
+]
 
 
 class CommandRunner:
@@ -151,9 +174,21 @@ class CommandRunner:
             # trigger the event
             self.py3_wrapper.events_thread.dispatch_event(event)
 
+    def stats(self, data):
+        """
+        return the execution statistics for the module(s)
+        """
+        modules = data.get('module')
+        if modules:
+            modules = self.find_modules(modules)
+        else:
+            modules = None
+        return self.py3_wrapper.get_stats(modules)
+
     def run_command(self, data):
         """
-        check the given command and send to the correct dispatcher
+        check the given command and send to the correct dispatcher.  Any
+        result is to be sent back to py3-cmd.
         """
         command = data.get('command')
         if self.debug:
@@ -164,6 +199,8 @@ class CommandRunner:
             self.py3_wrapper.refresh_modules()
         elif command == 'click':
             self.click(data)
+        elif command == 'stats':
+            return self.stats(data)
 
 
 class CommandServer(threading.Thread):
@@ -232,7 +269,11 @@ class CommandServer(threading.Thread):
                         data = json.loads(data.decode('utf-8'))
                         if self.debug:
                             self.py3_wrapper.log(u'received %s' % data)
-                        self.command_runner.run_command(data)
+                        result = self.command_runner.run_command(data)
+                        if result is not None:
+                            connection.sendall(
+                                json.dumps(result).encode('utf-8')
+                            )
                 finally:
                     # Clean up the connection
                     connection.close()
@@ -271,10 +312,12 @@ def command_parser():
         parser.add_argument(short, arg, action='store_true', help=msg)
 
     # make subparsers // ALIAS_DEPRECATION: remove metavar later
-    subparsers = parser.add_subparsers(dest='command', metavar='{click,refresh}')
+    subparsers = parser.add_subparsers(
+        dest='command', metavar='{click,refresh,stats}'
+    )
     sps = {}
 
-    # subparsers: add refresh, click
+    # subparsers: add click, refresh, stats
     for name, msg, nargs in SUBPARSERS:
         sps[name] = subparsers.add_parser(
             name,
@@ -311,6 +354,12 @@ def command_parser():
         arg = '--{}'.format(name)
         sp.add_argument(arg, action='store_true', help=msg)
 
+    # stats subparser: add json
+    sp = sps['stats']
+    for name, msg in STATS_OPTIONS:
+        arg = '--{}'.format(name)
+        sp.add_argument(arg, action='store_true', help=msg)
+
     # parse args, post-processing
     options = parser.parse_args()
 
@@ -418,6 +467,40 @@ def send_command():
             # Send data
             verbose('sending')
             sock.sendall(msg)
+            if options.command == 'stats':
+                show_stats(sock, uds, options)
         finally:
             verbose('closing socket')
             sock.close()
+
+
+def read_reply(sock):
+    """
+    Read the json reply to a command.
+    """
+    # let py3status know that we have sent everything
+    sock.shutdown(socket.SHUT_WR)
+    sock.settimeout(REPLY_TIMEOUT)
+    data = []
+    while True:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data.append(chunk)
+    return json.loads(b''.join(data).decode('utf-8'))
+
+
+def show_stats(sock, uds, options):
+    """
+    Print the stats sent by a py3status instance.
+    """
+    try:
+        stats = read_reply(sock)
+    except (socket.error, ValueError) as e:
+        print('{}: no stats received ({})'.format(uds, e), file=sys.stderr)
+        return
+    if options.json:
+        print(json.dumps(stats, indent=2, sort_keys=True))
+    else:
+        print('py3status instance {}'.format(uds.split('.')[-1]))
+        print(format_stats(stats))
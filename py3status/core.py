@@ -6,12 +6,14 @@ import sys
 import time
 
 from collections import deque
+from heapq import heapify, heappop, heappush
+from itertools import count
 from json import dumps
 from platform import python_version
 from pprint import pformat
 from signal import signal, SIGTERM, SIGUSR1, SIGTSTP, SIGCONT
 from subprocess import Popen
-from threading import Event, Thread
+from threading import Event, Lock, Thread
 from syslog import syslog, LOG_ERR, LOG_INFO, LOG_WARNING
 from traceback import extract_tb, format_tb, format_stack
 
@@ -19,13 +21,25 @@ import py3status.docstrings as docstrings
 from py3status.command import CommandServer
 from py3status.constants import COLOR_NAMES
 from py3status.events import Events
+from py3status.executor import COMMAND_LIMIT, COMMAND_TIMEOUT
+from py3status.formatter import Formatter, CACHE_SIZE
 from py3status.helpers import print_stderr
 from py3status.i3status import I3status
 from py3status.parse_config import process_config
 from py3status.module import Module
-from py3status.profiling import profile
+from py3status.output import JsonCache, OutputAssembler, OutputLine
+from py3status.profiling import profile, format_stats
+from py3status.py3 import Py3
+from py3status.storage import MAX_WRITE_DELAY, WRITE_DELAY
 from py3status.version import version
 
+try:
+    # Python 3
+    from queue import Queue
+except ImportError:
+    # Python 2
+    from Queue import Queue
+
 LOG_LEVELS = {'error': LOG_ERR, 'warning': LOG_WARNING, 'info': LOG_INFO, }
 
 DBUS_LEVELS = {'error': 'critical', 'warning': 'normal', 'info': 'low', }
@@ -41,27 +55,166 @@ CONFIG_SPECIAL_SECTIONS = [
     'py3status',
 ]
 
+# default maximum number of threads used to run modules
+WORKERS = 10
+
+# default time in seconds that scheduled updates may be delayed by so that
+# those due close together can be run at the same time
+TIMER_SLACK = 0.01
+
+# default maximum number of times per second that output is sent to i3bar
+MAX_FPS = 30
 
-class Runner(Thread):
+
+class Worker(Thread):
     """
-    A Simple helper to run a module in a Thread so it is non-locking.
+    A worker thread from the WorkerPool.  It runs modules, tasks and events
+    taken from the pool's queue so that they are non-locking.
     """
-    def __init__(self, module, py3_wrapper, module_name):
+    def __init__(self, pool):
         Thread.__init__(self)
         self.daemon = True
-        self.module = module
-        self.module_name = module_name
-        self.py3_wrapper = py3_wrapper
+        self.pool = pool
         self.start()
 
     def run(self):
-        try:
-            self.module.run()
-        except:  # noqa e722
-            self.py3_wrapper.report_exception('Runner')
-        # the module is no longer running so notify the timeout logic
-        if self.module_name:
-            self.py3_wrapper.timeout_finished.append(self.module_name)
+        pool = self.pool
+        py3_wrapper = pool.py3_wrapper
+        while True:
+            module, module_name, queued_ts = pool.queue.get()
+            pool.job_started(time.time() - queued_ts, module)
+            try:
+                module.run()
+            except:  # noqa e722
+                py3_wrapper.report_exception('Runner')
+            # the module is no longer running so notify the timeout logic
+            if module_name:
+                py3_wrapper.timeout_finished.append(module_name)
+            pool.job_finished()
+
+
+class WorkerPool:
+    """
+    A bounded pool of Worker threads.  Threads are only created when all the
+    existing ones are busy and are then reused for later jobs.
+    """
+
+    # jobs waiting longer than this for a worker are logged when debugging
+    WAIT_WARNING = 1
+
+    def __init__(self, py3_wrapper, max_workers):
+        self.py3_wrapper = py3_wrapper
+        self.max_workers = max_workers
+        self.lock = Lock()
+        self.queue = Queue()
+        self.threads = []
+
+        self.busy = 0
+        self.jobs = 0
+        self.wait_max = 0
+        self.wait_total = 0
+
+    def add(self, module, module_name):
+        """
+        Queue the module (or task) to be run by a worker.
+        """
+        with self.lock:
+            idle = len(self.threads) - self.busy - self.queue.qsize()
+            if idle <= 0 and len(self.threads) < self.max_workers:
+                self.threads.append(Worker(self))
+            self.queue.put((module, module_name, time.time()))
+
+    def job_started(self, wait, module):
+        with self.lock:
+            self.busy += 1
+            self.jobs += 1
+            self.wait_total += wait
+            if wait > self.wait_max:
+                self.wait_max = wait
+        if wait > self.WAIT_WARNING and self.py3_wrapper.config['debug']:
+            self.py3_wrapper.log(
+                '{} waited {:.3f}s for a worker'.format(module, wait)
+            )
+
+    def job_finished(self):
+        with self.lock:
+            self.busy -= 1
+
+    def stats(self):
+        """
+        Return information about the pool usage.
+        """
+        with self.lock:
+            jobs = self.jobs
+            return {
+                'workers': len(self.threads),
+                'max_workers': self.max_workers,
+                'busy': self.busy,
+                'queue_depth': self.queue.qsize(),
+                'jobs': jobs,
+                'wait_avg': self.wait_total / jobs if jobs else 0,
+                'wait_max': self.wait_max,
+            }
+
+
+class FrameLimiter:
+    """
+    Limits how often output is sent to i3bar.
+
+    Module updates that arrive less than interval seconds after the last
+    frame are held back and merged into a single frame once it is due.
+    Urgent updates are never held back.  An interval of 0 means no limit.
+    """
+
+    def __init__(self, interval, clock=time.time):
+        self.interval = interval
+        self.clock = clock
+        self.due = None
+        # updates queued when the frame being held back was due to be written
+        self.held_updates = None
+        self.last_frame = None
+        self.frames_written = 0
+        self.updates_merged = 0
+
+    def wait_time(self):
+        """
+        Seconds until a held back frame is due or None if there isn't one.
+        """
+        if self.due is None:
+            return None
+        return self.due - self.clock()
+
+    def ready(self, urgent=False, updates=1):
+        """
+        Can a frame be written now for the queued updates.  If not one will
+        be due after wait_time().
+        """
+        now = self.clock()
+        if (not urgent and self.last_frame is not None and
+                now < self.last_frame + self.interval):
+            if self.due is None:
+                self.due = self.last_frame + self.interval
+                self.held_updates = updates
+            return False
+        self.due = None
+        self.last_frame = now
+        return True
+
+    def written(self, updates):
+        """
+        A frame has been written containing this many module updates.  Only
+        those that arrived while the frame was held back count as merged.
+        """
+        self.frames_written += 1
+        if self.held_updates is not None:
+            self.updates_merged += max(updates - self.held_updates, 0)
+            self.held_updates = None
+
+    def stats(self):
+        return {
+            'frames_written': self.frames_written,
+            'updates_merged': self.updates_merged,
+        }
 
 
 class NoneSetting:
@@ -111,6 +264,21 @@ class CheckI3StatusThread(Task):
             self.timeout_queue_add(self, int(time.time()) + 5)
 
 
+class StatsLogger(Task):
+    """
+    Periodically writes the execution statistics to the log
+    """
+
+    def __init__(self, py3_wrapper, interval):
+        self.interval = interval
+        self.py3_wrapper = py3_wrapper
+
+    def run(self):
+        for line in format_stats(self.py3_wrapper.get_stats()).splitlines():
+            self.py3_wrapper.log(line)
+        self.py3_wrapper.timeout_queue_add(self, time.time() + self.interval)
+
+
 class ModuleRunner(Task):
     """
     Starts up a Module
@@ -258,6 +426,7 @@ class Py3statusWrapper:
         Useful variables we'll need.
         """
         self.config = {}
+        self.frame_limiter = FrameLimiter(1.0 / MAX_FPS)
         self.i3bar_running = True
         self.last_refresh_ts = time.time()
         self.lock = Event()
@@ -266,9 +435,11 @@ class Py3statusWrapper:
         self.options = options
         self.output_modules = {}
         self.py3_modules = []
+        self.request_cache_path = None
         self.running = True
         self.update_queue = deque()
         self.update_request = Event()
+        self.update_urgent = False
 
         # shared code
         self.common = Common(self)
@@ -277,14 +448,17 @@ class Py3statusWrapper:
 
         # these are used to schedule module updates
         self.timeout_add_queue = deque()
+        self.timeout_cancelled = 0
+        self.timeout_count = count()
         self.timeout_due = None
         self.timeout_finished = deque()
-        self.timeout_keys = []
         self.timeout_missed = {}
-        self.timeout_queue = {}
+        self.timeout_queue = []
         self.timeout_queue_lookup = {}
         self.timeout_running = set()
+        self.timeout_slack = TIMER_SLACK
         self.timeout_update_due = deque()
+        self.worker_pool = None
 
     def timeout_queue_add(self, item, cache_time=0):
         """
@@ -304,46 +478,57 @@ class Py3statusWrapper:
         Add a module to the timeout_queue if it is scheduled in the future or
         if it is due for an update immediately just trigger that.
 
-        the timeout_queue is a dict with the scheduled time as the key and the
-        value is a list of module instance names due to be updated at that
-        point. An ordered list of keys is kept to allow easy checking of when
-        updates are due.  A list is also kept of which modules are in the
-        update_queue to save having to search for modules in it unless needed.
+        the timeout_queue is a heap of [scheduled time, sequence, module]
+        entries.  timeout_queue_lookup holds the current entry for each module
+        in the queue.  When a module is rescheduled its old entry is not
+        searched for, it is just cancelled by setting its module to None and
+        it gets discarded once it reaches the top of the heap.
         """
         # If already set to update do nothing
         if module in self.timeout_update_due:
             return
 
-        # remove if already in the queue
-        key = self.timeout_queue_lookup.get(module)
-        if key:
-            queue_item = self.timeout_queue[key]
-            queue_item.remove(module)
-            if not queue_item:
-                del self.timeout_queue[key]
-                self.timeout_keys.remove(key)
+        # cancel if already in the queue
+        entry = self.timeout_queue_lookup.pop(module, None)
+        if entry:
+            entry[2] = None
+            self.timeout_cancelled += 1
 
         if cache_time == 0:
             # if cache_time is 0 we can just trigger the module update
             self.timeout_update_due.append(module)
-            self.timeout_queue_lookup[module] = None
         else:
             # add the module to the timeout queue
-            if cache_time not in self.timeout_keys:
-                self.timeout_queue[cache_time] = set([module])
-                self.timeout_keys.append(cache_time)
-                # sort keys so earliest is first
-                self.timeout_keys.sort()
-
-                # when is next timeout due?
-                try:
-                    self.timeout_due = self.timeout_keys[0]
-                except IndexError:
-                    self.timeout_due = None
-            else:
-                self.timeout_queue[cache_time].add(module)
+            entry = [cache_time, next(self.timeout_count), module]
+            heappush(self.timeout_queue, entry)
             # note that the module is in the timeout_queue
-            self.timeout_queue_lookup[module] = cache_time
+            self.timeout_queue_lookup[module] = entry
+
+        # if many entries have been cancelled rebuild the heap without them
+        # so that it does not keep growing.
+        if (self.timeout_cancelled > 100 and
+                self.timeout_cancelled * 2 > len(self.timeout_queue)):
+            self.timeout_queue = [
+                x for x in self.timeout_queue if x[2] is not None
+            ]
+            heapify(self.timeout_queue)
+            self.timeout_cancelled = 0
+
+        self.timeout_set_due()
+
+    def timeout_set_due(self):
+        """
+        Discard any cancelled entries at the top of the timeout_queue and set
+        when the next timeout is due.
+        """
+        queue = self.timeout_queue
+        while queue and queue[0][2] is None:
+            heappop(queue)
+            self.timeout_cancelled -= 1
+        if queue:
+            self.timeout_due = queue[0][0]
+        else:
+            self.timeout_due = None
 
     def timeout_queue_process(self):
         """
@@ -353,32 +538,21 @@ class Py3statusWrapper:
         while self.timeout_add_queue:
             self.timeout_process_add_queue(*self.timeout_add_queue.popleft())
         now = time.time()
-        due_timeouts = []
-        # find any due timeouts
-        for timeout in self.timeout_keys:
-            if timeout > now:
-                break
-            due_timeouts.append(timeout)
-
-        if due_timeouts:
-            # process them
-            for timeout in due_timeouts:
-                modules = self.timeout_queue[timeout]
-                # remove from the queue
-                del self.timeout_queue[timeout]
-                self.timeout_keys.remove(timeout)
-
-                for module in modules:
-                    # module no longer in queue
-                    del self.timeout_queue_lookup[module]
-                    # tell module to update
-                    self.timeout_update_due.append(module)
-
-            # when is next timeout due?
-            try:
-                self.timeout_due = self.timeout_keys[0]
-            except IndexError:
-                self.timeout_due = None
+        queue = self.timeout_queue
+        # find and process any due timeouts
+        while queue and queue[0][0] <= now:
+            module = heappop(queue)[2]
+            if module is None:
+                # this entry was cancelled
+                self.timeout_cancelled -= 1
+                continue
+            # module no longer in queue
+            del self.timeout_queue_lookup[module]
+            # tell module to update
+            self.timeout_update_due.append(module)
+
+        # when is next timeout due?
+        self.timeout_set_due()
 
         # process any finished modules.
         # Now that the module has finished running it may have been marked to
@@ -406,11 +580,13 @@ class Py3statusWrapper:
                 self.timeout_missed[module_name] = module
             else:
                 self.timeout_running.add(module_name)
-                Runner(module, self, module_name)
+                self.worker_pool.add(module, module_name)
 
-        # we return how long till we next need to process the timeout_queue
+        # we return how long till we next need to process the timeout_queue.
+        # We allow ourselves to be late by timeout_slack so that timeouts due
+        # close together are processed in a single wakeup.
         if self.timeout_due is not None:
-            return self.timeout_due - time.time()
+            return self.timeout_due + self.timeout_slack - time.time()
 
     def get_config(self):
         """
@@ -533,6 +709,24 @@ class Py3statusWrapper:
                 msg = 'Loading module "{}" failed ({}).'.format(module, err)
                 self.report_exception(msg, level='warning')
 
+    def config_number(self, name, default, minimum=0, integer=False):
+        """
+        Return the number set for the py3status config option.  If it is not
+        a number, or is less than minimum, the user is warned and the default
+        is used instead.
+        """
+        value = self.config['py3_config']['py3status'].get(name, default)
+        types = int if integer else (int, float)
+        if not isinstance(value, types) or value < minimum:
+            self.notify_user(
+                'Invalid `{}` setting, using default of {}.'.format(
+                    name, default
+                ),
+                level='warning'
+            )
+            value = default
+        return value
+
     def setup(self):
         """
         Setup py3status and spawn i3status/events/modules threads.
@@ -590,6 +784,49 @@ class Py3statusWrapper:
         config_path = self.config['i3status_config_path']
         self.config['py3_config'] = process_config(config_path, self)
 
+        # setup the worker pool that runs our modules
+        workers = self.config_number('workers', WORKERS, 1, integer=True)
+        self.worker_pool = WorkerPool(self, workers)
+
+        self.timeout_slack = self.config_number('timer_slack', TIMER_SLACK)
+
+        max_fps = self.config_number('max_fps', MAX_FPS)
+        # a max_fps of 0 means that output is not rate limited
+        self.frame_limiter.interval = 1.0 / max_fps if max_fps else 0
+
+        Formatter.set_cache_size(self.config_number(
+            'formatter_cache_size', CACHE_SIZE, 1, integer=True
+        ))
+
+        Py3._executor.set_limits(
+            self.config_number('command_timeout', COMMAND_TIMEOUT),
+            self.config_number('command_limit', COMMAND_LIMIT, 1, integer=True),
+        )
+
+        Py3._storage.set_write_delay(
+            self.config_number('storage_write_delay', WRITE_DELAY),
+            self.config_number('storage_max_write_delay', MAX_WRITE_DELAY),
+        )
+
+        # keep cached responses for py3.request() across restarts
+        if self.config['py3_config']['py3status'].get('request_cache_persist'):
+            cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser(
+                '~/.cache'
+            )
+            self.request_cache_path = os.path.join(
+                cache_dir, 'py3status_requests.data'
+            )
+            if Py3._response_cache.load(self.request_cache_path):
+                self.log('request cache loaded from {}'.format(
+                    self.request_cache_path
+                ))
+
+        # a stats_log_interval of 0 means that stats are not logged
+        stats_interval = self.config_number('stats_log_interval', 0)
+        if stats_interval:
+            task = StatsLogger(self, stats_interval)
+            self.timeout_queue_add(task, time.time() + stats_interval)
+
         # setup i3status thread
         self.i3status_thread = I3status(self)
 
@@ -736,6 +973,8 @@ class Py3statusWrapper:
         try:
             self.lock.set()
             if self.config['debug']:
+                self.log('formatter cache stats {}'.format(
+                    Formatter.cache_stats()))
                 self.log('lock set, exiting')
             # run kill() method on all py3status modules
             for module in self.modules.values():
@@ -743,6 +982,23 @@ class Py3statusWrapper:
         except:  # noqa e722
             pass
 
+        # save any storage changes that are waiting to be written
+        if Py3._storage.initialized:
+            try:
+                Py3._storage.flush()
+            except (IOError, OSError) as e:
+                self.log('storage could not be saved: {}'.format(e))
+
+        Py3._async_loop.stop()
+        Py3._i3_ipc.stop()
+        Py3._dbus.stop()
+
+        if self.request_cache_path:
+            try:
+                Py3._response_cache.save(self.request_cache_path)
+            except (IOError, OSError) as e:
+                self.log('request cache could not be saved: {}'.format(e))
+
     def refresh_modules(self, module_string=None, exact=True):
         """
         Update modules.
@@ -802,6 +1058,33 @@ class Py3statusWrapper:
             except ValueError:
                 pass
 
+    def get_stats(self, modules=None):
+        """
+        Return the execution statistics of py3status and its modules.  If a
+        list of module names is given only those modules are included.
+        """
+        module_stats = {}
+        for name, module in list(self.modules.items()):
+            if modules is None or name in modules:
+                module_stats[name] = module.stats.stats()
+        return {
+            'modules': module_stats,
+            'async': Py3._async_loop.stats(),
+            'worker_pool': self.worker_pool.stats(),
+            'output': self.frame_limiter.stats(),
+            'formatter_cache': Formatter.cache_stats(),
+            'commands': Py3._executor.stats(),
+            'dbus': Py3._dbus.stats(),
+            'command_cache': Py3._command_cache.stats(),
+            'file_watch': Py3._file_watcher.stats(),
+            'http': Py3._http_pool.stats(),
+            'i3_ipc': Py3._i3_ipc.stats(),
+            'request_cache': Py3._response_cache.stats(),
+            'request_coalescing': Py3._request_flights.stats(),
+            'sampler': Py3._sampler.stats(),
+            'storage': Py3._storage.stats(),
+        }
+
     def notify_update(self, update, urgent=False):
         """
         Name or list of names of modules that have updated.
@@ -837,6 +1120,9 @@ class Py3statusWrapper:
 
         # we need to update the output
         if self.update_queue:
+            if urgent:
+                # urgent updates are not held back by the frame rate limit
+                self.update_urgent = True
             self.update_request.set()
 
     def log(self, msg, level='info'):
@@ -889,6 +1175,7 @@ class Py3statusWrapper:
                 output_modules[name]['module'] = self.modules[name]
                 output_modules[name]['type'] = 'py3status'
                 output_modules[name]['color'] = self.mappings_color.get(name)
+                output_modules[name]['json_cache'] = JsonCache()
         # i3status modules
         for name in i3modules:
             if name not in output_modules:
@@ -897,6 +1184,7 @@ class Py3statusWrapper:
                 output_modules[name]['module'] = i3modules[name]
                 output_modules[name]['type'] = 'i3status'
                 output_modules[name]['color'] = self.mappings_color.get(name)
+                output_modules[name]['json_cache'] = JsonCache()
 
         self.output_modules = output_modules
 
@@ -929,7 +1217,7 @@ class Py3statusWrapper:
                 if 'color' not in output:
                     output['color'] = color
         # Create the json string output.
-        return ','.join([dumps(x) for x in outputs])
+        return module['json_cache'].dumps(outputs)
 
     def i3bar_stop(self, signum, frame):
         self.i3bar_running = False
@@ -981,8 +1269,12 @@ class Py3statusWrapper:
             self.timeout_queue_add(task)
 
         # this will be our output set to the correct length for the number of
-        # items in the bar
-        output = [None] * len(py3_config['order'])
+        # items in the bar.  Only large bars are quicker to build in chunks.
+        size = len(py3_config['order'])
+        if size >= OutputAssembler.MIN_SIZE:
+            output = OutputAssembler(size)
+        else:
+            output = OutputLine(size)
 
         write = sys.__stdout__.write
         flush = sys.__stdout__.flush
@@ -997,11 +1289,18 @@ class Py3statusWrapper:
         write('\n[[]\n')
 
         update_due = None
+        frame_limiter = self.frame_limiter
         # main loop
         while True:
             # process the timeout_queue and get interval till next update due
             update_due = self.timeout_queue_process()
 
+            # wake up for any frame held back due to rate limiting
+            frame_wait = frame_limiter.wait_time()
+            if frame_wait is not None:
+                if update_due is None or frame_wait < update_due:
+                    update_due = frame_wait
+
             # wait until an update is requested
             if self.update_request.wait(timeout=update_due):
                 # event was set so clear it
@@ -1012,20 +1311,34 @@ class Py3statusWrapper:
 
             # check if an update is needed
             if self.update_queue:
+                # Limit how often we output to i3bar.  Updates arriving too
+                # soon after the last frame stay in the update_queue and are
+                # merged into a single frame once it is due.
+                if not frame_limiter.ready(
+                    self.update_urgent, len(self.update_queue)
+                ):
+                    continue
+                self.update_urgent = False
+
+                # a module may have been queued more than once
+                processed = set()
+                updates = len(self.update_queue)
                 while (len(self.update_queue)):
                     module_name = self.update_queue.popleft()
+                    if module_name in processed:
+                        continue
+                    processed.add(module_name)
                     module = self.output_modules[module_name]
                     out = self.process_module_output(module)
 
                     for index in module['position']:
                         # store the output as json
-                        output[index] = out
+                        output.set(index, out)
 
-                # build output string
-                out = ','.join([x for x in output if x])
                 # dump the line to stdout
-                write(',[{}]\n'.format(out))
+                write(',[{}]\n'.format(output.get_line()))
                 flush()
+                frame_limiter.written(updates)
 
     def handle_cli_command(self, config):
         """Handle a command from the CLI.
@@ -0,0 +1,299 @@
+from threading import Lock, Thread
+
+try:
+    from gi.repository import Gio, GLib
+    from pydbus import SessionBus, connect
+except ImportError:
+    Gio = GLib = SessionBus = connect = None
+
+from py3status.exceptions import DBusError
+
+DBUS = 'org.freedesktop.DBus'
+DBUS_PATH = '/org/freedesktop/DBus'
+PROPERTIES = 'org.freedesktop.DBus.Properties'
+
+# milliseconds to wait for a reply to a method call
+CALL_TIMEOUT = 5000
+
+
+class DBusService:
+    """
+    A session bus connection and GLib main loop shared by all modules.
+
+    Signals are dispatched by the main loop thread to the modules that have
+    subscribed to them with a match rule.  Properties are cached for each
+    object and interface.  The cache is kept up to date from
+    PropertiesChanged signals, so properties are only fetched when first
+    used.
+    """
+
+    def __init__(self, address=None):
+        self.address = address
+        self.lock = Lock()
+        self.bus = None
+        self.loop = None
+        # (bus name, path, interface) -> dict of properties
+        self.properties = {}
+        # (bus name, path, interface) -> count of changes seen
+        self.changes = {}
+        # (bus name, path, interface) -> (subscription id, unique name)
+        self.watched = {}
+        # subscription id -> [well known sender, rule, handler, current id]
+        self.subscriptions = {}
+        self.calls = 0
+        self.hits = 0
+        self.signals = 0
+
+    def get_bus(self):
+        with self.lock:
+            if self.bus is None:
+                if SessionBus is None:
+                    raise DBusError('pydbus is not installed')
+                try:
+                    if self.address:
+                        bus = connect(self.address)
+                    else:
+                        bus = SessionBus()
+                except GLib.Error as e:
+                    raise DBusError('cannot connect to D-Bus: {}'.format(e))
+                # cached properties of services that go away are dropped
+                bus.con.signal_subscribe(
+                    DBUS, DBUS, 'NameOwnerChanged', DBUS_PATH, None,
+                    Gio.DBusSignalFlags.NONE, self._name_owner_changed
+                )
+                self.loop = GLib.MainLoop()
+                thread = Thread(target=self.loop.run)
+                thread.daemon = True
+                thread.start()
+                self.bus = bus
+            return self.bus
+
+    def call(self, bus_name, path, interface, method, signature=None, args=()):
+        """
+        Call the method and return the unpacked reply.  signature is the
+        D-Bus type of the args eg `(ss)`.
+        """
+        bus = self.get_bus()
+        parameters = GLib.Variant(signature, tuple(args)) if signature else None
+        try:
+            reply = bus.con.call_sync(
+                bus_name, path, interface, method, parameters, None,
+                Gio.DBusCallFlags.NONE, CALL_TIMEOUT, None
+            )
+        except GLib.Error as e:
+            raise DBusError('{}.{} failed: {}'.format(interface, method, e))
+        with self.lock:
+            self.calls += 1
+        return reply.unpack()
+
+    def get(self, bus_name, path=None):
+        """
+        Return a pydbus proxy for the object.
+        """
+        bus = self.get_bus()
+        try:
+            return bus.get(bus_name, path)
+        except GLib.Error as e:
+            raise DBusError('cannot get {}: {}'.format(bus_name, e))
+
+    def get_name_owner(self, bus_name):
+        return self.call(DBUS, DBUS_PATH, DBUS, 'GetNameOwner', '(s)', (bus_name,))[0]
+
+    def get_property(self, bus_name, path, interface, name, cache=True):
+        """
+        Return the value of the property.  The value is shared so it must
+        not be changed.
+        """
+        if not cache:
+            return self.call(
+                bus_name, path, PROPERTIES, 'Get', '(ss)', (interface, name)
+            )[0]
+        key = (bus_name, path, interface)
+        with self.lock:
+            properties = self.properties.get(key)
+            if properties is not None and name in properties:
+                self.hits += 1
+                return properties[name]
+        # watch for changes before fetching so that none are missed
+        self._watch(key)
+        with self.lock:
+            changes = self.changes.get(key, 0)
+        properties = self.call(
+            bus_name, path, PROPERTIES, 'GetAll', '(s)', (interface,)
+        )[0]
+        with self.lock:
+            # if anything changed while we were fetching we cannot tell which
+            # is newer so the result is not cached, nor is it until the watch
+            # is in place
+            watch = self.watched.get(key)
+            if watch and watch[0] is not None and changes == self.changes.get(key, 0):
+                self.properties[key] = properties
+        try:
+            return properties[name]
+        except KeyError:
+            raise DBusError('{} has no property `{}`'.format(interface, name))
+
+    def _watch(self, key):
+        with self.lock:
+            if key in self.watched:
+                return
+            self.watched[key] = (None, None)
+        bus_name, path, interface = key
+        sender = self._owner(bus_name)
+        if sender is None:
+            # signals come from the owner's unique name, which we would not
+            # know once there is one, so there is nothing to watch yet
+            with self.lock:
+                del self.watched[key]
+            raise DBusError('`{}` has no owner'.format(bus_name))
+        subscription = self.get_bus().con.signal_subscribe(
+            sender, PROPERTIES, 'PropertiesChanged', path, interface,
+            Gio.DBusSignalFlags.NONE, self._properties_changed
+        )
+        with self.lock:
+            if key in self.watched:
+                self.watched[key] = (subscription, sender)
+                return
+        # the owner went away while we were subscribing
+        self.bus.con.signal_unsubscribe(subscription)
+
+    def _owner(self, bus_name):
+        """
+        The unique name owning the bus name or None if it has no owner.
+        """
+        if bus_name.startswith(':') or bus_name == DBUS:
+            return bus_name
+        try:
+            return self.get_name_owner(bus_name)
+        except DBusError:
+            return None
+
+    def _route(self, bus_name):
+        """
+        Signals are sent from unique names so a well known name is replaced
+        by its owner if it has one.  Otherwise signals sent by any owner of
+        a well known name would also be given to subscriptions made for its
+        other owners.
+        """
+        return self._owner(bus_name) or bus_name
+
+    def _apply_changes(self, sender, path, args):
+        interface, changed, invalidated = args
+        with self.lock:
+            for key, (subscription, owner) in self.watched.items():
+                if key[1:] != (path, interface) or sender not in (owner, key[0]):
+                    continue
+                self.changes[key] = self.changes.get(key, 0) + 1
+                properties = self.properties.get(key)
+                if properties is None:
+                    continue
+                # properties already given out are not changed
+                properties = dict(properties)
+                properties.update(changed)
+                for name in invalidated:
+                    properties.pop(name, None)
+                self.properties[key] = properties
+
+    def _properties_changed(self, con, sender, path, interface, member, parameters):
+        with self.lock:
+            self.signals += 1
+        self._apply_changes(sender, path, parameters.unpack())
+
+    def _name_owner_changed(self, con, sender, path, interface, member, parameters):
+        name, old_owner, new_owner = parameters.unpack()
+        with self.lock:
+            # subscriptions to a well known name follow it to its new owner
+            for subscription in self.subscriptions.values():
+                if subscription[0] == name:
+                    self._resubscribe(subscription, new_owner or name)
+        if not old_owner:
+            return
+        with self.lock:
+            for key, (subscription, owner) in list(self.watched.items()):
+                if name in (key[0], owner):
+                    if subscription is not None:
+                        con.signal_unsubscribe(subscription)
+                    del self.watched[key]
+                    self.properties.pop(key, None)
+                    self.changes.pop(key, None)
+
+    def subscribe(self, callback, sender=None, interface=None, member=None,
+                  path=None, arg0=None):
+        """
+        Call callback with the sender, path, interface, member and arguments
+        of signals matching the rule.  Returns the subscription id.
+
+        A well known sender is matched by whichever unique name owns it, so
+        the subscription keeps working when the service is restarted.
+        """
+        bus = self.get_bus()
+        well_known = None
+        if sender and not sender.startswith(':') and sender != DBUS:
+            well_known = sender
+            sender = self._route(sender)
+
+        def handler(con, sender, path, interface, member, parameters):
+            args = parameters.unpack()
+            with self.lock:
+                self.signals += 1
+            if interface == PROPERTIES and member == 'PropertiesChanged':
+                # make sure that the cache is updated before the callback
+                self._apply_changes(sender, path, args)
+            try:
+                callback(sender, path, interface, member, args)
+            except Exception:
+                # don't let a bad callback stop the main loop
+                pass
+
+        rule = (interface, member, path, arg0)
+        subscription = bus.con.signal_subscribe(
+            sender, interface, member, path, arg0,
+            Gio.DBusSignalFlags.NONE, handler
+        )
+        with self.lock:
+            self.subscriptions[subscription] = [
+                well_known, rule, handler, subscription
+            ]
+        if well_known:
+            # the owner may have changed before the subscription was recorded
+            sender_now = self._route(well_known)
+            with self.lock:
+                entry = self.subscriptions.get(subscription)
+                if sender_now != sender and entry and entry[3] == subscription:
+                    self._resubscribe(entry, sender_now)
+        return subscription
+
+    def _resubscribe(self, subscription, sender):
+        """
+        Replace the signal subscription with one for the sender.  Must be
+        called holding the lock.
+        """
+        well_known, rule, handler, current = subscription
+        interface, member, path, arg0 = rule
+        self.bus.con.signal_unsubscribe(current)
+        subscription[3] = self.bus.con.signal_subscribe(
+            sender, interface, member, path, arg0,
+            Gio.DBusSignalFlags.NONE, handler
+        )
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            if subscription not in self.subscriptions:
+                return
+            current = self.subscriptions.pop(subscription)[3]
+            self.bus.con.signal_unsubscribe(current)
+
+    def stop(self):
+        with self.lock:
+            if self.loop is not None:
+                self.loop.quit()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'calls': self.calls,
+                'cached_objects': len(self.properties),
+                'property_hits': self.hits,
+                'signals': self.signals,
+                'subscriptions': len(self.subscriptions),
+            }
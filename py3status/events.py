@@ -2,10 +2,11 @@ import select
 import sys
 
 from threading import Thread
-from subprocess import Popen, PIPE
 from json import loads
 
+from py3status.exceptions import I3IPCError
 from py3status.profiling import profile
+from py3status.py3 import Py3
 
 try:
     # Python 3
@@ -132,7 +133,7 @@ class Events(Thread):
         """
         Dispatch on_click config parameters to either:
             - Our own methods for special py3status commands (listed below)
-            - The i3-msg program which is part of i3wm
+            - i3 via its IPC socket
         """
         if command is None:
             return
@@ -158,11 +159,14 @@ class Events(Thread):
 
     def i3_msg(self, module_name, command):
         """
-        Execute the given i3 message and log its output.
+        Execute the given i3 command and log its reply.
         """
-        i3_msg_pipe = Popen(['i3-msg', command], stdout=PIPE)
-        self.py3_wrapper.log('i3-msg module="{}" command="{}" stdout={}'.format(
-            module_name, command, i3_msg_pipe.stdout.read()))
+        try:
+            reply = Py3._i3_ipc.message('command', command)
+        except I3IPCError as e:
+            reply = e
+        self.py3_wrapper.log('i3-msg module="{}" command="{}" reply={}'.format(
+            module_name, command, reply))
 
     def process_event(self, module_name, event, default_event=False):
         """
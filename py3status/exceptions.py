@@ -24,6 +24,24 @@ class CommandError(Py3Exception):
         self.error = error
 
 
+class CommandTimeout(CommandError):
+    """
+    The command did not finish within its timeout and has been killed.
+    """
+
+
+class DBusError(Py3Exception):
+    """
+    A D-Bus call failed or D-Bus is not available.
+    """
+
+
+class I3IPCError(Py3Exception):
+    """
+    i3 could not be reached over its IPC socket or the message was invalid.
+    """
+
+
 class RequestException(Py3Exception):
     """
     A Py3.request() base exception.  This will catch any of the more specific
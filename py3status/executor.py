@@ -0,0 +1,202 @@
+import os
+import sys
+
+from signal import SIGKILL
+from subprocess import Popen
+from threading import BoundedSemaphore, Lock, Timer
+from time import time
+
+from py3status.exceptions import CommandTimeout
+from py3status.profiling import Timings
+from py3status.util import LRUCache, SingleFlight
+
+# default number of seconds a command may run for before it is killed
+COMMAND_TIMEOUT = 30
+
+# default maximum number of commands that can be running at the same time
+COMMAND_LIMIT = 8
+
+# maximum number of command outputs held by the CommandCache
+COMMAND_CACHE_SIZE = 100
+
+python2 = sys.version_info < (3, 0)
+
+
+class CommandExecutor:
+    """
+    Runs the commands requested by modules.
+
+    Commands that run for longer than their timeout are killed along with any
+    processes they started.  The number of commands with a timeout running at
+    the same time is limited, and statistics are kept for each command.
+    Commands without a timeout, eg programs started from on_click, may run
+    for as long as they like so they do not count towards the limit.
+    """
+
+    def __init__(self, timeout=COMMAND_TIMEOUT, limit=COMMAND_LIMIT):
+        self.lock = Lock()
+        self.stats_data = {}
+        self.set_limits(timeout, limit)
+
+    def set_limits(self, timeout, limit):
+        """
+        Set the default timeout and how many commands can run at once.  A
+        timeout of 0 means that commands are never killed.
+        """
+        self.timeout = timeout
+        self.limit = limit
+        self.semaphore = BoundedSemaphore(limit)
+
+    def kill(self, process, killed):
+        """
+        Kill the process group of a command that has timed out.
+        """
+        killed.append(True)
+        try:
+            os.killpg(process.pid, SIGKILL)
+        except OSError:
+            # the process has already finished
+            pass
+
+    def run(self, command, pretty_cmd, timeout=None, **kw):
+        """
+        Run the command via Popen and wait for it to finish.  Any keyword
+        arguments are passed to Popen.
+
+        If the command has not finished within timeout seconds it is killed
+        and a CommandTimeout is raised.  If timeout is None then the default
+        timeout is used.
+
+        Returns a tuple of the return code, output and error output.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        # run the command in its own process group so that it and anything it
+        # starts can be killed together.
+        if python2:
+            kw['preexec_fn'] = os.setsid
+        else:
+            kw['start_new_session'] = True
+
+        semaphore = self.semaphore if timeout else None
+        if semaphore:
+            semaphore.acquire()
+        try:
+            start = time()
+            process = Popen(command, **kw)
+            killed = []
+            timer = None
+            if timeout:
+                timer = Timer(timeout, self.kill, [process, killed])
+                timer.daemon = True
+                timer.start()
+            try:
+                output, error = process.communicate()
+            finally:
+                if timer:
+                    timer.cancel()
+            duration = time() - start
+        finally:
+            if semaphore:
+                semaphore.release()
+
+        self.add_stats(command, duration, process.returncode, killed)
+        if killed:
+            msg = 'Command `{cmd}` timed out after {timeout}s'.format(
+                cmd=pretty_cmd, timeout=timeout
+            )
+            raise CommandTimeout(
+                msg, error_code=process.returncode, output=output, error=error
+            )
+        return process.returncode, output, error
+
+    def add_stats(self, command, duration, returncode, killed):
+        """
+        Record the run of a command.  Stats are kept by the program name.
+        """
+        if isinstance(command, (list, tuple)):
+            name = command[0] if command else ''
+        else:
+            name = command.split(' ', 1)[0]
+        name = os.path.basename(name)
+        with self.lock:
+            if name not in self.stats_data:
+                self.stats_data[name] = {
+                    'failed': 0,
+                    'timeouts': 0,
+                    'time': Timings(),
+                }
+            stats = self.stats_data[name]
+            stats['time'].add(duration)
+            if killed:
+                stats['timeouts'] += 1
+            elif returncode:
+                stats['failed'] += 1
+
+    def stats(self):
+        """
+        Return the statistics for the commands that have been run.  Times are
+        in seconds.
+        """
+        with self.lock:
+            result = {}
+            for name, stats in self.stats_data.items():
+                data = {
+                    'calls': stats['time'].count,
+                    'failed': stats['failed'],
+                    'timeouts': stats['timeouts'],
+                }
+                data.update(stats['time'].stats())
+                result[name] = data
+            return result
+
+
+class CommandCache:
+    """
+    Caches the output of commands for a short time so that modules running
+    the same command can share its output.
+
+    If a command is requested while the same command is already running then
+    we wait for its result rather than running it again.
+    """
+
+    def __init__(self, size=COMMAND_CACHE_SIZE):
+        self.cache = LRUCache(size)
+        self.flights = SingleFlight()
+        self.lock = Lock()
+        self.hits = 0
+
+    def get(self, key, max_age, function):
+        """
+        Return the cached result for key if it is less than max_age seconds
+        old, otherwise call function to get it.  Exceptions raised by the
+        function are passed on to everyone waiting for the result but are not
+        cached.
+        """
+        entry = self.cache.get(key)
+        if entry and time() - entry[0] <= max_age:
+            with self.lock:
+                self.hits += 1
+            return entry[1]
+
+        def run():
+            result = function()
+            self.cache[key] = (time(), result)
+            return result
+
+        # if the command is already running then its result is used
+        return self.flights.run(key, run)[0]
+
+    def stats(self):
+        """
+        Return the cache statistics.
+        """
+        flights = self.flights.stats()
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'joined': flights['joined'],
+                'misses': flights['calls'],
+                'forks_saved': self.hits + flights['joined'],
+                'size': len(self.cache),
+            }
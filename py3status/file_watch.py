@@ -0,0 +1,279 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+
+from threading import Lock, Thread
+from time import sleep
+
+# seconds between checks of paths that are polled
+POLL_INTERVAL = 1
+
+# time to wait after a change for any related changes before updating
+SETTLE_TIME = 0.1
+
+# inotify does not see changes to these so they are always polled
+POLL_ONLY = ('/proc/', '/sys/')
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_CLOEXEC = 0o2000000
+
+# only events that change the contents are watched.  Modules read the files
+# they watch so events that opening or closing a file can cause, such as
+# IN_CLOSE_WRITE for a mailbox opened rb+, would make every update trigger
+# another one.
+WATCH_MASK = (
+    IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+    IN_DELETE_SELF | IN_MOVE_SELF
+)
+
+EVENT = struct.Struct('iIII')
+
+
+class Inotify:
+    """
+    Minimal ctypes wrapper around the Linux inotify api.
+    """
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        # AttributeError is raised if inotify is not supported
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+    def add_watch(self, path):
+        """
+        Watch the path and return the watch descriptor.
+        """
+        wd = self._add_watch(self.fd, path.encode('utf-8'), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read_events(self):
+        """
+        Return a list of (watch descriptor, mask, name) for the pending
+        events.
+        """
+        data = os.read(self.fd, 65536)
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            events.append((wd, mask, name.decode('utf-8', 'replace')))
+        return events
+
+
+class FileWatcher:
+    """
+    Calls callbacks when watched files or directories change.
+
+    inotify is used where possible, otherwise paths are polled every
+    POLL_INTERVAL seconds.  Files are watched through their directory so that
+    files being created, deleted or replaced are seen.  Any change inside a
+    watched directory counts as a change of the directory, except for files
+    that are created and removed again between checks eg the journal sqlite
+    makes when a module reads a database.
+
+    If a watched directory is removed its paths are polled from then on.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.callbacks = {}
+        self.polled = {}
+        self.watches = {}
+        self.inotify = None
+        self.thread = None
+        self.events = 0
+        self.updates = 0
+
+    def start(self):
+        """
+        Start the thread doing the watching, or a new one if it has died.
+        """
+        if self.thread is None:
+            try:
+                self.inotify = Inotify()
+            except (AttributeError, OSError, TypeError):
+                # inotify is not available so everything is polled
+                pass
+        self.thread = Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def watch(self, path, callback):
+        """
+        Call callback when the file or directory at path changes.  Returns
+        False if the path cannot be watched eg it does not exist.
+        """
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            return False
+        if os.path.isdir(path):
+            directory = path
+        else:
+            directory = os.path.dirname(path)
+        with self.lock:
+            if not (self.thread and self.thread.is_alive()):
+                self.start()
+            if self.inotify and not path.startswith(POLL_ONLY):
+                if directory not in self.watches.values():
+                    try:
+                        wd = self.inotify.add_watch(directory)
+                    except OSError:
+                        return False
+                    self.watches[wd] = directory
+                self.polled.pop(path, None)
+            else:
+                self.polled[path] = self.signature(path)
+            self.callbacks.setdefault(path, set()).add(callback)
+        return True
+
+    def signature(self, path):
+        """
+        Something that changes when the path changes.  Pseudo files do not
+        change their modification time so their contents are used.  For a
+        directory it is made from its entries so that files which come and
+        go between polls are not seen.
+        """
+        try:
+            if os.path.isdir(path):
+                entries = []
+                for name in sorted(os.listdir(path)):
+                    entry = os.path.join(path, name)
+                    if path.startswith(POLL_ONLY):
+                        entries.append(entry)
+                    else:
+                        try:
+                            stat = os.lstat(entry)
+                        except OSError:
+                            # it has just been removed
+                            continue
+                        entries.append(
+                            (entry, stat.st_ino, stat.st_size, stat.st_mtime)
+                        )
+                return tuple(entries)
+            if path.startswith(POLL_ONLY):
+                with open(path, 'rb') as f:
+                    return f.read()
+            stat = os.stat(path)
+            return (stat.st_ino, stat.st_size, stat.st_mtime)
+        except (IOError, OSError):
+            return None
+
+    def poll(self):
+        """
+        Return the polled paths that have changed.
+        """
+        changed = set()
+        with self.lock:
+            maybe_changed = [
+                path for path, signature in self.polled.items()
+                if self.signature(path) != signature
+            ]
+        if not maybe_changed:
+            return changed
+        # let things settle so that files created and removed again, eg an
+        # sqlite journal, are not seen as a change
+        sleep(SETTLE_TIME)
+        with self.lock:
+            for path in maybe_changed:
+                if path not in self.polled:
+                    continue
+                new_signature = self.signature(path)
+                if new_signature != self.polled[path]:
+                    self.polled[path] = new_signature
+                    changed.add(path)
+        return changed
+
+    def read_events(self):
+        """
+        Return the paths changed by the pending inotify events.
+        """
+        # let things settle so that a burst of changes gives one update
+        sleep(SETTLE_TIME)
+        changed = set()
+        # paths whose first event in this batch created them
+        created = {}
+        events = self.inotify.read_events()
+        with self.lock:
+            self.events += len(events)
+            for wd, mask, name in events:
+                directory = self.watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    # the directory has gone so the watch was removed.  Its
+                    # paths are polled instead so that they are seen if they
+                    # come back.
+                    del self.watches[wd]
+                    for path in self.callbacks:
+                        if directory in (path, os.path.dirname(path)):
+                            self.polled[path] = self.signature(path)
+                            changed.add(path)
+                    continue
+                if not name:
+                    changed.add(directory)
+                    continue
+                path = os.path.join(directory, name)
+                created.setdefault(path, bool(mask & (IN_CREATE | IN_MOVED_TO)))
+        for path, was_created in created.items():
+            # a file that was created and removed again has not changed
+            # anything eg an sqlite journal
+            if was_created and not os.path.lexists(path):
+                continue
+            changed.add(path)
+            changed.add(os.path.dirname(path))
+        return changed
+
+    def notify(self, changed):
+        with self.lock:
+            callbacks = set()
+            for path in changed:
+                callbacks.update(self.callbacks.get(path, ()))
+            self.updates += len(callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                # don't let a bad callback stop the watching
+                pass
+
+    def run(self):
+        while True:
+            changed = set()
+            if self.inotify:
+                ready = select.select([self.inotify.fd], [], [], POLL_INTERVAL)[0]
+                if ready:
+                    changed = self.read_events()
+            else:
+                sleep(POLL_INTERVAL)
+            changed.update(self.poll())
+            if changed:
+                self.notify(changed)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'backend': 'inotify' if self.inotify else 'polling',
+                'events': self.events,
+                'paths': len(self.callbacks),
+                'updates': self.updates,
+            }
@@ -6,6 +6,7 @@ from math import ceil
 from numbers import Number
 
 from py3status.composite import Composite
+from py3status.util import LRUCache
 
 try:
     from urllib.parse import parse_qsl
@@ -15,6 +16,27 @@ except ImportError:
 
 python2 = sys.version_info < (3, 0)
 
+# values that are merged into text when rendering
+if python2:
+    conversion = unicode  # noqa
+    convertables = (str, bool, int, float, unicode)  # noqa
+else:
+    conversion = str
+    convertables = (str, bool, int, float, bytes)
+convertable_types = frozenset(convertables)
+
+# values that cause a placeholder to be treated as not valid
+INVALID_VALUES = ('', 'None', None)
+INVALID_VALUES_NOT_ZERO = ('', 'None', None, False, '0', '0.0', 0, 0.0)
+
+# instructions used by compiled blocks
+LITERAL = 0
+PLACEHOLDER = 1
+BLOCK = 2
+
+# maximum number of format strings held in the formatter caches
+CACHE_SIZE = 500
+
 
 class Formatter:
     """
@@ -34,8 +56,9 @@ class Formatter:
 
     reg_ex = re.compile(TOKENS[0], re.M | re.I)
 
-    block_cache = {}
-    format_string_cache = {}
+    # these caches are shared by all Formatter instances
+    block_cache = LRUCache(CACHE_SIZE)
+    format_string_cache = LRUCache(CACHE_SIZE)
 
     def __init__(self, py3_wrapper=None):
         self.py3_wrapper = py3_wrapper
@@ -45,12 +68,15 @@ class Formatter:
         Get the tokenized format_string.
         Tokenizing is resource intensive so we only do it once and cache it
         """
-        if format_string not in self.format_string_cache:
-            if python2 and isinstance(format_string, str):
-                format_string = format_string.decode('utf-8')
-            tokens = list(re.finditer(self.reg_ex, format_string))
-            self.format_string_cache[format_string] = tokens
-        return self.format_string_cache[format_string]
+        try:
+            return self.format_string_cache[format_string]
+        except KeyError:
+            pass
+        if python2 and isinstance(format_string, str):
+            format_string = format_string.decode('utf-8')
+        tokens = list(re.finditer(self.reg_ex, format_string))
+        self.format_string_cache[format_string] = tokens
+        return tokens
 
     def get_placeholders(self, format_string):
         """
@@ -204,8 +230,44 @@ class Formatter:
 
         if block.parent:
             raise Exception('Block not closed')
+        # compile the blocks so they are quicker to render
+        first_block.compile()
         # add to the cache
         self.block_cache[format_string] = first_block
+        return first_block
+
+    def prepare(self, format_string):
+        """
+        Build and cache the blocks for a format string ahead of its first use.
+        Returns False if the format string is invalid.
+        """
+        if python2 and isinstance(format_string, str):
+            format_string = format_string.decode('utf-8')
+        if format_string in self.block_cache:
+            return True
+        try:
+            self.build_block(format_string)
+        except Exception:
+            return False
+        return True
+
+    @classmethod
+    def cache_stats(cls):
+        """
+        Return the statistics for the formatter caches.
+        """
+        return {
+            'blocks': cls.block_cache.stats(),
+            'tokens': cls.format_string_cache.stats(),
+        }
+
+    @classmethod
+    def set_cache_size(cls, size):
+        """
+        Set the maximum number of format strings held in each cache.
+        """
+        cls.block_cache.resize(size)
+        cls.format_string_cache.resize(size)
 
     def format(self, format_string, module=None, param_dict=None,
                force_composite=False, attr_getter=None):
@@ -222,10 +284,10 @@ class Formatter:
             param_dict = {}
 
         # if the processed format string is not in the cache then create it.
-        if format_string not in self.block_cache:
-            self.build_block(format_string)
-
-        first_block = self.block_cache[format_string]
+        try:
+            first_block = self.block_cache[format_string]
+        except KeyError:
+            first_block = self.build_block(format_string)
 
         def get_parameter(key):
             """
@@ -280,14 +342,28 @@ class Placeholder:
         self.key = key
         self.format = format
 
+        # work out how the value will need formatting now rather than each
+        # time the placeholder is rendered.
+        format = format or ''
+        self.missing = '{%s}' % key
+        self.numeric = format.startswith(':')
+        self.conversion = format.startswith('!')
+        self.to_ceil = 'ceil' in format
+        self.to_float = 'f' in format or 'g' in format
+        self.to_int = 'd' in format
+        if self.numeric:
+            self.template = u'{[%s]%s}' % (key, format)
+        else:
+            self.template = u'{%s%s}' % (key, format)
+
     def get(self, get_params, block):
         """
         return the correct value for the placeholder
         """
-        value = '{%s}' % self.key
+        value = self.missing
         try:
             value = value_ = get_params(self.key)
-            if self.format.startswith(':'):
+            if self.numeric:
                 # if a parameter has been set to be formatted as a numeric
                 # type then we see if we can coerce it to be.  This allows
                 # the user to format types that normally would not be
@@ -297,31 +373,27 @@ class Placeholder:
                 # no remaining digits following it.  If the parameter cannot
                 # be successfully converted then the format will be removed.
                 try:
-                    if 'ceil' in self.format:
+                    if self.to_ceil:
                         value = int(ceil(float(value)))
-                    if 'f' in self.format:
-                        value = float(value)
-                    if 'g' in self.format:
+                    if self.to_float:
                         value = float(value)
-                    if 'd' in self.format:
+                    if self.to_int:
                         value = int(float(value))
-                    output = u'{[%s]%s}' % (self.key, self.format)
-                    value = output.format({self.key: value})
+                    value = self.template.format({self.key: value})
                     value_ = float(value)
                 except ValueError:
                     pass
-            elif self.format.startswith('!'):
-                output = u'{%s%s}' % (self.key, self.format)
-                value = value_ = output.format(**{self.key: value})
+            elif self.conversion:
+                value = value_ = self.template.format(**{self.key: value})
 
             if block.parent is None:
                 valid = True
             elif block.commands.not_zero:
-                valid = value_ not in ['', 'None', None, False, '0', '0.0', 0, 0.0]
+                valid = value_ not in INVALID_VALUES_NOT_ZERO
             else:
                 # '', None, and False are ignored
                 # numbers like 0 and 0.0 are not.
-                valid = not (value_ in ['', 'None', None] or value_ is False)
+                valid = not (value_ in INVALID_VALUES or value_ is False)
             enough = False
         except:  # noqa e722
             # Exception raised when we don't have the param
@@ -512,8 +584,11 @@ class Block:
     def __init__(self, parent, base_block=None, py3_wrapper=None):
 
         self.base_block = base_block
+        self.color = None
+        self.color_names = None
         self.commands = BlockConfig(parent)
         self.content = []
+        self.instructions = []
         self.next_block = None
         self.parent = parent
         self.py3_wrapper = py3_wrapper
@@ -547,6 +622,40 @@ class Block:
                                 py3_wrapper=self.py3_wrapper)
         return self.next_block
 
+    def compile(self):
+        """
+        Compile the block and any sub blocks once they have been fully
+        parsed.  The content is turned into a flat list of (instruction,
+        value) tuples with neighbouring literals merged, and the names needed
+        to look up the color are created, so that rendering has less to do.
+        """
+        instructions = []
+        for item in self.content:
+            if isinstance(item, Literal):
+                if instructions and instructions[-1][0] == LITERAL:
+                    instructions[-1] = (LITERAL, instructions[-1][1] + item.text)
+                else:
+                    instructions.append((LITERAL, item.text))
+            elif isinstance(item, Placeholder):
+                instructions.append((PLACEHOLDER, item))
+            elif isinstance(item, Block):
+                item.compile()
+                instructions.append((BLOCK, item))
+        self.instructions = instructions
+
+        color = self.commands.color
+        if color and color[0] != '#':
+            color_name = 'color_%s' % color
+            self.color_names = (
+                color_name,
+                'color_threshold_%s' % color,
+                color_name.upper(),
+            )
+        self.color = color
+
+        if self.next_block:
+            self.next_block.compile()
+
     def __repr__(self):
         return '<Block %s>' % self.repr()
 
@@ -580,15 +689,15 @@ class Block:
         elif self.commands._if:
             valid = self.check_valid(get_params)
         if valid is not False:
-            for item in self.content:
-                if isinstance(item, Placeholder):
+            for instruction, item in self.instructions:
+                if instruction == PLACEHOLDER:
                     sub_valid, sub_output, enough = item.get(get_params, self)
                     output.append(sub_output)
-                elif isinstance(item, Literal):
+                elif instruction == LITERAL:
                     sub_valid = None
                     enough = True
-                    output.append(item.text)
-                elif isinstance(item, Block):
+                    output.append(item)
+                else:
                     sub_valid, sub_output = item.render(get_params, module)
                     if sub_valid is None:
                         output.append(sub_output)
@@ -607,15 +716,14 @@ class Block:
                 output = []
 
         # clean
-        color = self.commands.color
-        if color and color[0] != '#':
-            color_name = 'color_%s' % color
-            threshold_color_name = 'color_threshold_%s' % color
+        color = self.color
+        if self.color_names:
+            color_name, threshold_color_name, py3_color_name = self.color_names
             # substitute color
             color = (
                 getattr(module, color_name, None) or
                 getattr(module, threshold_color_name, None) or
-                getattr(module.py3, color_name.upper(), None)
+                getattr(module.py3, py3_color_name, None)
             )
 
         text = u''
@@ -625,16 +733,16 @@ class Block:
 
         # merge as much output as we can.
         # we need to convert values to unicode for concatination.
-        if python2:
-            conversion = unicode  # noqa
-            convertables = (str, bool, int, float, unicode)  # noqa
-        else:
-            conversion = str
-            convertables = (str, bool, int, float, bytes)
-
         first = True
         for index, item in enumerate(output):
-            if isinstance(item, convertables) or item is None:
+            # most items are simple types so check for those quickly
+            item_type = type(item)
+            if item_type is dict:
+                is_text = False
+            else:
+                is_text = (item_type in convertable_types or item is None or
+                           isinstance(item, convertables))
+            if is_text:
                 text += conversion(item)
                 continue
             elif text:
@@ -647,7 +755,10 @@ class Block:
                         part['color'] = color
                     out.append(part)
                 text = u''
-            if isinstance(item, Composite):
+            if item_type is dict:
+                if item:
+                    out.append(item)
+            elif isinstance(item, Composite):
                 if color:
                     item.composite_update(item, {'color': color}, soft=True)
                 out.extend(item.get_content())
@@ -0,0 +1,289 @@
+import json
+import os
+import select
+import socket
+import struct
+
+from subprocess import CalledProcessError, check_output
+from threading import Lock, Thread
+from time import sleep
+
+from py3status.exceptions import I3IPCError
+
+MAGIC = b'i3-ipc'
+
+# magic string, payload length and message type in native byte order
+HEADER = struct.Struct('=6sII')
+
+MESSAGE_TYPES = {
+    'command': 0,
+    'get_workspaces': 1,
+    'subscribe': 2,
+    'get_outputs': 3,
+    'get_tree': 4,
+    'get_marks': 5,
+    'get_bar_config': 6,
+    'get_version': 7,
+    'get_binding_modes': 8,
+    'get_config': 9,
+    'send_tick': 10,
+}
+
+# events have the highest bit of the message type set and are numbered in
+# this order
+EVENT_BIT = 1 << 31
+EVENT_TYPES = [
+    'workspace',
+    'output',
+    'mode',
+    'window',
+    'barconfig_update',
+    'binding',
+    'shutdown',
+    'tick',
+]
+
+# seconds to wait for a reply to a message
+MESSAGE_TIMEOUT = 5
+
+# seconds to wait before reconnecting the event connection, doubled on each
+# failure up to RECONNECT_MAX
+RECONNECT_DELAY = 1
+RECONNECT_MAX = 30
+
+
+def send(sock, msg_type, payload=''):
+    payload = payload.encode('utf-8')
+    sock.sendall(HEADER.pack(MAGIC, len(payload), msg_type) + payload)
+
+
+def receive_exactly(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise I3IPCError('i3 ipc connection closed')
+        data += chunk
+    return data
+
+
+def is_open(sock):
+    """
+    Check that the other end has not closed the connection, without reading
+    anything from it.
+    """
+    try:
+        if not select.select([sock], [], [], 0)[0]:
+            return True
+        return sock.recv(1, socket.MSG_PEEK) != b''
+    except (IOError, OSError):
+        return False
+
+
+def receive(sock):
+    """
+    Read a message and return its type and decoded payload.
+    """
+    magic, length, msg_type = HEADER.unpack(receive_exactly(sock, HEADER.size))
+    if magic != MAGIC:
+        raise I3IPCError('invalid i3 ipc message')
+    payload = receive_exactly(sock, length)
+    try:
+        return msg_type, json.loads(payload.decode('utf-8'))
+    except ValueError:
+        raise I3IPCError('invalid i3 ipc message')
+
+
+class I3IPC:
+    """
+    A client for the i3 IPC socket shared by all modules.
+
+    Messages are sent over one connection and replies are returned to the
+    caller.  Events are received over a second connection by a thread which
+    subscribes to all the event types that have been asked for and calls the
+    callbacks for each event.  The event connection is remade if it is lost eg
+    when i3 restarts.  The connection callbacks are called whenever events
+    start or stop being received.
+    """
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path
+        self.lock = Lock()
+        self.event_lock = Lock()
+        self.sock = None
+        self.event_sock = None
+        self.subscriptions = {}
+        self.connection_callbacks = []
+        self.subscribed = False
+        self.thread = None
+        self.stopped = False
+        self.events = 0
+        self.messages = 0
+        self.reconnects = 0
+
+    def get_socket_path(self):
+        if not self.socket_path:
+            path = os.environ.get('I3SOCK') or os.environ.get('SWAYSOCK')
+            if not path:
+                try:
+                    path = check_output(['i3', '--get-socketpath'])
+                except (CalledProcessError, OSError):
+                    raise I3IPCError('i3 ipc socket not found')
+                path = path.decode('utf-8').strip()
+            self.socket_path = path
+        return self.socket_path
+
+    def connect(self, timeout=None):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(self.get_socket_path())
+        except (IOError, OSError) as e:
+            sock.close()
+            raise I3IPCError('cannot connect to i3 ipc socket: {}'.format(e))
+        return sock
+
+    def message(self, msg_type, payload=''):
+        """
+        Send a message of the named type and return the decoded reply.
+        An I3IPCError is raised if i3 cannot be reached.
+        """
+        try:
+            type_id = MESSAGE_TYPES[msg_type]
+        except KeyError:
+            raise I3IPCError('unknown i3 ipc message type `{}`'.format(msg_type))
+        with self.lock:
+            if self.sock is not None and not is_open(self.sock):
+                # i3 has restarted since we last used the connection
+                self.sock.close()
+                self.sock = None
+            for attempt in range(2):
+                if self.sock is None:
+                    self.sock = self.connect(MESSAGE_TIMEOUT)
+                try:
+                    send(self.sock, type_id, payload)
+                    break
+                except (IOError, OSError) as e:
+                    # nothing was done so try again with a new connection
+                    self.sock.close()
+                    self.sock = None
+                    if attempt:
+                        raise I3IPCError('i3 ipc message failed: {}'.format(e))
+            try:
+                reply = receive(self.sock)[1]
+            except (IOError, OSError, I3IPCError) as e:
+                # i3 may have acted on the message eg a command so it is not
+                # sent again
+                self.sock.close()
+                self.sock = None
+                raise I3IPCError('i3 ipc message failed: {}'.format(e))
+            self.messages += 1
+        return reply
+
+    def subscribe(self, events, callback, connection_callback=None):
+        """
+        Call callback with the event type and data for each of the events.
+        connection_callback, if given, is called with no arguments when events
+        start or stop being received.
+        """
+        for event in events:
+            if event not in EVENT_TYPES:
+                raise I3IPCError('unknown i3 ipc event `{}`'.format(event))
+        with self.event_lock:
+            new = [x for x in events if x not in self.subscriptions]
+            for event in events:
+                self.subscriptions.setdefault(event, []).append(callback)
+            if connection_callback:
+                self.connection_callbacks.append(connection_callback)
+            if self.thread is None:
+                self.thread = Thread(target=self.listen)
+                self.thread.daemon = True
+                self.thread.start()
+            elif new and self.event_sock:
+                try:
+                    send(self.event_sock, MESSAGE_TYPES['subscribe'], json.dumps(new))
+                except (IOError, OSError):
+                    # the listening thread will reconnect and subscribe
+                    pass
+
+    def listen(self):
+        delay = RECONNECT_DELAY
+        while not self.stopped:
+            try:
+                sock = self.connect()
+                with self.event_lock:
+                    events = json.dumps(list(self.subscriptions))
+                    send(sock, MESSAGE_TYPES['subscribe'], events)
+                    self.event_sock = sock
+                delay = RECONNECT_DELAY
+                while True:
+                    msg_type, data = receive(sock)
+                    if msg_type & EVENT_BIT:
+                        self.dispatch(msg_type & ~EVENT_BIT, data)
+                    elif not self.subscribed:
+                        # the reply to our first subscribe message
+                        if not data.get('success'):
+                            raise I3IPCError('i3 ipc subscribe failed')
+                        self.set_subscribed(True)
+            except (IOError, OSError, I3IPCError):
+                pass
+            with self.event_lock:
+                if self.event_sock:
+                    self.event_sock.close()
+                    self.event_sock = None
+            self.set_subscribed(False)
+            if self.stopped:
+                break
+            self.reconnects += 1
+            sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX)
+
+    def set_subscribed(self, subscribed):
+        with self.event_lock:
+            if self.subscribed == subscribed:
+                return
+            self.subscribed = subscribed
+            callbacks = list(self.connection_callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def dispatch(self, index, data):
+        if index >= len(EVENT_TYPES):
+            return
+        event = EVENT_TYPES[index]
+        with self.event_lock:
+            self.events += 1
+            callbacks = list(self.subscriptions.get(event, []))
+        for callback in callbacks:
+            try:
+                callback(event, data)
+            except Exception:
+                # don't let a bad callback stop the events
+                pass
+
+    def stop(self):
+        self.stopped = True
+        with self.event_lock:
+            if self.event_sock:
+                try:
+                    self.event_sock.shutdown(socket.SHUT_RDWR)
+                except (IOError, OSError):
+                    pass
+        with self.lock:
+            if self.sock:
+                self.sock.close()
+                self.sock = None
+
+    def stats(self):
+        with self.event_lock:
+            return {
+                'connected': self.event_sock is not None,
+                'events': self.events,
+                'messages': self.messages,
+                'reconnects': self.reconnects,
+                'subscribed': self.subscribed,
+                'subscriptions': sum(map(len, self.subscriptions.values())),
+            }
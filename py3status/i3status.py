@@ -7,7 +7,7 @@ from subprocess import Popen
 from subprocess import PIPE
 from signal import SIGTSTP, SIGSTOP, SIGUSR1, SIG_IGN, signal
 from tempfile import NamedTemporaryFile
-from threading import Thread
+from threading import Lock, Thread
 from time import time
 
 from py3status.profiling import profile
@@ -264,7 +264,8 @@ class I3status(Thread):
             'tztime', 'volume', 'wireless'
         ]
         self.i3status_pipe = None
-        self.json_list = None
+        self.json_list_copy = None
+        self.json_list_lock = Lock()
         self.json_list_ts = None
         self.last_output = None
         self.last_refresh_ts = time()
@@ -315,25 +316,38 @@ class I3status(Thread):
         """
         Set the given i3status responses on their respective configuration.
         """
-        self.update_json_list()
         updates = []
-        for index, item in enumerate(self.json_list):
+        for index, item in enumerate(json_list):
             conf_name = self.py3_config['i3s_modules'][index]
 
             module = self.i3modules[conf_name]
             if module.update_from_item(item):
                 updates.append(conf_name)
+        self.update_json_list(json_list)
         if updates:
             self.py3_wrapper.notify_update(updates)
 
-    def update_json_list(self):
+    def update_json_list(self, json_list):
         """
-        Copy the last json list output from i3status so that any module
-        can modify it without altering the original output.
-        This is done so that any module's alteration of a i3status output json
-        will not be overwritten when the next i3status output gets polled.
+        Store the last json list output from i3status.  Any copy made for
+        legacy modules is now out of date.
         """
-        self.json_list = deepcopy(self.last_output)
+        with self.json_list_lock:
+            self.last_output = json_list
+            self.json_list_copy = None
+
+    @property
+    def json_list(self):
+        """
+        A copy of the last json list output from i3status, this is passed to
+        legacy modules as i3s_output_list.  It is a copy so that any module
+        can modify it without altering the original output.  The copy is only
+        made when a module asks for it.
+        """
+        with self.json_list_lock:
+            if self.json_list_copy is None and self.last_output is not None:
+                self.json_list_copy = deepcopy(self.last_output)
+            return self.json_list_copy
 
     @staticmethod
     def write_in_tmpfile(text, tmpfile):
@@ -445,7 +459,6 @@ class I3status(Thread):
                                 line = line[1:]
                             if line.startswith('[{'):
                                 json_list = loads(line)
-                                self.last_output = json_list
                                 self.set_responses(json_list)
                                 self.ready = True
                         else:
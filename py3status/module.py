@@ -6,9 +6,10 @@ from collections import OrderedDict
 from time import time
 from random import randint
 
+from py3status.async_loop import is_coroutine, is_coroutine_function
 from py3status.composite import Composite
 from py3status.py3 import Py3, PY3_CACHE_FOREVER, ModuleErrorException
-from py3status.profiling import profile
+from py3status.profiling import profile, ModuleStats
 from py3status.formatter import Formatter
 
 # basestring does not exist in python3
@@ -45,6 +46,7 @@ class Module:
         self.has_kill = False
         self.i3status_thread = py3_wrapper.i3status_thread
         self.last_output = []
+        self.output_changed = False
         self.methods = OrderedDict()
         self.module_class = instance
         self.module_full_name = module
@@ -54,6 +56,7 @@ class Module:
         self.nagged = False
         self.prevent_refresh = False
         self.sleeping = False
+        self.stats = ModuleStats()
         self.terminated = False
         self.testing = self.config.get('testing')
         self.urgent = False
@@ -152,8 +155,23 @@ class Module:
                 msg = 'Exception in `%s` post_config_hook()' % self.module_full_name
                 self._py3_wrapper.report_exception(msg, notify_user=False)
                 self._py3_wrapper.log('terminating module %s' % self.module_full_name)
+        if not self.terminated:
+            self.prepare_formats()
         self.enabled = True
 
+    def prepare_formats(self):
+        """
+        Build the module's format strings now so that the first update does
+        not have to parse them.
+        """
+        formatter = Formatter()
+        for name in dir(self.module_class):
+            if not name.startswith('format'):
+                continue
+            value = getattr(self.module_class, name, None)
+            if isinstance(value, basestring):
+                formatter.prepare(value)
+
     def runtime_error(self, msg, method):
         """
         Show the error in the bar
@@ -202,7 +220,7 @@ class Module:
             if method_affected and method['method'] != method_affected:
                 continue
 
-            method['last_output'] = [error]
+            self.set_method_output(method, [error])
 
         self.allow_config_clicks = False
         self.set_updated()
@@ -212,7 +230,7 @@ class Module:
         hide the module in the i3bar
         """
         for method in self.methods.values():
-            method['last_output'] = {}
+            self.set_method_output(method, {})
 
         self.allow_config_clicks = False
         self.error_hide = True
@@ -266,12 +284,26 @@ class Module:
         # restart
         self._py3_wrapper.timeout_queue_add(self, self.cache_time)
 
+    def set_method_output(self, method, output):
+        """
+        Store the output of a method noting if it has changed.
+        Returns True if the output changed.
+        """
+        if output != method.get('last_output'):
+            method['last_output'] = output
+            self.output_changed = True
+            return True
+        return False
+
     def set_updated(self):
         """
         Mark the module as updated.
-        We check if the actual content has changed and if so we trigger an
-        update in py3status.
+        If the output of any method has changed then the module output is
+        rebuilt and we trigger an update in py3status.
         """
+        if not self.output_changed:
+            return
+        self.output_changed = False
         # get latest output
         output = []
         for method in self.methods.values():
@@ -286,18 +318,17 @@ class Module:
                     if self.testing:
                         data['cached_until'] = method.get('cached_until')
                     output.append(data)
-        # if changed store and force display update.
-        if output != self.last_output:
-            # has the modules output become urgent?
-            # we only care the update that this happens
-            # not any after then.
-            urgent = True in [x.get('urgent') for x in output]
-            if urgent != self.urgent:
-                self.urgent = urgent
-            else:
-                urgent = False
-            self.last_output = output
-            self._py3_wrapper.notify_update(self.module_full_name, urgent)
+        # store and force display update.
+        # has the modules output become urgent?
+        # we only care the update that this happens
+        # not any after then.
+        urgent = True in [x.get('urgent') for x in output]
+        if urgent != self.urgent:
+            self.urgent = urgent
+        else:
+            urgent = False
+        self.last_output = output
+        self._py3_wrapper.notify_update(self.module_full_name, urgent)
 
     def get_latest(self):
         """
@@ -678,7 +709,11 @@ class Module:
                             method_obj = {
                                 'cached_until': time(),
                                 'call_type': params_type,
+                                'future': None,
                                 'instance': None,
+                                'is_async': is_coroutine_function(
+                                    getattr(class_inst, method)
+                                ),
                                 'last_output': {
                                     'name': method,
                                     'full_text': ''
@@ -721,11 +756,16 @@ class Module:
                 click_method = getattr(self.module_class, 'on_click')
                 if self.click_events == self.PARAMS_NEW:
                     # new style modules
-                    click_method(event)
+                    result = click_method(event)
                 else:
                     # legacy modules had extra parameters passed
-                    click_method(self.i3status_thread.json_list,
-                                 self.config['py3_config']['general'], event)
+                    result = click_method(self.i3status_thread.json_list,
+                                          self.config['py3_config']['general'],
+                                          event)
+                if is_coroutine(result):
+                    # async on_click runs on the loop, the module is updated
+                    # again once it is done
+                    Py3._async_loop.run(result, self.click_done)
                 self.set_updated()
             else:
                 # nothing has happened so no need for refresh
@@ -744,6 +784,14 @@ class Module:
         """
         if self._py3_wrapper.running:
             cache_time = None
+            # record how late we are compared to when the module was due
+            start_time = time()
+            due = [
+                x['cached_until'] for x in self.methods.values()
+                if 0 < x['cached_until'] <= start_time
+            ]
+            if due:
+                self.stats.run_started(start_time - min(due))
             # execute each method of this module
             for meth, obj in self.methods.items():
                 my_method = self.methods[meth]
@@ -752,8 +800,15 @@ class Module:
                 if not self._py3_wrapper.running:
                     break
 
+                # async methods run on the loop and the module is run again
+                # when they are done
+                future = my_method['future']
+                if future and not future.done():
+                    continue
+
                 # respect the cache set for this method
-                if time() < obj['cached_until']:
+                method_start = time()
+                if not future and method_start < obj['cached_until']:
                     if not cache_time or obj['cached_until'] < cache_time:
                         cache_time = obj['cached_until']
                     continue
@@ -761,7 +816,17 @@ class Module:
                 try:
                     # execute method and get its output
                     method = getattr(self.module_class, meth)
-                    if my_method['call_type'] == self.PARAMS_NEW:
+                    if future:
+                        my_method['future'] = None
+                        method_start = my_method['async_start']
+                        response = future.result()
+                    elif my_method['is_async']:
+                        my_method['async_start'] = method_start
+                        my_method['future'] = Py3._async_loop.run(
+                            method(), self.async_done
+                        )
+                        continue
+                    elif my_method['call_type'] == self.PARAMS_NEW:
                         # new style modules
                         response = method()
                     else:
@@ -825,9 +890,12 @@ class Module:
 
                     # update method object output
                     if 'composite' in response:
-                        my_method['last_output'] = result['composite']
+                        changed = self.set_method_output(
+                            my_method, result['composite']
+                        )
                     else:
-                        my_method['last_output'] = result
+                        changed = self.set_method_output(my_method, result)
+                    duration = time() - method_start
 
                     # debug info
                     if self.config['debug']:
@@ -841,9 +909,13 @@ class Module:
 
                     # mark module as updated
                     self.set_updated()
+                    self.stats.method_run(meth, duration, changed=changed)
 
                 except ModuleErrorException as e:
                     # module has indicated that it has an error
+                    self.stats.method_run(
+                        meth, time() - method_start, error=True
+                    )
                     self.runtime_error(e.msg, meth)
                     if e.timeout:
                         if e.timeout is PY3_CACHE_FOREVER:
@@ -856,6 +928,9 @@ class Module:
                                                       self.config['cache_timeout'])
 
                 except Exception as e:
+                    self.stats.method_run(
+                        meth, time() - method_start, error=True
+                    )
                     msg = 'Instance `{}`, user method `{}` failed'
                     msg = msg.format(self.module_full_name, meth)
                     if not self.testing:
@@ -879,6 +954,26 @@ class Module:
 
             self._py3_wrapper.timeout_queue_add(self, cache_time)
 
+    def async_done(self, future):
+        """
+        An async method has finished so run the module to process its output.
+        """
+        self._py3_wrapper.timeout_queue_add(self)
+
+    def click_done(self, future):
+        """
+        An async on_click has finished so report any error and refresh the
+        module unless it called py3.prevent_refresh().
+        """
+        try:
+            future.result()
+        except Exception:
+            msg = 'on_click event in `{}` failed'.format(self.module_full_name)
+            self._py3_wrapper.report_exception(msg)
+        self.set_updated()
+        if not self.prevent_refresh:
+            self.force_update()
+
     def kill(self):
         # check and execute the 'kill' method if present
         if self.has_kill:
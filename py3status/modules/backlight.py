@@ -13,7 +13,8 @@ Configuration parameters:
         (default 5)
     button_up: Button to click to increase brightness. Setting to 0 disables.
         (default 4)
-    cache_timeout: How often we refresh this module in seconds (default 10)
+    cache_timeout: How often we refresh this module in seconds if the
+        brightness cannot be watched for changes (default 10)
     command: The program to use to change the backlight.
         Currently xbacklight and light are supported. The program needs
         to be installed and on your path.
@@ -119,6 +120,8 @@ class Py3status:
         if self.command_available and self.brightness_initial:
             self._set_backlight_level(self.brightness_initial)
 
+        self.watched = self.py3.watch_file('%s/brightness' % self.device)
+
     def on_click(self, event):
         if not self.command_available:
             return None
@@ -164,8 +167,13 @@ class Py3status:
             level = self._get_backlight_level()
             full_text = self.py3.safe_format(self.format, {'level': level})
 
+        if self.watched:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         response = {
-            'cached_until': self.py3.time_in(self.cache_timeout),
+            'cached_until': cached_until,
             'full_text': full_text
         }
         return response
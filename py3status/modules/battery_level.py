@@ -259,24 +259,11 @@ class Py3status:
         Only available in kernel 2.6.24(?) and newer. Before kernel provided
         a similar, yet incompatible interface in /proc
         """
-        def _parse_battery_info(sys_path):
-            """
-            Extract battery information from uevent file, already convert to
-            int if necessary
-            """
-            raw_values = {}
-            with open(os.path.join(sys_path, u"uevent")) as f:
-                for var in f.read().splitlines():
-                    k, v = var.split("=")
-                    try:
-                        raw_values[k] = int(v)
-                    except ValueError:
-                        raw_values[k] = v
-            return raw_values
-
         battery_list = []
         for path in iglob(os.path.join(self.sys_battery_path, "BAT*")):
-            r = _parse_battery_info(path)
+            # battery information from the uevent file, converted to int
+            # where possible
+            r = self.py3.sample_file(os.path.join(path, u"uevent"), "uevent")
 
             capacity = r.get("POWER_SUPPLY_ENERGY_FULL", r.get("POWER_SUPPLY_CHARGE_FULL"))
             present_rate = r.get("POWER_SUPPLY_POWER_NOW",
@@ -11,8 +11,7 @@ Format placeholders:
 
 Requires:
     clementine: a modern music player and library organizer
-    qdbus: a communication-interface for qt-based applications
-        (may be part of qt5-tools)
+    pydbus: python library module
 
 @author Francois LASSERRE <choiz@me.com>
 @license GNU GPL https://www.gnu.org/licenses/gpl.html
@@ -21,7 +20,8 @@ SAMPLE OUTPUT
 {'full_text': '♫ Music For Programming - Hivemind'}
 """
 
-CMD = 'qdbus org.mpris.clementine /TrackList org.freedesktop.MediaPlayer'
+SERVICE_BUS = 'org.mpris.clementine'
+TRACKLIST_PATH = '/TrackList'
 STRING_NOT_INSTALLED = 'not installed'
 INTERNET_RADIO = 'Internet Radio'
 
@@ -38,24 +38,21 @@ class Py3status:
             raise Exception(STRING_NOT_INSTALLED)
 
     def clementine(self):
-        artist = lines = now_playing = title = ''
+        now_playing = ''
         internet_radio = False
 
         try:
-            track_id = self.py3.command_output(CMD + '.GetCurrentTrack')
-            metadata = self.py3.command_output(CMD + '.GetMetadata {}'.format(track_id))
-            lines = filter(None, metadata.splitlines())
-        except self.py3.CommandError:
+            tracklist = self.py3.dbus_get(SERVICE_BUS, TRACKLIST_PATH)
+            metadata = tracklist.GetMetadata(tracklist.GetCurrentTrack())
+        except Exception:
+            # clementine is not running
             return {
                 'cached_until': self.py3.time_in(self.cache_timeout),
                 'full_text': ''
             }
 
-        for item in lines:
-            if 'artist' in item:
-                artist = item[8:]
-            if 'title' in item:
-                title = item[7:]
+        artist = metadata.get('artist', '')
+        title = metadata.get('title', '')
 
         if '.mp3' in title or '.wav' in title:
             title = title[:-4]
@@ -55,7 +55,8 @@ SAMPLE OUTPUT
 """
 
 from __future__ import division  # python2 compatibility
-from time import time
+
+import os
 
 
 class Py3status:
@@ -84,23 +85,25 @@ class Py3status:
             unit - unit (string)
         """
         self.last_interface = None
-        self.last_stat = self._get_io_stats(self.disk)
-        self.last_time = time()
+        self.last_time, self.last_stat = self._get_io_stats(self.disk)
 
     def space_and_io(self):
         self.values = {'disk': self.disk if self.disk else 'all'}
 
         if self.py3.format_contains(self.format, ['read', 'write', 'total']):
             # time from previous check
-            ios = self._get_io_stats(self.disk)
-            timedelta = time() - self.last_time
+            sample_time, ios = self._get_io_stats(self.disk)
+            if sample_time <= self.last_time:
+                # we already have this read of the file so get a new one
+                sample_time, ios = self._get_io_stats(self.disk, max_age=0)
+            timedelta = sample_time - self.last_time
 
             read = ios[0] - self.last_stat[0]
             write = ios[1] - self.last_stat[1]
 
             # update last_ info
-            self.last_stat = self._get_io_stats(self.disk)
-            self.last_time = time()
+            self.last_stat = ios
+            self.last_time = sample_time
 
             read /= timedelta
             write /= timedelta
@@ -135,46 +138,86 @@ class Py3status:
         if disk and not disk.startswith('/dev/'):
             disk = '/dev/' + disk
 
+        try:
+            devices = self._get_free_space_native(disk)
+        except (IOError, OSError):
+            devices = self._get_free_space_df(disk)
+
         total = 0
         used = 0
         free = 0
-        devs = []
-
-        df = self.py3.command_output('df')
-        for line in df.splitlines():
-            if (disk and line.startswith(disk)) or (disk is None and line.startswith('/dev/')):
-                data = line.split()
-                if data[0] in devs:
-                    # Make sure to count each block device only one time
-                    # some filesystems eg btrfs have multiple entries
-                    continue
-                total += int(data[1]) / 1024 / 1024
-                used += int(data[2]) / 1024 / 1024
-                free += int(data[3]) / 1024 / 1024
-                devs.append(data[0])
+        for device_total, device_used, device_free in devices.values():
+            total += device_total
+            used += device_used
+            free += device_free
 
         if total == 0:
             return free, used, 'err', total
 
         return free, used, 100 * used / total, total
 
-    def _get_io_stats(self, disk):
+    def _get_free_space_native(self, disk):
+        """
+        Sizes in GB of the mounted devices from the kernel's mount table and
+        statvfs, without running df.  Mounts that cannot be read are skipped.
+        """
+        devices = {}
+        for device, mount_point, fs_type in self.py3.sample_file(
+                '/proc/self/mounts', 'mounts'):
+            if (disk and device.startswith(disk)) or (
+                    disk is None and device.startswith('/dev/')):
+                if device in devices:
+                    # Make sure to count each block device only one time
+                    # some filesystems eg btrfs have multiple entries
+                    continue
+                try:
+                    stat = os.statvfs(mount_point)
+                except (IOError, OSError):
+                    # eg another user's mount that we cannot access
+                    continue
+                devices[device] = (
+                    stat.f_blocks * stat.f_frsize / 1024 ** 3,
+                    (stat.f_blocks - stat.f_bfree) * stat.f_frsize / 1024 ** 3,
+                    stat.f_bavail * stat.f_frsize / 1024 ** 3,
+                )
+        return devices
+
+    def _get_free_space_df(self, disk):
+        devices = {}
+        df = self.py3.command_output('df')
+        for line in df.splitlines():
+            if (disk and line.startswith(disk)) or (disk is None and line.startswith('/dev/')):
+                data = line.split()
+                if data[0] in devices:
+                    continue
+                devices[data[0]] = (
+                    int(data[1]) / 1024 / 1024,
+                    int(data[2]) / 1024 / 1024,
+                    int(data[3]) / 1024 / 1024,
+                )
+        return devices
+
+    def _get_io_stats(self, disk, max_age=None):
+        """
+        The time /proc/diskstats was read and the bytes read and written.
+        """
         if disk and disk.startswith('/dev/'):
             disk = disk[5:]
         read = 0
         write = 0
-        with open('/proc/diskstats', 'r') as fd:
-            for line in fd:
-                data = line.split()
-                if disk:
-                    if data[2] == disk:
-                        read += int(data[5]) * self.sector_size
-                        write += int(data[9]) * self.sector_size
-                else:
-                    if data[1] == '0':
-                        read += int(data[5]) * self.sector_size
-                        write += int(data[9]) * self.sector_size
-        return read, write
+        sample_time, lines = self.py3.sample_file(
+            '/proc/diskstats', 'lines', max_age=max_age, timestamp=True
+        )
+        for data in lines:
+            if disk:
+                if data[2] == disk:
+                    read += int(data[5]) * self.sector_size
+                    write += int(data[9]) * self.sector_size
+            else:
+                if data[1] == '0':
+                    read += int(data[5]) * self.sector_size
+                    write += int(data[9]) * self.sector_size
+        return sample_time, (read, write)
 
     def _format_rate(self, value):
         """
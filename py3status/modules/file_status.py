@@ -3,7 +3,9 @@
 Display if files or directories exists.
 
 Configuration parameters:
-    cache_timeout: refresh interval for this module (default 10)
+    cache_timeout: refresh interval for this module, only used if the paths
+        cannot be watched for changes eg they contain wildcard directories
+        (default 10)
     format: display format for this module
         (default '\?color=path [\?if=path ●|■]')
     format_path: format for paths (default '{basename}')
@@ -53,7 +55,7 @@ missing
 """
 
 from glob import glob
-from os.path import basename, expanduser
+from os.path import basename, dirname, expanduser
 
 STRING_NO_PATHS = 'missing paths'
 
@@ -112,6 +114,16 @@ class Py3status:
             self.paths = [self.paths]
         self.paths = list(map(expanduser, self.paths))
 
+        # watch the directories of the paths so that we update when matching
+        # files come and go.  wildcard directories cannot be watched.
+        self.watched = True
+        for path in self.paths:
+            directory = dirname(path) or '.'
+            if any(x in directory for x in '*?['):
+                self.watched = False
+            elif not self.py3.watch_file(directory):
+                self.watched = False
+
         self.init = {'format_path': []}
         if self.py3.format_contains(self.format, 'format_path'):
             self.init['format_path'] = self.py3.get_placeholders_list(
@@ -151,9 +163,13 @@ class Py3status:
             self.py3.threshold_get_color(count_path, 'path')
             self.py3.threshold_get_color(count_path, 'paths')
 
+        if self.watched:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         return {
-            'cached_until':
-            self.py3.time_in(self.cache_timeout),
+            'cached_until': cached_until,
             'full_text':
             self.py3.safe_format(
                 self.format, {
@@ -123,9 +123,9 @@ class Py3status:
             else:
                 self.format = '{repo} {issues}/{pull_requests}'
 
-    def _github_count(self, url):
+    def _count_request(self, url):
         """
-        Get counts for requests that return 'total_count' in the json response.
+        Request for counts that return 'total_count' in the json response.
         """
         url = self.url_api + url + '&per_page=1'
         # if we have authentication details use them as we get better
@@ -134,9 +134,13 @@ class Py3status:
             auth = (self.username, self.auth_token)
         else:
             auth = None
-        try:
-            info = self.py3.request(url, timeout=10, auth=auth)
-        except (self.py3.RequestException):
+        return {'url': url, 'timeout': 10, 'auth': auth, 'cache': True}
+
+    def _github_count(self, info):
+        """
+        Get the count from a count request response.
+        """
+        if isinstance(info, self.py3.RequestException):
             return
         if info and info.status_code == 200:
             return(int(info.json()['total_count']))
@@ -146,9 +150,22 @@ class Py3status:
                 self.repo_warning = True
         return '?'
 
-    def _notifications(self):
+    def _notifications_request(self):
+        """
+        Request for the unread notifications.
+        """
+        if self.notifications == 'all' or not self.repo:
+            url = self.url_api + '/notifications'
+        else:
+            url = self.url_api + '/repos/' + self.repo + '/notifications'
+        url += '?per_page=100'
+        return {'url': url, 'timeout': 10,
+                'auth': (self.username, self.auth_token), 'cache': True}
+
+    def _notifications(self, info):
         """
-        Get the number of unread notifications.
+        Get the number of unread notifications from the notifications
+        request response.
         """
         if not self.username or not self.auth_token:
             if not self.notification_warning:
@@ -156,15 +173,7 @@ class Py3status:
                                      'auth_token to check notifications.')
                 self.notification_warning = True
             return '?'
-        if self.notifications == 'all' or not self.repo:
-            url = self.url_api + '/notifications'
-        else:
-            url = self.url_api + '/repos/' + self.repo + '/notifications'
-        url += '?per_page=100'
-        try:
-            info = self.py3.request(url, timeout=10,
-                                    auth=(self.username, self.auth_token))
-        except (self.py3.RequestException):
+        if isinstance(info, self.py3.RequestException):
             return
         if info.status_code == 200:
             links = info.headers.get('Link')
@@ -183,7 +192,8 @@ class Py3status:
                 return len(info.json())
             try:
                 last_page_info = self.py3.request(last_url, timeout=10,
-                                                  auth=(self.username, self.auth_token))
+                                                  auth=(self.username, self.auth_token),
+                                                  cache=True)
             except self.py3.RequestException:
                 return
 
@@ -197,19 +207,36 @@ class Py3status:
     def github(self):
         status = {}
         urgent = False
-        # issues
+        # make all the requests at the same time
+        requests = {}
         if self.repo and self.py3.format_contains(self.format, 'issues'):
-            url = '/search/issues?q=state:open+type:issue+repo:' + self.repo
-            self._issues = self._github_count(url) or self._issues
+            requests['issues'] = self._count_request(
+                '/search/issues?q=state:open+type:issue+repo:' + self.repo
+            )
+        if self.repo and self.py3.format_contains(self.format, 'pull_requests'):
+            requests['pull_requests'] = self._count_request(
+                '/search/issues?q=state:open+type:pr+repo:' + self.repo
+            )
+        notifications = self.py3.format_contains(self.format, 'notifications*')
+        if notifications and self.username and self.auth_token:
+            requests['notifications'] = self._notifications_request()
+        names = list(requests)
+        responses = dict(zip(
+            names, self.py3.request_many([requests[x] for x in names])
+        ))
+        # issues
+        if 'issues' in responses:
+            self._issues = self._github_count(responses['issues']) or self._issues
         status['issues'] = self._issues
         # pull requests
-        if self.repo and self.py3.format_contains(self.format, 'pull_requests'):
-            url = '/search/issues?q=state:open+type:pr+repo:' + self.repo
-            self._pulls = self._github_count(url) or self._pulls
+        if 'pull_requests' in responses:
+            self._pulls = (
+                self._github_count(responses['pull_requests']) or self._pulls
+            )
         status['pull_requests'] = self._pulls
         # notifications
-        if self.py3.format_contains(self.format, 'notifications*'):
-            count = self._notifications()
+        if notifications:
+            count = self._notifications(responses.get('notifications'))
             # if we don't have a notification count, then use the last value
             # that we did have.
             if count is None:
@@ -120,7 +120,8 @@ class Py3status:
     def _get_data(self, url):
         try:
             return self.py3.request(
-                url, timeout=self.request_timeout, headers=self.headers)
+                url, timeout=self.request_timeout, headers=self.headers,
+                cache=True)
         except self.py3.RequestException:
             return {}
 
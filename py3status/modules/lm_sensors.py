@@ -253,7 +253,10 @@ class Py3status:
             self.thresholds_man.remove('auto.input')
 
     def _get_lm_sensors_data(self):
-        return json_loads(self.py3.command_output(self.sensors_command))
+        # share the output between instances of the module
+        return json_loads(
+            self.py3.command_output(self.sensors_command, max_age=1)
+        )
 
     def lm_sensors(self):
         lm_sensors_data = self._get_lm_sensors_data()
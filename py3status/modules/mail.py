@@ -6,7 +6,8 @@ This module supports Maildir, mbox, MH, Babyl, MMDF, and IMAP.
 Configuration parameters:
     accounts: specify a dict consisting of mailbox types and a list of dicts
         consisting of mailbox settings and/or paths to use (default {})
-    cache_timeout: refresh interval for this module (default 60)
+    cache_timeout: refresh interval for this module, local mailboxes are
+        watched for changes so this is only needed for IMAP (default 60)
     format: display format for this module
         (default '\?not_zero Mail {mail}|No Mail')
     thresholds: specify color thresholds to use (default [])
@@ -136,7 +137,7 @@ no_mail
 
 import mailbox
 from imaplib import IMAP4_SSL
-from os.path import exists, expanduser, expandvars
+from os.path import exists, expanduser, expandvars, join
 STRING_MISSING = 'missing {} {}'
 
 
@@ -185,6 +186,21 @@ class Py3status:
                             self.mailboxes[mail].append(account)
                             break
 
+        # local mailboxes are watched so we update as soon as they change,
+        # imap accounts still need to be checked every cache_timeout.
+        self.watched = 'imap' not in self.mailboxes
+        for mail, accounts in self.mailboxes.items():
+            for account in accounts:
+                if mail == 'imap':
+                    continue
+                if mail == 'maildir':
+                    paths = [join(account['path'], x) for x in ('new', 'cur')]
+                else:
+                    paths = [account['path']]
+                for path in paths:
+                    if not self.py3.watch_file(path):
+                        self.watched = False
+
         self.thresholds_init = self.py3.get_color_names_list(self.format)
 
     def mail(self):
@@ -217,8 +233,13 @@ class Py3status:
             if x in mail_data:
                 self.py3.threshold_get_color(mail_data[x], x)
 
+        if self.watched:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         response = {
-            'cached_until': self.py3.time_in(self.cache_timeout),
+            'cached_until': cached_until,
             'full_text': self.py3.safe_format(self.format, mail_data)
         }
         if mail_data['urgent']:
@@ -111,16 +111,12 @@ SAMPLE OUTPUT
 
 from datetime import timedelta
 from time import time
-from gi.repository import GObject
-from gi.repository.GLib import GError
-from threading import Thread
 import re
-import sys
-from pydbus import SessionBus
 
 
 SERVICE_BUS = 'org.mpris.MediaPlayer2'
 SERVICE_BUS_URL = '/org/mpris/MediaPlayer2'
+SERVICE_PLAYER = SERVICE_BUS + '.Player'
 
 WORKING_STATES = ['Playing', 'Paused', 'Stopped']
 
@@ -161,7 +157,6 @@ class Py3status:
     state_stop = u'◾'
 
     def post_config_hook(self):
-        self._dbus = None
         self._data = {}
         self._control_states = {}
         self._kill = False
@@ -170,9 +165,9 @@ class Py3status:
         self._mpris_name_index = {}
         self._player = None
         self._player_details = {}
+        self._player_id = None
         self._tries = 0
         # start last
-        self._dbus = SessionBus()
         self._start_listener()
         self._states = {
             'pause': {
@@ -218,18 +213,20 @@ class Py3status:
             return
 
         try:
-            self._data['player'] = self._player.Identity
-            playback_status = self._player.PlaybackStatus
+            self._data['player'] = self._get_property('Identity', SERVICE_BUS)
+            playback_status = self._get_property('PlaybackStatus')
             self._data['state'] = self._get_state(playback_status)
-            metadata = self._player.Metadata
+            metadata = self._get_property('Metadata')
             self._update_metadata(metadata)
         except Exception:
             self._data['error_occurred'] = True
 
     def _get_button_state(self, control_state):
         try:
-            # Workaround: The last parameter returns True for the Stop button.
-            clickable = getattr(self._player, control_state['clickable'], True)
+            # Workaround: Stop has no property so is always clickable.
+            clickable = True
+            if control_state['clickable'] != 'True':
+                clickable = self._get_property(control_state['clickable'])
         except Exception:
             clickable = False
 
@@ -243,6 +240,16 @@ class Py3status:
 
         return clickable
 
+    def _get_property(self, name, interface=SERVICE_PLAYER, player_id=None,
+                      cache=True):
+        """
+        Get a property of the player, by default the current one.
+        """
+        return self.py3.dbus_property(
+            player_id or self._player_id, SERVICE_BUS_URL, interface, name,
+            cache=cache
+        )
+
     def _get_state(self, playback_status):
         if playback_status == 'Playing':
             return PLAYING
@@ -269,7 +276,8 @@ class Py3status:
             color = self.py3.COLOR_BAD
 
         try:
-            ptime_ms = self._player.Position
+            # the position changes without any signal so is not cached
+            ptime_ms = self._get_property('Position', cache=False)
             ptime = _get_time_str(ptime_ms)
         except Exception:
             ptime = None
@@ -319,23 +327,12 @@ class Py3status:
 
         return response
 
-    def _start_loop(self):
-        self._loop = GObject.MainLoop()
-        GObject.timeout_add(1000, self._timeout)
-        try:
-            self._loop.run()
-        except KeyboardInterrupt:
-            # This branch is only needed for the test mode
-            self._kill = True
-
-    def _name_owner_changed(self, *args):
-        player_id = args[5][0]
-        player_add = args[5][2]
-        player_remove = args[5][1]
-        if player_add:
-            self._add_player(player_id)
+    def _name_owner_changed(self, sender, path, interface, member, args):
+        player_id, player_remove, player_add = args
         if player_remove:
             self._remove_player(player_id)
+        if player_add:
+            self._add_player(player_id)
         self._set_player()
 
     def _set_player(self):
@@ -372,30 +369,19 @@ class Py3status:
 
         self._player = top_player.get('_dbus_player')
         self._player_details = top_player
+        self._player_id = top_player.get('_id')
 
         self.py3.update()
 
     def _player_monitor(self, player_id):
-        def player_on_change(*args):
+        def player_on_change(sender, path, interface, member, args):
             """
             Monitor a player and update its status.
             """
-            data = args[1]
-            status = data.get('PlaybackStatus')
-            if status:
-                player = self._mpris_players[player_id]
-
-                # Note: Workaround. Since all players get noted if playback status
-                #       has been changed we have to check if we are the choosen one
-                try:
-                    dbus_status = player['_dbus_player'].PlaybackStatus
-                except GError:
-                    # Prevent errors when calling methods of deleted dbus objects
-                    return
-                if status != dbus_status:
-                    # FIXME: WE DON'T RECOGNIZE ANY TITLE CHANGE
-                    return
-
+            # signals are only routed to us from this player
+            status = args[1].get('PlaybackStatus')
+            player = self._mpris_players.get(player_id)
+            if status and player:
                 player['status'] = status
                 player['_state_priority'] = WORKING_STATES.index(status)
             self._set_player()
@@ -408,16 +394,16 @@ class Py3status:
         if not player_id.startswith(SERVICE_BUS):
             return False
 
-        player = self._dbus.get(player_id, SERVICE_BUS_URL)
+        player = self.py3.dbus_get(player_id, SERVICE_BUS_URL)
+        identity = self._get_property('Identity', SERVICE_BUS, player_id)
 
-        if player.Identity not in self._mpris_names:
-            self._mpris_names[player.Identity] = player_id.split('.')[-1]
+        if identity not in self._mpris_names:
+            self._mpris_names[identity] = player_id.split('.')[-1]
             for p in self._mpris_players.values():
                 if not p['name'] and p['identity'] in self._mpris_names:
                     p['name'] = self._mpris_names[p['identity']]
                     p['full_name'] = u'{} {}'.format(p['name'], p['index'])
 
-        identity = player.Identity
         name = self._mpris_names.get(identity)
         if self.player_priority != [] and name not in self.player_priority \
                 and '*' not in self.player_priority:
@@ -426,11 +412,17 @@ class Py3status:
         if identity not in self._mpris_name_index:
             self._mpris_name_index[identity] = 0
 
-        status = player.PlaybackStatus
+        status = self._get_property('PlaybackStatus', player_id=player_id)
         state_priority = WORKING_STATES.index(status)
         index = self._mpris_name_index[identity]
         self._mpris_name_index[identity] += 1
-        subscription = player.PropertiesChanged.connect(self._player_monitor(player_id))
+        subscription = self.py3.dbus_subscribe(
+            self._player_monitor(player_id),
+            sender=player_id,
+            interface='org.freedesktop.DBus.Properties',
+            member='PropertiesChanged',
+            object_path=SERVICE_BUS_URL,
+        )
 
         self._mpris_players[player_id] = {
             '_dbus_player': player,
@@ -453,35 +445,25 @@ class Py3status:
         player = self._mpris_players.get(player_id)
         if player:
             if player.get('subscription'):
-                player['subscription'].disconnect()
+                self.py3.dbus_unsubscribe(player['subscription'])
             del self._mpris_players[player_id]
 
     def _get_players(self):
-        bus = self._dbus.get('org.freedesktop.DBus')
+        bus = self.py3.dbus_get('org.freedesktop.DBus')
         for player in bus.ListNames():
             self._add_player(player)
 
         self._set_player()
 
     def _start_listener(self):
-        self._dbus.con.signal_subscribe(
-            None,
-            'org.freedesktop.DBus',
-            'NameOwnerChanged',
-            None,
-            None,
-            0,
+        # the D-Bus connection and main loop are shared with other modules
+        self._name_subscription = self.py3.dbus_subscribe(
             self._name_owner_changed,
+            sender='org.freedesktop.DBus',
+            interface='org.freedesktop.DBus',
+            member='NameOwnerChanged',
         )
         self._get_players()
-        t = Thread(target=self._start_loop)
-        t.daemon = True
-        t.start()
-
-    def _timeout(self):
-        if self._kill:
-            self._loop.quit()
-            sys.exit(0)
 
     def _update_metadata(self, metadata):
         is_stream = False
@@ -515,6 +497,9 @@ class Py3status:
 
     def kill(self):
         self._kill = True
+        self.py3.dbus_unsubscribe(self._name_subscription)
+        for player_id in list(self._mpris_players):
+            self._remove_player(player_id)
 
     def mpris(self):
         """
@@ -54,7 +54,6 @@ SAMPLE OUTPUT
 """
 
 from __future__ import division  # python2 compatibility
-from time import time
 
 
 class Py3status:
@@ -109,15 +108,17 @@ class Py3status:
         self._value_formats = values
         # last
         self.last_interface = None
-        self.last_stat = self._get_stat()
-        self.last_time = time()
+        self.last_time, self.last_stat = self._get_stat()
 
     def currentSpeed(self):
-        ns = self._get_stat()
+        sample_time, ns = self._get_stat()
+        if sample_time <= self.last_time:
+            # we already have this read of the file so get a new one
+            sample_time, ns = self._get_stat(max_age=0)
         deltas = {}
         try:
             # time from previous check
-            timedelta = time() - self.last_time
+            timedelta = sample_time - self.last_time
 
             # calculate deltas for all interfaces
             for old, new in zip(self.last_stat, ns):
@@ -130,8 +131,8 @@ class Py3status:
                 deltas[new[0]] = {'total': up + down, 'up': up, 'down': down, }
 
             # update last_ info
-            self.last_stat = self._get_stat()
-            self.last_time = time()
+            self.last_stat = ns
+            self.last_time = sample_time
 
             # get the interface with max rate
             if self.sum_values:
@@ -185,9 +186,10 @@ class Py3status:
 
         return response
 
-    def _get_stat(self):
+    def _get_stat(self, max_age=None):
         """
-        Get statistics from devfile in list of lists of words
+        Get the time devfile was read and its statistics in list of lists of
+        words
         """
         def dev_filter(x):
             # get first word and remove trailing interface number
@@ -205,11 +207,15 @@ class Py3status:
             return False
 
         # read devfile, skip two header files
-        x = filter(dev_filter, open(self.devfile).readlines()[2:])
+        sample_time, content = self.py3.sample_file(
+            self.devfile, max_age=max_age, timestamp=True
+        )
+        lines = content.splitlines()[2:]
+        x = filter(dev_filter, lines)
 
         try:
             # split info into words, filter empty ones
-            return [list(filter(lambda x: x, _x.split(" "))) for _x in x]
+            return sample_time, [list(filter(lambda x: x, _x.split(" "))) for _x in x]
 
         except StopIteration:
             return None
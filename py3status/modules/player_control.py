@@ -39,12 +39,6 @@ pause
 
 import os
 
-try:
-    import dbus
-    dbus_available = True
-except:  # noqa e722 // (ImportError, ModuleNotFoundError):  # (py2, assumed py3)
-    dbus_available = False
-
 
 class Py3status:
     """
@@ -165,11 +159,6 @@ class Py3status:
                 if self.debug:
                     self.py3.log('found player: %s' % player_name)
 
-                # those players need the dbus module
-                if player_name in ('vlc') and not dbus_available:
-                    self.py3.log('%s requires the dbus python module' % player_name)
-                    return None
-
                 return player_name
 
         return None
@@ -177,9 +166,11 @@ class Py3status:
     def _get_vlc(self):
         mpris = 'org.mpris.MediaPlayer2'
         mpris_slash = '/' + mpris.replace('.', '/')
-        bus = dbus.SessionBus()
-        proxy = bus.get_object(mpris + '.vlc', mpris_slash)
-        return dbus.Interface(proxy, dbus_interface=mpris + '.Player')
+        try:
+            return self.py3.dbus_get(mpris + '.vlc', mpris_slash)
+        except self.py3.DBusError as e:
+            self.py3.log('vlc cannot be controlled over D-Bus: %s' % e)
+            return None
 
     def player_control(self):
         return dict(
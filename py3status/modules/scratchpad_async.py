@@ -4,14 +4,13 @@ Display number of windows and urgency hints asynchronously.
 
 Configuration parameters:
     always_show: always display the format (default False)
+    cache_timeout: How often we refresh this module in seconds, only used
+        if i3 events are not available (default 5)
     format: display format for this module (default "{counter} ⌫")
 
 Format placeholders:
     {counter} number of scratchpad windows
 
-Requires:
-    i3ipc: (https://github.com/acrisci/i3ipc-python)
-
 @author cornerman
 @license BSD
 
@@ -19,9 +18,25 @@ SAMPLE OUTPUT
 {'full_text': '1 ⌫'}
 """
 
-from threading import Thread
 
-import i3ipc
+def find_scratch(tree):
+    if tree.get("name") == "__i3_scratch":
+        return tree
+    for x in tree.get("nodes", []):
+        result = find_scratch(x)
+        if result:
+            return result
+    return {}
+
+
+def find_leaves(tree):
+    leaves = []
+    for x in tree.get("nodes", []) + tree.get("floating_nodes", []):
+        if x.get("type") == "con" and not x.get("nodes"):
+            leaves.append(x)
+        else:
+            leaves.extend(find_leaves(x))
+    return leaves
 
 
 class Py3status:
@@ -29,6 +44,7 @@ class Py3status:
     """
     # available configuration parameters
     always_show = False
+    cache_timeout = 5
     format = u'{counter} ⌫'
 
     class Meta:
@@ -43,15 +59,32 @@ class Py3status:
         }
 
     def post_config_hook(self):
-        self.count = 0
+        # the scratchpad is checked when the module next runs
+        self.count = None
         self.urgent = False
+        self.subscribed = False
 
-        t = Thread(target=self._listen)
-        t.daemon = True
-        t.start()
+        self.py3.i3_subscribe(['window'], self._event)
+
+    def _event(self, event, data):
+        if data.get('change') in ('move', 'urgent'):
+            self.count = None
+            self.py3.update()
 
     def scratchpad_async(self):
-        response = {'cached_until': self.py3.CACHE_FOREVER}
+        # events may have been missed while we were not subscribed
+        subscribed = self.py3.i3_subscribed()
+        if self.count is None or not (subscribed and self.subscribed):
+            tree = self.py3.i3_msg(msg_type='get_tree')
+            cons = find_leaves(find_scratch(tree))
+            self.urgent = any(con.get('urgent') for con in cons)
+            self.count = len(cons)
+        self.subscribed = subscribed
+
+        if subscribed:
+            response = {'cached_until': self.py3.CACHE_FOREVER}
+        else:
+            response = {'cached_until': self.py3.time_in(self.cache_timeout)}
 
         if self.urgent:
             response['urgent'] = True
@@ -63,22 +96,6 @@ class Py3status:
 
         return response
 
-    def _listen(self):
-        def update_scratchpad_async(conn, e=None):
-            cons = conn.get_tree().scratchpad().leaves()
-            self.urgent = any(con for con in cons if con.urgent)
-            self.count = len(cons)
-            self.py3.update()
-
-        conn = i3ipc.Connection()
-
-        update_scratchpad_async(conn)
-
-        conn.on('window::move', update_scratchpad_async)
-        conn.on('window::urgent', update_scratchpad_async)
-
-        conn.main()
-
 
 if __name__ == "__main__":
     """
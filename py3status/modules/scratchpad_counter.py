@@ -3,7 +3,8 @@
 Display number of windows in scratchpad.
 
 Configuration parameters:
-    cache_timeout: How often we refresh this module in seconds (default 5)
+    cache_timeout: How often we refresh this module in seconds, only used
+        if i3 events are not available (default 5)
     format: Format of indicator (default '{counter} ⌫')
     hide_when_none: Hide indicator when there is no windows (default False)
 
@@ -17,8 +18,6 @@ SAMPLE OUTPUT
 {'full_text': '2 ⌫'}
 """
 
-from json import loads
-
 
 def find_scratch(tree):
     if tree.get("name") == "__i3_scratch":
@@ -50,12 +49,21 @@ class Py3status:
             ],
         }
 
+    def post_config_hook(self):
+        # windows moving to or from the scratchpad give window events
+        self.py3.i3_subscribe(['window'])
+
     def scratchpad_counter(self):
-        tree = loads(self.py3.command_output('i3-msg -t get_tree'))
+        tree = self.py3.i3_msg(msg_type='get_tree')
         count = len(find_scratch(tree).get("floating_nodes", []))
 
+        if self.py3.i3_subscribed():
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         response = {
-            'cached_until': self.py3.time_in(self.cache_timeout),
+            'cached_until': cached_until,
         }
 
         if self.hide_when_none and count == 0:
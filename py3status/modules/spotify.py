@@ -43,6 +43,7 @@ spotify {
 
 Requires:
     spotify (>=1.0.27.71.g0a26e3b2)
+    pydbus: python library module
 
 @author Pierre Guilbert, Jimmy Garpehäll, sondrele, Andrwe
 
@@ -56,14 +57,14 @@ stopped
 {'color': '#FF0000', 'full_text': 'Spotify stopped'}
 """
 
-import dbus
 import re
 
 from datetime import timedelta
 from time import sleep
 
-SPOTIFY_CMD = """dbus-send --print-reply --dest=org.mpris.MediaPlayer2.spotify
-                 /org/mpris/MediaPlayer2 org.mpris.MediaPlayer2.Player.{cmd}"""
+SPOTIFY_BUS = 'org.mpris.MediaPlayer2.spotify'
+SPOTIFY_PATH = '/org/mpris/MediaPlayer2'
+SPOTIFY_PLAYER = 'org.mpris.MediaPlayer2.Player'
 
 
 class Py3status:
@@ -83,9 +84,6 @@ class Py3status:
         'remaster', 'stereo', 'version'
     ]
 
-    def _spotify_cmd(self, action):
-        return SPOTIFY_CMD.format(cmd=action)
-
     def post_config_hook(self):
         """
         """
@@ -117,16 +115,12 @@ class Py3status:
         """
         Get the current song metadatas (artist - title)
         """
-        bus = dbus.SessionBus()
         try:
-            self.__bus = bus.get_object('org.mpris.MediaPlayer2.spotify',
-                                        '/org/mpris/MediaPlayer2')
-            self.player = dbus.Interface(self.__bus,
-                                         'org.freedesktop.DBus.Properties')
+            # properties are cached until spotify says that they have changed
+            metadata = self.py3.dbus_property(
+                SPOTIFY_BUS, SPOTIFY_PATH, SPOTIFY_PLAYER, 'Metadata')
 
             try:
-                metadata = self.player.Get('org.mpris.MediaPlayer2.Player',
-                                           'Metadata')
                 album = metadata.get('xesam:album')
                 artist = metadata.get('xesam:artist')[0]
                 microtime = metadata.get('mpris:length')
@@ -136,8 +130,8 @@ class Py3status:
                     album = self._sanitize_title(album)
                     title = self._sanitize_title(title)
 
-                playback_status = self.player.Get(
-                    'org.mpris.MediaPlayer2.Player', 'PlaybackStatus')
+                playback_status = self.py3.dbus_property(
+                    SPOTIFY_BUS, SPOTIFY_PATH, SPOTIFY_PLAYER, 'PlaybackStatus')
                 if playback_status.strip() == 'Playing':
                     color = self.py3.COLOR_PLAYING or self.py3.COLOR_GOOD
                 else:
@@ -181,14 +175,19 @@ class Py3status:
         """
         button = event['button']
         if button == self.button_play_pause:
-            self.py3.command_run(self._spotify_cmd('PlayPause'))
-            sleep(0.1)
+            self._spotify_call('PlayPause')
         elif button == self.button_next:
-            self.py3.command_run(self._spotify_cmd('Next'))
-            sleep(0.1)
+            self._spotify_call('Next')
         elif button == self.button_previous:
-            self.py3.command_run(self._spotify_cmd('Previous'))
-            sleep(0.1)
+            self._spotify_call('Previous')
+
+    def _spotify_call(self, method):
+        try:
+            getattr(self.py3.dbus_get(SPOTIFY_BUS, SPOTIFY_PATH), method)()
+        except Exception:
+            # spotify is not running
+            return
+        sleep(0.1)
 
 
 if __name__ == "__main__":
@@ -188,12 +188,11 @@ class Py3status:
 
     def _get_stat(self):
         # miscellaneous kernel statistics https://git.io/vn21n
-        with open('/proc/stat') as f:
-            fields = f.readline().split()
-            return {
-                'total': sum(map(int, fields[1:])),
-                'idle': int(fields[4]),
-            }
+        fields = self.py3.sample_file('/proc/stat', 'lines')[0]
+        return {
+            'total': sum(map(int, fields[1:])),
+            'idle': int(fields[4]),
+        }
 
     def _calc_mem_info(self, unit='GiB', memi=dict, keys=list):
         """
@@ -212,25 +211,20 @@ class Py3status:
         return total_mem, used_mem, used_mem_p, unit
 
     def _get_mem(self, mem_unit='GiB', swap_unit='GiB', mem=True, swap=True):
-        memi = {}
         result = {}
-
-        with open('/proc/meminfo', 'r') as fd:
-            for s in fd:
-                tok = s.split()
-                memi[tok[0]] = float(tok[1])
+        memi = self.py3.sample_file('/proc/meminfo', 'key_value')
 
         if mem:
             result["mem"] = self._calc_mem_info(
                 mem_unit,
                 memi,
-                ["MemTotal:", "MemFree:", "Buffers:", "Cached:"]
+                ["MemTotal", "MemFree", "Buffers", "Cached"]
             )
         if swap:
             result["swap"] = self._calc_mem_info(
                 swap_unit,
                 memi,
-                ["SwapTotal:", "SwapFree:"]
+                ["SwapTotal", "SwapFree"]
             )
 
         return result
@@ -262,11 +256,11 @@ class Py3status:
             return 'unknown unit'
         if zone:
             try:
-                sensors = self.py3.command_output(command + [zone])
+                sensors = self.py3.command_output(command + [zone], max_age=1)
             except self.py3.CommandError:
                 pass
         if not sensors:
-            sensors = self.py3.command_output(command)
+            sensors = self.py3.command_output(command, max_age=1)
         m = re.search("(Core 0|CPU Temp).+\+(.+).+\(.+", sensors)
         if m:
             cpu_temp = float(m.groups()[1].strip()[:-2])
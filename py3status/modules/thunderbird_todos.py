@@ -3,7 +3,8 @@
 Display number of todos and more for Thunderbird.
 
 Configuration parameters:
-    cache_timeout: refresh interval for this module (default 60)
+    cache_timeout: refresh interval for this module, only used if the
+        calendar data cannot be watched for changes (default 60)
     format: display format for this module (default '{format_todo}')
     format_datetime: specify strftime formatting to use (default {})
     format_separator: show separator if more than one (default ' ')
@@ -190,6 +191,9 @@ class Py3status:
 
         self.profile = path.expanduser(self.profile)
         self.path = self.profile + '/calendar-data/local.sqlite'
+        # sqlite may write to a journal next to the database so watch the
+        # whole directory
+        self.watched = self.py3.watch_file(path.dirname(self.path))
 
         # convert the datetime?
         self.init_datetimes = []
@@ -259,8 +263,13 @@ class Py3status:
         data, count = self._organize(todo_data)
         format_todo = self._manipulate(data, count)
 
+        if self.watched:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         return {
-            'cached_until': self.py3.time_in(self.cache_timeout),
+            'cached_until': cached_until,
             'full_text': self.py3.safe_format(
                 self.format, dict(format_todo=format_todo, **count)
             )
@@ -78,9 +78,8 @@ class Py3status:
                 self.time_periods[unit] = second
 
     def uptime(self):
-        with open('/proc/uptime', 'r') as f:
-            up = int(float(f.readline().split()[0]))
-            offset = time() - up
+        up = int(float(self.py3.sample_file('/proc/uptime').split()[0]))
+        offset = time() - up
 
         uptime = {}
         for unit in self.time_periods:
@@ -3,7 +3,8 @@
 Display vnstat statistics.
 
 Configuration parameters:
-    cache_timeout: refresh interval for this module (default 180)
+    cache_timeout: refresh interval for this module, only used if the
+        vnstat database cannot be watched for changes (default 180)
     coloring: see coloring rules below (default {})
     format: display format for this module (default '{total}')
     initial_multi: set to 1 to disable first bytes
@@ -45,6 +46,7 @@ SAMPLE OUTPUT
 
 from __future__ import division  # python2 compatibility
 STRING_NOT_INSTALLED = 'not installed'
+VNSTAT_DATABASE = '/var/lib/vnstat'
 
 
 class Py3status:
@@ -76,6 +78,8 @@ class Py3status:
         # list of units, first one - value/initial_multi, second - value/1024,
         # third - value/1024^2, etc...
         self.units = ["kb", "mb", "gb", "tb", ]
+        # the statistics only change when vnstatd saves its database
+        self.watched = self.py3.watch_file(VNSTAT_DATABASE)
 
     def _divide_and_format(self, value):
         # Divide a value and return formatted string
@@ -95,7 +99,10 @@ class Py3status:
                 if x.startswith("{};0;".format(self.statistics_type)):
                     return x
         type, number, ts, rxm, txm, rxk, txk, fill = filter_stat().split(";")
-        response = {'cached_until': self.py3.time_in(self.cache_timeout)}
+        if self.watched:
+            response = {'cached_until': self.py3.CACHE_FOREVER}
+        else:
+            response = {'cached_until': self.py3.time_in(self.cache_timeout)}
 
         up = (int(txm) * 1024 + int(txk)) * 1024
         down = (int(rxm) * 1024 + int(rxk)) * 1024
@@ -12,7 +12,8 @@ Configuration parameters:
     button_mute: button to toggle mute (default 1)
     button_up: button to increase volume (default 4)
     cache_timeout: how often we refresh this module in seconds.
-        (default 10)
+        With pactl the module is updated by PulseAudio events instead and
+        this is only used if they are not available. (default 10)
     card: Card to use. amixer supports this. (default None)
     channel: channel to track. Default value is backend dependent.
         (default None)
@@ -81,12 +82,25 @@ mute
 {'color': '#FF0000', 'full_text': u'\u266a: muted'}
 """
 
+import os
 import re
+from subprocess import Popen, PIPE
+try:
+    from subprocess import DEVNULL
+except ImportError:
+    # python 2
+    DEVNULL = None
+from threading import Thread
+from time import time
+
 from py3status.exceptions import CommandError
 
 STRING_ERROR = 'invalid command `%s`'
 STRING_NOT_AVAILABLE = 'no available binary'
 COMMAND_NOT_INSTALLED = 'command `%s` not installed'
+# seconds `pactl subscribe` must run for before it is considered to have
+# worked rather than failed to start eg while pulseaudio is down
+SUBSCRIBE_MIN_RUN = 1
 
 
 class AudioBackend():
@@ -104,8 +118,11 @@ class AudioBackend():
     def run_cmd(self, cmd):
         return self.parent.py3.command_run(cmd)
 
-    def command_output(self, cmd):
-        return self.parent.py3.command_output(cmd)
+    def command_output(self, cmd, max_age=0):
+        return self.parent.py3.command_output(cmd, max_age=max_age)
+
+    def stop(self):
+        pass
 
 
 class AmixerBackend(AudioBackend):
@@ -192,10 +209,76 @@ class PactlBackend(AudioBackend):
         self.reinit_device = self.device is None
         if self.device is None:
             self.device = self.get_default_device()
+        # pactl gives the device index as a string
+        self.device = str(self.device)
 
         self.max_volume = parent.max_volume
         self.update_device()
 
+        # while `pactl subscribe` is running the volume is only queried when
+        # pulseaudio tells us that our device has changed
+        self.changes = 0
+        self.find_device = False
+        self.stopped = False
+        self.subscription = None
+        self.subscription_retry = 0
+        self.subscription_started = 0
+        self.volume = None
+        # pactl is restarted when needed so keep a single handle for stderr
+        self.devnull = DEVNULL
+        if self.devnull is None:
+            self.devnull = open(os.devnull, 'w')
+        self.start_subscription()
+
+    def start_subscription(self):
+        self.subscription_started = time()
+        env = dict(os.environ, LC_ALL='C')
+        try:
+            self.subscription = Popen(['pactl', 'subscribe'], stdout=PIPE,
+                                      stderr=self.devnull, env=env)
+        except OSError:
+            return
+        t = Thread(target=self.read_events, args=(self.subscription,))
+        t.daemon = True
+        t.start()
+
+    def read_events(self, subscription):
+        re_event = re.compile(r"Event '([\w-]+)' on ([\w-]+) #(\d+)")
+        for line in iter(subscription.stdout.readline, b''):
+            match = re_event.match(line.decode('utf-8', 'replace'))
+            if not match:
+                continue
+            event, facility, index = match.groups()
+            if facility == self.device_type and index == self.device:
+                if event == 'remove' and self.reinit_device:
+                    self.find_device = True
+            elif facility == 'server' and self.reinit_device:
+                # the default device may have changed
+                self.find_device = True
+            else:
+                continue
+            self.changes += 1
+            self.volume = None
+            self.parent.py3.update()
+        subscription.wait()
+        # pactl has exited eg pulseaudio was restarted so we poll until it
+        # can be started again
+        self.subscription = None
+        self.volume = None
+        if time() - self.subscription_started < SUBSCRIBE_MIN_RUN:
+            # pactl failed straight away so don't try again too soon, the
+            # module is polled every cache_timeout until then
+            self.subscription_retry = time() + self.parent.cache_timeout
+        elif not self.stopped:
+            self.parent.py3.update()
+
+    def stop(self):
+        self.stopped = True
+        if self.subscription:
+            self.subscription.terminate()
+        if self.devnull is not DEVNULL:
+            self.devnull.close()
+
     def update_device(self):
         self.re_volume = re.compile(
             r'{} \#{}.*?State: (\w+).*?Mute: (\w{{2,3}}).*?Volume:.*?(\d{{1,3}})\%'.format(
@@ -208,7 +291,8 @@ class PactlBackend(AudioBackend):
 
         # Find the default device for the device type
         default_dev_pattern = re.compile(r'^Default {}: (.*)$'.format(self.device_type_cap))
-        output = self.command_output(['pactl', 'info'])
+        # the default devices are shared with any other instances
+        output = self.command_output(['pactl', 'info'], max_age=1)
         for info_line in output.splitlines():
             default_dev_match = default_dev_pattern.match(info_line)
             if default_dev_match is not None:
@@ -217,7 +301,9 @@ class PactlBackend(AudioBackend):
 
         # with the long gross id, find the associated number
         if device_id is not None:
-            output = self.command_output(['pactl', 'list', 'short', self.device_type_pl])
+            output = self.command_output(
+                ['pactl', 'list', 'short', self.device_type_pl], max_age=1
+            )
             for line in output.splitlines():
                 parts = line.split()
                 if len(parts) < 2:
@@ -229,6 +315,24 @@ class PactlBackend(AudioBackend):
             'input' if self.is_input else 'output', device_id))
 
     def get_volume(self):
+        if (self.subscription is None and not self.stopped and
+                time() >= self.subscription_retry):
+            self.start_subscription()
+        volume = self.volume
+        if volume is not None:
+            return volume
+        changes = self.changes
+        volume = self.query_volume()
+        # only keep the volume if nothing changed while we were querying it
+        if self.subscription is not None and changes == self.changes:
+            self.volume = volume
+        return volume
+
+    def query_volume(self):
+        if self.find_device:
+            self.find_device = False
+            self.device = self.get_default_device()
+            self.update_device()
         output = self.command_output(['pactl', 'list', self.device_type_pl]).strip()
         try:
             state, muted, perc = self.re_volume.search(output).groups()
@@ -236,7 +340,7 @@ class PactlBackend(AudioBackend):
             state, muted, perc = None, False, 0
             # if device is unset, try again with possibly
             # a new default device, otherwise print 0
-        if self.reinit_device and state != 'RUNNING':
+        if self.reinit_device and state != 'RUNNING' and not self.subscription:
             self.device = self.get_default_device()
             self.update_device()
 
@@ -366,9 +470,15 @@ class Py3status:
         # format the output
         text = self._format_output(self.format_muted
                                    if muted else self.format, perc)
+        if getattr(self.backend, 'subscription', None):
+            # we are updated when the volume changes
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         # create response dict
         response = {
-            'cached_until': self.py3.time_in(self.cache_timeout),
+            'cached_until': cached_until,
             'color': color,
             'full_text': text,
         }
@@ -389,6 +499,11 @@ class Py3status:
         elif button == self.button_mute:
             self.backend.toggle_mute()
 
+    def kill(self):
+        # the backend is not set if the module failed to start
+        if getattr(self, 'backend', None):
+            self.backend.stop()
+
 
 if __name__ == "__main__":
     """
@@ -430,7 +430,13 @@ class Py3status:
 
     def _make_req(self, url):
         # Make a request expecting a JSON response
-        req = self.py3.request(url, timeout=self.request_timeout)
+        req = self.py3.request(url, timeout=self.request_timeout, cache=True)
+        return self._parse_resp(req)
+
+    def _parse_resp(self, req):
+        # Get the JSON from a response
+        if isinstance(req, self.py3.RequestException):
+            raise req
         if req.status_code != 200:
             data = req.json()
             raise OWMException(data['message'] if ('message' in data)
@@ -511,24 +517,26 @@ class Py3status:
 
         return (lat_lng, city, country, tz_offset)
 
-    def _get_weather(self, coords):
-        # Get and process the current weather
-        url = self._get_req_url(OWM_CURR_ENDPOINT, coords)
-        return self._make_req(url)
-
-    def _get_forecast(self, coords):
-        # Get the next few days
-        if self.forecast_days == 0:
-            return []
-
-        # Get raw data
-        url = (self._get_req_url(OWM_FUTURE_ENDPOINT, coords)
-               % (self.forecast_days + 1))
-        data = self._make_req(url)
+    def _get_weather_forecast(self, coords):
+        # Get the current weather and the next few days at the same time
+        urls = [self._get_req_url(OWM_CURR_ENDPOINT, coords)]
+        if self.forecast_days:
+            urls.append(self._get_req_url(OWM_FUTURE_ENDPOINT, coords)
+                        % (self.forecast_days + 1))
+        requests = [
+            {'url': url, 'timeout': self.request_timeout, 'cache': True}
+            for url in urls
+        ]
+        responses = self.py3.request_many(requests)
+        wthr = self._parse_resp(responses[0])
+        if not self.forecast_days:
+            return wthr, []
 
         # Extract forecast
-        weathers = data['list']
-        return weathers[:-1] if (self.forecast_include_today) else weathers[1:]
+        weathers = self._parse_resp(responses[1])['list']
+        if self.forecast_include_today:
+            return wthr, weathers[:-1]
+        return wthr, weathers[1:]
 
     def _get_icon(self, wthr):
         # Lookup the icon from the weather code (default sunny)
@@ -749,8 +757,7 @@ class Py3status:
         if loc_tz_info is not None:
             (coords, city, country, tz_offset) = loc_tz_info
 
-            wthr = self._get_weather(coords)
-            fcsts = self._get_forecast(coords)
+            wthr, fcsts = self._get_weather_forecast(coords)
 
             text = self._format(wthr, fcsts, city, country, tz_offset)
 
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 """
-Display WiFi bit rate, quality, signal and SSID using iw.
+Display WiFi bit rate, quality, signal and SSID.
+
+The kernel's wireless interfaces are read directly.  If the driver does not
+support them iw is used instead.
 
 Configuration parameters:
     bitrate_bad: Bad bit rate in Mbit/s (default 26)
@@ -17,7 +20,7 @@ Configuration parameters:
         (default True)
     signal_bad: Bad signal strength in percent (default 29)
     signal_degraded: Degraded signal strength in percent (default 49)
-    use_sudo: Use sudo to run iw and ip. make sure to give some root rights
+    use_sudo: Use sudo to run iw and ip if they are needed. make sure to give some root rights
         to run without a password by editing the sudoers file, eg...
         '<user> ALL=(ALL) NOPASSWD:/sbin/iw dev,/sbin/iw dev [a-z]* link'
         '<user> ALL=(ALL) NOPASSWD:/sbin/ip addr list [a-z]*'
@@ -39,8 +42,10 @@ Color options:
     color_good: Signal strength above signal_degraded
 
 Requires:
-    iw: cli configuration utility for wireless devices
-    ip: only for {ip}. may be part of iproute2: ip routing utilities
+    iw: only if the driver lacks wireless extensions. cli configuration
+        utility for wireless devices
+    ip: only for {ip} when iw is used. may be part of iproute2: ip routing
+        utilities
 
 __Note: Some distributions eg Debian require `iw` to be run with privileges.
 In this case you will need to use the `use_sudo` configuration parameter.__
@@ -52,10 +57,30 @@ SAMPLE OUTPUT
 {'color': '#00FF00', 'full_text': u'W: 54.0 MBit/s 100% Chicken Remixed'}
 """
 
-import re
+import errno
+import fcntl
 import math
+import os
+import re
+import socket
+import struct
+
+from array import array
 
 STRING_ERROR = "iw: command failed"
+
+# wireless extension and socket ioctls, see linux/wireless.h and
+# linux/sockios.h
+SIOCGIWESSID = 0x8B1B
+SIOCGIWRATE = 0x8B21
+SIOCGIFADDR = 0x8915
+# errors meaning the driver has no wireless extensions
+NOT_SUPPORTED = (errno.EOPNOTSUPP, errno.ENOTTY)
+IW_ESSID_MAX_SIZE = 32
+# struct iwreq is the interface name followed by a 16 byte union, here a
+# struct iw_point with a buffer pointer, its length and flags
+IWREQ_POINT = '16sPHH'
+IWREQ_SIZE = 32
 DEFAULT_FORMAT = 'W: {bitrate} {signal_percent} {ssid}|W: down'
 
 
@@ -78,17 +103,22 @@ class Py3status:
     def post_config_hook(self):
         self._max_bitrate = 0
         self._ssid = ''
+        self._native = True
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         iw = self.py3.check_commands(['iw', '/sbin/iw'])
         # get wireless interface
-        try:
-            data = self.py3.command_output([iw, 'dev'])
-            devices = re.findall(r'Interface\s*([^\s]+)', data)
+        devices = self._get_wireless_devices()
+        if devices is None:
+            try:
+                data = self.py3.command_output([iw, 'dev'])
+                devices = re.findall(r'Interface\s*([^\s]+)', data)
+            except self.py3.CommandError:
+                devices = None
+        if devices is not None:
             if not devices or 'wlan0' in devices:
                 self.device = 'wlan0'
             else:
                 self.device = devices[0]
-        except self.py3.CommandError:
-            pass
 
         self.iw_dev_id_link = [iw, 'dev', self.device, 'link']
         self.ip_addr_list_id = ['ip', 'addr', 'list', self.device]
@@ -115,58 +145,37 @@ class Py3status:
 
     def wifi(self):
         """
-        Get WiFi status using iw.
+        Get WiFi status from the kernel or using iw.
         """
         self.signal_dbm_bad = self._percent_to_dbm(self.signal_bad)
         self.signal_dbm_degraded = self._percent_to_dbm(self.signal_degraded)
-        try:
-            iw = self.py3.command_output(self.iw_dev_id_link)
-        except self.py3.CommandError:
-            return {'cache_until': self.py3.CACHE_FOREVER,
-                    'color': self.py3.COLOR_ERROR or self.py3.COLOR_BAD,
-                    'full_text': STRING_ERROR}
-        # bitrate
-        bitrate_out = re.search(r'tx bitrate: ([^\s]+) ([^\s]+)', iw)
-        if bitrate_out:
-            bitrate = float(bitrate_out.group(1))
-            if self.round_bitrate:
-                bitrate = round(bitrate)
-            bitrate_unit = bitrate_out.group(2)
-            if bitrate_unit == 'Gbit/s':
-                bitrate *= 1000
-        else:
-            bitrate = None
-            bitrate_unit = None
+        want_ip = self.py3.format_contains(self.format, 'ip')
+        data = None
+        if self._native:
+            try:
+                data = self._get_native_data(want_ip)
+            except (IOError, OSError) as e:
+                if e.errno in NOT_SUPPORTED:
+                    # the driver has no wireless extensions so use iw from now on
+                    self._native = False
+                else:
+                    # eg the device was unplugged so show it as down
+                    data = None, None, None, None, None
+        if data is None:
+            try:
+                data = self._get_iw_data(want_ip)
+            except self.py3.CommandError:
+                return {'cache_until': self.py3.CACHE_FOREVER,
+                        'color': self.py3.COLOR_ERROR or self.py3.COLOR_BAD,
+                        'full_text': STRING_ERROR}
+        bitrate, bitrate_unit, signal_dbm, ssid, ip = data
 
-        # signal
-        signal_out = re.search(r'signal: ([\-0-9]+)', iw)
-        if signal_out:
-            signal_dbm = int(signal_out.group(1))
+        if bitrate and self.round_bitrate:
+            bitrate = round(bitrate)
+        if signal_dbm is not None:
             signal_percent = min(self._dbm_to_percent(signal_dbm), 100)
         else:
-            signal_dbm = None
             signal_percent = None
-        ssid_out = re.search(r'SSID: (.+)', iw)
-        if ssid_out:
-            ssid = ssid_out.group(1)
-            # `iw` command would prints unicode SSID like `\xe8\x8b\x9f`
-            # the `ssid` here would be '\\xe8\\x8b\\x9f' (note the escape)
-            # it needs to be decoded using 'unicode_escape', to '苟'
-            ssid = ssid.encode('latin-1').decode('unicode_escape')
-            ssid = ssid.encode('latin-1').decode('utf-8')
-        else:
-            ssid = None
-
-        # check command
-        if self.py3.format_contains(self.format, 'ip'):
-            ip_info = self.py3.command_output(self.ip_addr_list_id)
-            ip_match = re.search(r'inet\s+([0-9.]+)', ip_info)
-            if ip_match:
-                ip = ip_match.group(1)
-            else:
-                ip = None
-        else:
-            ip = ''
 
         # reset _max_bitrate if we have changed network
         if self._ssid != ssid:
@@ -224,6 +233,117 @@ class Py3status:
             'color': color,
         }
 
+    def _get_wireless_devices(self):
+        """
+        Wireless interfaces from sysfs, or None if it cannot be read.
+        """
+        try:
+            interfaces = sorted(os.listdir('/sys/class/net'))
+        except (IOError, OSError):
+            return None
+        return [
+            interface for interface in interfaces
+            if os.path.exists(os.path.join('/sys/class/net', interface, 'wireless')) or
+            os.path.exists(os.path.join('/sys/class/net', interface, 'phy80211'))
+        ]
+
+    def _ioctl(self, request, data):
+        return fcntl.ioctl(self._socket.fileno(), request, data)
+
+    def _get_native_data(self, want_ip):
+        """
+        Get the bit rate, signal, SSID and ip address from the kernel's
+        wireless extensions and /proc/net/wireless.  An IOError is raised if
+        the SSID cannot be read eg the driver does not support them.
+        """
+        device = self.device.encode('utf-8')
+        buff = array('B', b'\0' * (IW_ESSID_MAX_SIZE + 1))
+        address = buff.buffer_info()[0]
+        request = struct.pack(IWREQ_POINT, device, address, len(buff), 0)
+        result = self._ioctl(
+            SIOCGIWESSID, request + b'\0' * (IWREQ_SIZE - len(request))
+        )
+        length = struct.unpack_from(IWREQ_POINT, result)[2]
+        if not length:
+            # not associated
+            return None, None, None, None, None
+        # python 2 arrays have no tobytes()
+        ssid = buff.tobytes() if hasattr(buff, 'tobytes') else buff.tostring()
+        ssid = ssid[:length].decode('utf-8', 'replace')
+
+        try:
+            result = self._ioctl(SIOCGIWRATE, struct.pack('16s16x', device))
+            # bit rate is given in bit/s
+            bitrate = struct.unpack_from('i', result, 16)[0] / 1e6
+        except (IOError, OSError):
+            bitrate = None
+
+        signal_dbm = None
+        try:
+            stats = self.py3.sample_file('/proc/net/wireless', 'wireless')
+        except (IOError, OSError):
+            stats = {}
+        if self.device in stats:
+            level = stats[self.device]['level']
+            # old drivers give an unsigned byte
+            if level > 0:
+                level -= 256
+            signal_dbm = int(level)
+
+        ip = ''
+        if want_ip:
+            try:
+                result = self._ioctl(SIOCGIFADDR, struct.pack('256s', device))
+                ip = socket.inet_ntoa(result[20:24])
+            except (IOError, OSError):
+                ip = None
+        return bitrate, 'MBit/s', signal_dbm, ssid, ip
+
+    def _get_iw_data(self, want_ip):
+        """
+        Get the bit rate, signal, SSID and ip address using iw and ip.
+        """
+        iw = self.py3.command_output(self.iw_dev_id_link)
+        # bitrate
+        bitrate_out = re.search(r'tx bitrate: ([^\s]+) ([^\s]+)', iw)
+        if bitrate_out:
+            bitrate = float(bitrate_out.group(1))
+            bitrate_unit = bitrate_out.group(2)
+            if bitrate_unit == 'Gbit/s':
+                bitrate *= 1000
+        else:
+            bitrate = None
+            bitrate_unit = None
+
+        # signal
+        signal_out = re.search(r'signal: ([\-0-9]+)', iw)
+        if signal_out:
+            signal_dbm = int(signal_out.group(1))
+        else:
+            signal_dbm = None
+        ssid_out = re.search(r'SSID: (.+)', iw)
+        if ssid_out:
+            ssid = ssid_out.group(1)
+            # `iw` command would prints unicode SSID like `\xe8\x8b\x9f`
+            # the `ssid` here would be '\\xe8\\x8b\\x9f' (note the escape)
+            # it needs to be decoded using 'unicode_escape', to '苟'
+            ssid = ssid.encode('latin-1').decode('unicode_escape')
+            ssid = ssid.encode('latin-1').decode('utf-8')
+        else:
+            ssid = None
+
+        # check command
+        if want_ip:
+            ip_info = self.py3.command_output(self.ip_addr_list_id)
+            ip_match = re.search(r'inet\s+([0-9.]+)', ip_info)
+            if ip_match:
+                ip = ip_match.group(1)
+            else:
+                ip = None
+        else:
+            ip = ''
+        return bitrate, bitrate_unit, signal_dbm, ssid, ip
+
     def _dbm_to_percent(self, dbm):
         return 2 * (dbm + 100)
 
@@ -2,10 +2,12 @@
 """
 Display window title.
 
-This module prints the properties of a focused window at frequent intervals.
+This module prints the properties of the focused window.  It is updated by
+i3 window and workspace events.
 
 Configuration parameters:
-    cache_timeout: refresh interval for this module (default 0.5)
+    cache_timeout: refresh interval for this module, only used if i3 events
+        are not available (default 0.5)
     format: display format for this module (default '{title}')
     max_width: If width of title is greater, shrink it and add '...'
         (default 120)
@@ -34,8 +36,6 @@ SAMPLE OUTPUT
 {'full_text': u'business_plan_final_3a.doc'}
 """
 
-from json import loads
-
 
 class Py3status:
     """
@@ -49,6 +49,7 @@ class Py3status:
         # empty defaults to replace window properties
         self.empty_defaults = {
             x: '' for x in self.py3.get_placeholders_list(self.format)}
+        self.py3.i3_subscribe(['window', 'workspace'])
 
     def _find_focused(self, tree):
         if isinstance(tree, list):
@@ -63,7 +64,7 @@ class Py3status:
         return {}
 
     def window_title(self):
-        tree = loads(self.py3.command_output('i3-msg -t get_tree'))
+        tree = self.py3.i3_msg(msg_type='get_tree')
         window_properties = self._find_focused(tree).get(
             'window_properties', self.empty_defaults)
 
@@ -71,8 +72,13 @@ class Py3status:
             window_properties['title'] = u"...{}".format(
                 window_properties['title'][-(self.max_width - 3):])
 
+        if self.py3.i3_subscribed():
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         return {
-            'cached_until': self.py3.time_in(self.cache_timeout),
+            'cached_until': cached_until,
             'full_text': self.py3.safe_format(self.format, window_properties)
         }
 
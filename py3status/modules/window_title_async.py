@@ -8,6 +8,8 @@ Provides instant title update only when it required.
 Configuration parameters:
     always_show: do not hide the title when it can be already
         visible (e.g. in tabbed layout). (default False)
+    cache_timeout: refresh interval for this module, only used if i3 events
+        are not available (default 0.5)
     empty_title: string that will be shown instead of the title when
         the title is hidden. (default "")
     format: format of the title, (default "{title}")
@@ -16,9 +18,6 @@ Configuration parameters:
         the title will be truncated to `max_width - 1`
         first symbols with ellipsis appended. (default 120)
 
-Requires:
-    i3ipc: (https://github.com/acrisci/i3ipc-python)
-
 @author Anon1234 https://github.com/Anon1234
 @license BSD
 
@@ -26,101 +25,89 @@ SAMPLE OUTPUT
 {'full_text': 'mountain.png'}
 """
 
-from threading import Thread
-
-import i3ipc
-
 
 class Py3status:
     """
     """
     # available configuration parameters
     always_show = False
+    cache_timeout = 0.5
     empty_title = ""
     format = "{title}"
     max_width = 120
 
     def post_config_hook(self):
-        self.title = self.empty_title
-
-        # we are listening to i3 events in a separate thread
-        t = Thread(target=self._loop)
-        t.daemon = True
-        t.start()
-
-    def _loop(self):
-        def get_title(conn):
-            tree = conn.get_tree()
-            w = tree.find_focused()
-            p = w.parent
-
-            # dont show window title when the window already has means
-            # to display it
-            if not self.always_show and (
-                    w.border == "normal" or w.type == "workspace" or
-                    (p.layout in ("stacked", "tabbed") and len(p.nodes) > 1)):
-
-                return self.empty_title
-
-            else:
-                title = w.name
-                if title is None or w.type == "workspace":
-                    title = ''
-
-                if len(title) > self.max_width:
-                    title = title[:self.max_width - 1] + "…"
-
-                return self.py3.safe_format(self.format, {'title': title})
-
-        def update_title(conn, e):
-
-            # catch only focused window title updates
-            title_changed = hasattr(e, "container") and e.container.focused
-
+        # the title is found when the module next runs
+        self.title = None
+        self.subscribed = False
+        self.py3.i3_subscribe(['binding', 'window', 'workspace'], self._event)
+
+    def _find_focused(self, node, parent=None):
+        """
+        Return the focused node of the tree and its parent.
+        """
+        if node.get('focused'):
+            return node, parent
+        for child in node.get('nodes', []) + node.get('floating_nodes', []):
+            result = self._find_focused(child, node)
+            if result:
+                return result
+        return None
+
+    def _get_title(self):
+        focused = self._find_focused(self.py3.i3_msg(msg_type='get_tree'))
+        if not focused:
+            return self.empty_title
+        w, p = focused
+        # dont show window title when the window already has means
+        # to display it
+        if not self.always_show and (
+                w.get("border") == "normal" or w.get("type") == "workspace" or
+                (p and p.get("layout") in ("stacked", "tabbed") and
+                 len(p.get("nodes", [])) > 1)):
+            return self.empty_title
+        else:
+            title = w.get("name")
+            if title is None or w.get("type") == "workspace":
+                title = ''
+            if len(title) > self.max_width:
+                title = title[:self.max_width - 1] + "…"
+            return self.py3.safe_format(self.format, {'title': title})
+
+    def _event(self, event, data):
+        change = data.get("change")
+        if event == "workspace":
+            # clears the title on empty ws
+            update = change == "focus"
+        elif event == "window":
+            # catch only focused window title updates and clear the title
+            # when the last window on ws was closed
+            update = change == "close" or (
+                change in ("title", "focus") and
+                data.get("container", {}).get("focused")
+            )
+        else:
             # check if we need to update title due to changes
             # in the workspace layout
-            layout_changed = (
-                hasattr(e, "binding") and
-                (e.binding.command.startswith("layout") or
-                 e.binding.command.startswith("move container") or
-                 e.binding.command.startswith("border"))
-            )
-
-            if title_changed or layout_changed:
-                self.title = get_title(conn)
-                self.py3.update()
-
-        def clear_title(conn, e):
-            f = conn.get_tree().find_focused()
-            if f.window_class:
-                self.title = f.name
-            else:
-                self.title = self.empty_title
+            command = data.get("binding", {}).get("command", "")
+            update = command.startswith(("layout", "move container", "border"))
+        if update:
+            self.title = None
             self.py3.update()
 
-        conn = i3ipc.Connection()
-
-        self.title = get_title(conn)  # set title on startup
-        self.py3.update()
-
-        # The order of following callbacks is important!
-
-        # clears the title on empty ws
-        conn.on('workspace::focus', clear_title)
-
-        # clears the title when the last window on ws was closed
-        conn.on("window::close", clear_title)
-
-        # listens for events which can trigger the title update
-        conn.on("window::title", update_title)
-        conn.on("window::focus", update_title)
-        conn.on("binding", update_title)
-
-        conn.main()  # run the event loop
-
     def window_title_async(self):
+        # events may have been missed while we were not subscribed
+        subscribed = self.py3.i3_subscribed()
+        if self.title is None or not (subscribed and self.subscribed):
+            self.title = self._get_title()
+        self.subscribed = subscribed
+
+        if subscribed:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
         return {
-            'cached_until': self.py3.CACHE_FOREVER,
+            'cached_until': cached_until,
             'full_text': self.title,
         }
 
@@ -0,0 +1,120 @@
+from json import dumps
+from math import sqrt
+
+
+class JsonCache:
+    """
+    Creates the json string for a module's output, reusing the strings
+    created last time for any output items that have not changed.
+    """
+
+    def __init__(self):
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def dumps(self, outputs):
+        """
+        Return the json string for a list of output items.
+        """
+        if len(outputs) == 1:
+            # a single item will have changed so caching does not help
+            self.cache = {}
+            return dumps(outputs[0])
+        cache = self.cache
+        new_cache = {}
+        result = []
+        for item in outputs:
+            # values that compare equal can have different json eg True, 1
+            # and 1.0 so their types are part of the key
+            key = tuple((k, v.__class__, v) for k, v in item.items())
+            try:
+                out = cache[key]
+                self.hits += 1
+            except KeyError:
+                out = dumps(item)
+                self.misses += 1
+            except TypeError:
+                # unhashable values so this item cannot be cached
+                result.append(dumps(item))
+                continue
+            new_cache[key] = out
+            result.append(out)
+        # only keep the strings for the current output
+        self.cache = new_cache
+        return ','.join(result)
+
+
+class OutputLine:
+    """
+    Builds the i3bar output line from the json strings of the modules,
+    joining them all each time.  This is the quickest way for most bars.
+    """
+
+    def __init__(self, size):
+        self.segments = [None] * size
+
+    def set(self, index, value):
+        """
+        Set the json string for a position in the bar.
+        """
+        self.segments[index] = value
+
+    def get_line(self):
+        """
+        Return the output line.
+        """
+        return ','.join([x for x in self.segments if x])
+
+
+class OutputAssembler(OutputLine):
+    """
+    Builds the i3bar output line from the json strings of the modules.
+
+    The bar positions are split into chunks and the joined string of each
+    chunk is cached.  When a module updates only the chunk(s) containing it
+    need rebuilding, the line is then created from the cached chunks.  This
+    only pays off for bars of at least MIN_SIZE positions, use OutputLine
+    for smaller ones.
+    """
+
+    # below this joining everything each time is quicker
+    MIN_SIZE = 64
+
+    def __init__(self, size, chunk_size=None):
+        OutputLine.__init__(self, size)
+        if not chunk_size:
+            # this keeps the work for an update at about 2 * sqrt(size)
+            chunk_size = max(int(sqrt(size)), 1)
+        self.chunk_size = chunk_size
+        chunks = (size + chunk_size - 1) // chunk_size
+        self.chunks = [None] * chunks
+        self.dirty = set()
+        self.line = ''
+
+    def set(self, index, value):
+        """
+        Set the json string for a position in the bar.
+        """
+        if self.segments[index] != value:
+            self.segments[index] = value
+            self.dirty.add(index // self.chunk_size)
+
+    def get_line(self):
+        """
+        Return the output line, only rebuilding what has changed.
+        """
+        if self.dirty:
+            size = self.chunk_size
+            segments = self.segments
+            for chunk in self.dirty:
+                start = chunk * size
+                self.chunks[chunk] = ','.join(
+                    [x for x in segments[start:start + size] if x]
+                )
+            self.dirty.clear()
+            if len(self.chunks) == 1:
+                self.line = self.chunks[0]
+            else:
+                self.line = ','.join([x for x in self.chunks if x])
+        return self.line
@@ -1,8 +1,14 @@
 import cProfile
 
+from collections import deque
+from threading import Lock
+
 # Used in development
 enable_profiling = False
 
+# number of recent timings kept for working out percentiles
+STATS_SAMPLES = 100
+
 
 def profile(thread_run_fn):
     if not enable_profiling:
@@ -19,3 +25,147 @@ def profile(thread_run_fn):
             profiler.dump_stats("py3status-%s.profile" % thread_id)
 
     return wrapper_run
+
+
+def percentile(values, percent):
+    """
+    Return the percentile of a list of values using the nearest rank.
+    """
+    if not values:
+        return 0
+    values = sorted(values)
+    index = int(round(percent / 100.0 * (len(values) - 1)))
+    return values[index]
+
+
+class Timings:
+    """
+    Keeps the count, max and recent samples of a timing.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.max = 0
+        self.samples = deque(maxlen=STATS_SAMPLES)
+        self.total = 0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+        if value > self.max:
+            self.max = value
+
+    def stats(self):
+        return {
+            'avg': self.total / self.count if self.count else 0,
+            'max': self.max,
+            'p50': percentile(self.samples, 50),
+            'p95': percentile(self.samples, 95),
+        }
+
+
+class ModuleStats:
+    """
+    Collects execution statistics for a module and its methods.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.delay = Timings()
+        self.methods = {}
+
+    def run_started(self, delay):
+        """
+        Record how late the module was started compared to when it was due.
+        """
+        with self.lock:
+            self.delay.add(delay)
+
+    def method_run(self, method, duration, changed=False, error=False):
+        """
+        Record a run of one of the module's methods.
+        """
+        with self.lock:
+            if method not in self.methods:
+                self.methods[method] = {
+                    'changed': 0,
+                    'errors': 0,
+                    'time': Timings(),
+                }
+            stats = self.methods[method]
+            stats['time'].add(duration)
+            if changed:
+                stats['changed'] += 1
+            if error:
+                stats['errors'] += 1
+
+    def stats(self):
+        """
+        Return the statistics as a dict.  Times are in seconds.
+        """
+        with self.lock:
+            methods = {}
+            for name, stats in self.methods.items():
+                calls = stats['time'].count
+                methods[name] = {
+                    'calls': calls,
+                    'changed': stats['changed'],
+                    'unchanged': calls - stats['changed'] - stats['errors'],
+                    'errors': stats['errors'],
+                    'time': stats['time'].stats(),
+                }
+            return {
+                'runs': self.delay.count,
+                'delay': self.delay.stats(),
+                'methods': methods,
+            }
+
+
+def format_stats(stats):
+    """
+    Return the stats from Py3statusWrapper.get_stats() as readable text.
+    """
+    def times(timings):
+        return [timings[x] * 1000 for x in ['p50', 'p95', 'max']]
+
+    def add_section(name, data, indent=''):
+        lines.append(u'{}{}:'.format(indent, name))
+        for key, value in sorted(data.items()):
+            if isinstance(value, dict):
+                add_section(key, value, indent + '    ')
+            else:
+                if isinstance(value, float):
+                    value = round(value, 4)
+                lines.append(u'{}    {}: {}'.format(indent, key, value))
+
+    modules = stats.get('modules', {})
+    lines = []
+    row = u'{:<40} {:>7} {:>7} {:>7} {:>9.2f} {:>9.2f} {:>9.2f}'
+    header = u'{:<40} {:>7} {:>7} {:>7} {:>9} {:>9} {:>9}'
+    lines.append(header.format(
+        'module method', 'calls', 'changed', 'errors',
+        'p50 (ms)', 'p95 (ms)', 'max (ms)'
+    ))
+    for name in sorted(modules):
+        methods = modules[name]['methods']
+        for method in sorted(methods):
+            data = methods[method]
+            lines.append(row.format(
+                u'{} {}'.format(name, method), data['calls'], data['changed'],
+                data['errors'], *times(data['time'])
+            ))
+    lines.append(u'')
+    row = u'{:<40} {:>7} {:>9.2f} {:>9.2f} {:>9.2f}'
+    header = u'{:<40} {:>7} {:>9} {:>9} {:>9}'
+    lines.append(header.format(
+        'module start delay', 'runs', 'p50 (ms)', 'p95 (ms)', 'max (ms)'
+    ))
+    for name in sorted(modules):
+        data = modules[name]
+        lines.append(row.format(name, data['runs'], *times(data['delay'])))
+    for name in sorted(stats):
+        if name != 'modules':
+            lines.append(u'')
+            add_section(name, stats[name])
+    return u'\n'.join(lines)
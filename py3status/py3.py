@@ -10,15 +10,24 @@ from fnmatch import fnmatch
 from math import log10
 from pprint import pformat
 from subprocess import Popen, PIPE, STDOUT
+from threading import Thread
 from time import time
 from uuid import uuid4
 
 from py3status import exceptions
+from py3status.async_loop import AsyncLoop
 from py3status.constants import COLOR_NAMES
+from py3status.dbus_service import DBusService
+from py3status.executor import CommandCache, CommandExecutor
+from py3status.file_watch import FileWatcher
 from py3status.formatter import Formatter, Composite
-from py3status.request import HttpResponse
+from py3status.i3_ipc import I3IPC
+from py3status.request import (
+    POOL_MAX_PER_HOST, ConnectionPool, HttpResponse, ResponseCache, request_key
+)
+from py3status.sampler import Sampler
 from py3status.storage import Storage
-from py3status.util import Gradiants
+from py3status.util import FlightTimeout, Gradiants, SingleFlight
 from py3status.version import version
 
 
@@ -91,14 +100,27 @@ class Py3:
     """Show as Warning"""
 
     # Shared by all Py3 Instances
+    _async_loop = AsyncLoop()
     _formatter = None
+    _command_cache = CommandCache()
+    _dbus = DBusService()
+    _executor = CommandExecutor()
     _gradients = Gradiants()
+    _i3_ipc = I3IPC()
     _none_color = NoneColor()
+    _file_watcher = FileWatcher()
+    _http_pool = ConnectionPool()
+    _request_flights = SingleFlight()
+    _response_cache = ResponseCache()
+    _sampler = Sampler()
     _storage = Storage()
 
     # Exceptions
     Py3Exception = exceptions.Py3Exception
     CommandError = exceptions.CommandError
+    CommandTimeout = exceptions.CommandTimeout
+    DBusError = exceptions.DBusError
+    I3IPCError = exceptions.I3IPCError
     RequestException = exceptions.RequestException
     RequestInvalidJSON = exceptions.RequestInvalidJSON
     RequestTimeout = exceptions.RequestTimeout
@@ -917,30 +939,41 @@ class Py3:
             if self.command_run('which {}'.format(cmd)) == 0:
                 return cmd
 
-    def command_run(self, command):
+    def command_run(self, command, timeout=0):
         """
         Runs a command and returns the exit code.
         The command can either be supplied as a sequence or string.
 
-        An Exception is raised if an error occurs
+        :param command: command to run can be a str or list
+        :param timeout: number of seconds after which the command is killed,
+            by default the command can run for as long as it needs and does
+            not count towards the limit of commands running at once.  Use
+            `None` for the py3status default timeout.
+
+        An Exception is raised if an error occurs, or a CommandTimeout if the
+        command timed out.
         """
-        # convert the command to sequence if a string
+        # make a pretty command for error loggings and...
         if isinstance(command, basestring):
+            pretty_cmd = command
+            # convert the command to sequence if a string
             command = shlex.split(command)
+        else:
+            pretty_cmd = ' '.join(command)
         try:
-            return Popen(
-                command, stdout=PIPE, stderr=PIPE, close_fds=True
-            ).wait()
+            retcode, output, error = self._executor.run(
+                command, pretty_cmd, timeout=timeout,
+                stdout=PIPE, stderr=PIPE, close_fds=True
+            )
+        except exceptions.CommandError:
+            raise
         except Exception as e:
-            # make a pretty command for error loggings and...
-            if isinstance(command, basestring):
-                pretty_cmd = command
-            else:
-                pretty_cmd = ' '.join(command)
             msg = 'Command `{cmd}` {error}'.format(cmd=pretty_cmd, error=e.errno)
             raise exceptions.CommandError(msg, error_code=e.errno)
+        return retcode
 
-    def command_output(self, command, shell=False, capture_stderr=False, localized=False):
+    def command_output(self, command, shell=False, capture_stderr=False,
+                       localized=False, timeout=None, max_age=0):
         """
         Run a command and return its output as unicode.
         The command can either be supplied as a sequence or string.
@@ -949,8 +982,37 @@ class Py3:
         :param shell: if `True` then command is run through the shell
         :param capture_stderr: if `True` then STDERR is piped to STDOUT
         :param localized: if `False` then command is forced to use its default (English) locale
+        :param timeout: number of seconds after which the command is killed,
+            if `None` the py3status default timeout is used and `0` means
+            no timeout.
+        :param max_age: if set then output of the same command, run by any
+            module, less than this many seconds old may be returned instead
+            of running the command again.  If the command is already running
+            for another module then its output will be used.  This is useful
+            for commands that several modules, or module instances, use.
+
+        A CommandError is raised if an error occurs, or a CommandTimeout if the
+        command timed out.
+        """
+        if max_age:
+            key = (
+                command if isinstance(command, basestring) else tuple(command),
+                shell, capture_stderr, localized
+            )
+            return self._command_cache.get(
+                key, max_age,
+                lambda: self._command_output(
+                    command, shell, capture_stderr, localized, timeout
+                )
+            )
+        return self._command_output(
+            command, shell, capture_stderr, localized, timeout
+        )
 
-        A CommandError is raised if an error occurs
+    def _command_output(self, command, shell, capture_stderr, localized,
+                        timeout):
+        """
+        Run a command and return its output, see command_output()
         """
         # make a pretty command for error loggings and...
         if isinstance(command, basestring):
@@ -965,18 +1027,20 @@ class Py3:
         env = self._english_env if not localized else None
 
         try:
-            process = Popen(command, stdout=PIPE, stderr=stderr, close_fds=True,
-                            universal_newlines=True, shell=shell,
-                            env=env)
+            retcode, output, error = self._executor.run(
+                command, pretty_cmd, timeout=timeout,
+                stdout=PIPE, stderr=stderr, close_fds=True,
+                universal_newlines=True, shell=shell, env=env
+            )
+        except exceptions.CommandError:
+            raise
         except Exception as e:
             msg = 'Command `{cmd}` {error}'.format(cmd=pretty_cmd, error=e)
             raise exceptions.CommandError(msg, error_code=e.errno)
 
-        output, error = process.communicate()
         if self._is_python_2 and isinstance(output, str):
             output = output.decode('utf-8')
             error = error.decode('utf-8')
-        retcode = process.poll()
         if retcode:
             # under certain conditions a successfully run command may get a
             # return code of -15 even though correct output was returned see
@@ -996,6 +1060,178 @@ class Py3:
                 )
         return output
 
+    def dbus_get(self, bus_name, object_path=None):
+        """
+        Return a pydbus proxy object on the session bus connection shared by
+        all modules.  Its methods can be called and its properties read as
+        normal.
+
+        :param bus_name: the bus name eg `org.mpris.MediaPlayer2.vlc`
+        :param object_path: the object path, by default the path made from
+            the bus name
+
+        A `DBusError` is raised if D-Bus is not available.
+        """
+        return self._dbus.get(bus_name, object_path)
+
+    def dbus_property(self, bus_name, object_path, interface, name,
+                      cache=True):
+        """
+        Return the value of a D-Bus property.
+
+        Properties are cached and kept up to date from the
+        PropertiesChanged signals of the object so they are only fetched the
+        first time that they are used.  The value is shared with other
+        modules so must not be changed.
+
+        :param bus_name: the bus name eg `org.mpris.MediaPlayer2.vlc`
+        :param object_path: the object path eg `/org/mpris/MediaPlayer2`
+        :param interface: the interface of the property eg
+            `org.mpris.MediaPlayer2.Player`
+        :param name: the name of the property eg `Metadata`
+        :param cache: set to False for properties that change without a
+            signal being sent eg the MPRIS `Position`
+
+        A `DBusError` is raised if the property cannot be read.
+        """
+        return self._dbus.get_property(
+            bus_name, object_path, interface, name, cache=cache
+        )
+
+    def dbus_subscribe(self, callback=None, sender=None, interface=None,
+                       member=None, object_path=None, arg0=None):
+        """
+        Be told about D-Bus signals matching the given rule.  Any part of
+        the rule not given matches everything.
+
+        :param callback: function called with the sender, object path,
+            interface, member and arguments of each signal.  It is called
+            from the D-Bus thread so should return quickly.  If no callback
+            is given the module is updated.
+        :param sender: the bus name sending the signal.  A well known name
+            is matched by its current owner.
+        :param interface: the interface eg `org.freedesktop.DBus.Properties`
+        :param member: the signal name eg `PropertiesChanged`
+        :param object_path: the object path
+        :param arg0: the first argument of the signal if it is a string
+
+        Returns the subscription which can be given to
+        `py3.dbus_unsubscribe()`.  A `DBusError` is raised if D-Bus is not
+        available.
+        """
+        if callback is None:
+            def callback(*args):
+                self.update()
+        return self._dbus.subscribe(
+            callback, sender=sender, interface=interface, member=member,
+            path=object_path, arg0=arg0
+        )
+
+    def dbus_unsubscribe(self, subscription):
+        """
+        Stop a subscription made with `py3.dbus_subscribe()`.
+        """
+        self._dbus.unsubscribe(subscription)
+
+    def i3_msg(self, message='', msg_type='command'):
+        """
+        Send a message to i3 over its IPC socket and return the decoded
+        reply.  This is the same as running `i3-msg -t <msg_type> <message>`
+        but without starting a new process.
+
+        :param message: the message eg an i3 command
+        :param msg_type: the type of the message eg `command`, `get_tree`,
+            `get_workspaces` or `get_outputs`
+
+        An `I3IPCError` is raised if i3 cannot be reached.
+        """
+        return self._i3_ipc.message(msg_type, message)
+
+    def i3_subscribe(self, events, callback=None):
+        """
+        Be told about i3 events.  All modules share one connection to i3.
+
+        :param events: list of the event types eg `['window', 'workspace']`
+        :param callback: function called with the event type and the event
+            data dict whenever one of the events happens.  It is called from
+            the event thread so should return quickly.  If no callback is
+            given the module is updated.
+
+        The module is also updated when events start or stop being received,
+        see `py3.i3_subscribed()`.
+
+        Returns False if the i3 IPC socket cannot be found.
+        """
+        if callback is None:
+            def callback(event, data):
+                self.update()
+        try:
+            self._i3_ipc.get_socket_path()
+        except exceptions.I3IPCError:
+            return False
+        self._i3_ipc.subscribe(events, callback, self.update)
+        return True
+
+    def i3_subscribed(self):
+        """
+        Returns True if i3 events are being received.  A module relying on
+        events for its updates should only use `py3.CACHE_FOREVER` while
+        this is True, as events may not arrive eg before the connection to i3
+        is made or while i3 is restarting.
+        """
+        return self._i3_ipc.subscribed
+
+    def sample_file(self, path, parser=None, max_age=None, timestamp=False):
+        """
+        Read a /proc or /sys file.  The file is read at most once for all
+        modules that use it each time that they update, so this should be
+        used in preference to reading these files directly.
+
+        :param path: the path of the file
+        :param parser: how the file should be parsed.  `lines` gives a list of
+            lines each split into fields, `key_value` gives a dict from
+            `key: value` lines eg /proc/meminfo and `uevent` a dict from
+            `KEY=value` lines.  `mounts` gives a list of (device, mount point,
+            filesystem type) from /proc/mounts and `wireless` a dict of
+            interface to its link, level and noise from /proc/net/wireless.
+            A function taking the file contents can also be given.  If no
+            parser is given the file contents are returned.
+        :param max_age: how many seconds old the shared read of the file can
+            be.  `0` always reads the file again.
+        :param timestamp: if `True` a tuple of the time that the file was
+            read and the result is returned.  The time should be used when
+            working out rates as the read may be a little older than now.
+
+        The result is shared between modules so it must not be changed.
+        An IOError or OSError is raised if the file cannot be read.
+        """
+        if max_age is None:
+            return self._sampler.read(path, parser, timestamp=timestamp)
+        return self._sampler.read(path, parser, max_age, timestamp)
+
+    def command_output_async(self, *args, **kw):
+        """
+        Awaitable version of `py3.command_output()` for use in `async`
+        module methods.  It takes the same arguments.
+
+        `output = await self.py3.command_output_async(['ls', '-l'])`
+
+        Only available when running under python 3.5+.
+        """
+        return self._async_loop.run_in_executor(self.command_output, *args, **kw)
+
+    def watch_file(self, path):
+        """
+        Update the module whenever the file or directory at path changes.  For
+        a directory, files being added, removed or changed inside it count as
+        a change.
+
+        Returns True if the path is being watched, in which case the module
+        can use `py3.CACHE_FOREVER` rather than polling for changes.  False
+        is returned if the path cannot be watched eg it does not exist.
+        """
+        return self._file_watcher.watch(path, self.update)
+
     def _storage_init(self):
         """
         Ensure that storage is initialized.
@@ -1171,7 +1407,7 @@ class Py3:
         return color
 
     def request(self, url, params=None, data=None, headers=None,
-                timeout=None, auth=None, cookiejar=None):
+                timeout=None, auth=None, cookiejar=None, cache=False):
         """
         Make a request to a url and retrieve the results.
 
@@ -1180,6 +1416,9 @@ class Py3:
 
             py3status/<version> <per session random uuid>
 
+        Identical GET requests made at the same time, for example by several
+        modules using the same service, share a single request.
+
         :param url: url to request eg `http://example.com`
         :param params: extra query string parameters as a dict
         :param data: POST data as a dict.  If this is not supplied the GET method will be used
@@ -1187,6 +1426,11 @@ class Py3:
         :param timeout: timeout for the request in seconds
         :param auth: authentication info as tuple `(username, password)`
         :param cookiejar: an object of a CookieJar subclass
+        :param cache: if True successful GET responses are kept and reused.
+            The response is returned without a request while its
+            `Cache-Control: max-age` allows, after that a conditional request
+            is made using its `ETag` or `Last-Modified` headers and the kept
+            response is returned if the server says it has not changed.
 
         :returns: HttpResponse
         """
@@ -1208,10 +1452,111 @@ class Py3:
                 version, self._uid
             )
 
-        return HttpResponse(url,
-                            params=params,
-                            data=data,
-                            headers=headers,
-                            timeout=timeout,
-                            auth=auth,
-                            cookiejar=cookiejar)
+        def make_request():
+            return HttpResponse(url,
+                                params=params,
+                                data=data,
+                                headers=headers,
+                                timeout=timeout,
+                                auth=auth,
+                                cookiejar=cookiejar,
+                                pool=self._http_pool,
+                                cache=self._response_cache if cache else None)
+
+        # identical GET requests made at the same time, eg by several modules,
+        # share a single request.
+        key = None
+        if not data and cookiejar is None:
+            key = request_key(url, params, headers, auth)
+        if key is None:
+            return make_request()
+        # wait no longer than our own timeout for a request already being made
+        try:
+            response, shared = self._request_flights.run(
+                key, lambda: make_request().prefetch(), timeout=timeout
+            )
+        except FlightTimeout:
+            raise exceptions.RequestTimeout('request timed out')
+        if shared:
+            return response.copy()
+        return response
+
+    def request_many(self, requests, timeout=None, max_workers=None):
+        """
+        Make several requests at the same time and return their results in
+        the same order as the requests.
+
+        :param requests: list of requests, each either a url or a dict of
+            arguments for `py3.request()` eg `{'url': url, 'params': params}`
+        :param timeout: time in seconds that all the requests must complete
+            within.  Requests that do not are given as a `RequestTimeout`.
+        :param max_workers: the most requests made at the same time, by
+            default the number of connections allowed to a host.
+
+        :returns: list containing the HttpResponse for each request or the
+            `RequestException`, eg `RequestTimeout` or `RequestURLError`, for
+            those that failed.  Any other exception is raised as it would be
+            by `py3.request()`.
+        """
+        if not max_workers:
+            max_workers = POOL_MAX_PER_HOST
+        # requests still waiting for a result
+        pending = object()
+        results = [pending] * len(requests)
+        todo = collections.deque(enumerate(requests))
+        deadline = time() + timeout if timeout else None
+
+        def make_requests():
+            while True:
+                try:
+                    index, request = todo.popleft()
+                except IndexError:
+                    return
+                if isinstance(request, dict):
+                    kw = dict(request)
+                else:
+                    kw = {'url': request}
+                if deadline:
+                    # the request only gets the time remaining
+                    remaining = deadline - time()
+                    if remaining <= 0:
+                        return
+                    kw['timeout'] = min(kw.get('timeout') or remaining, remaining)
+                try:
+                    results[index] = self.request(**kw)
+                except Exception as e:
+                    results[index] = e
+
+        threads = []
+        for x in range(min(max_workers, len(requests))):
+            thread = Thread(target=make_requests)
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            if deadline:
+                thread.join(max(deadline - time(), 0))
+            else:
+                thread.join()
+        output = []
+        for result in results:
+            if result is pending:
+                output.append(exceptions.RequestTimeout('request timed out'))
+                continue
+            if (isinstance(result, Exception) and
+                    not isinstance(result, exceptions.RequestException)):
+                raise result
+            output.append(result)
+        return output
+
+    def request_async(self, *args, **kw):
+        """
+        Awaitable version of `py3.request()` for use in `async` module
+        methods.  It takes the same arguments.
+
+        `response = await self.py3.request_async(url)`
+
+        Only available when running under python 3.5+.
+        """
+        return self._async_loop.run_in_executor(self.request, *args, **kw)
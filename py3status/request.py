@@ -1,21 +1,39 @@
 import base64
+import copy
+import hashlib
 import json
+import os
+import re
 import socket
 
+from email.message import Message
+from io import BytesIO
+from pickle import dump, load
+from tempfile import NamedTemporaryFile
+from threading import Condition, Lock
+from time import time
+
 try:
     # Python 3
+    from http.client import (
+        BadStatusLine, HTTPConnection, HTTPSConnection
+    )
     from urllib.error import URLError, HTTPError
     from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
     from urllib.request import (
-        urlopen, Request, build_opener, install_opener, HTTPCookieProcessor
+        Request, build_opener, HTTPCookieProcessor, HTTPHandler, HTTPSHandler
     )
+    from urllib.response import addinfourl
     IS_PYTHON_3 = True
 except ImportError:
     # Python 2
-    from urllib import urlencode
+    from httplib import (
+        BadStatusLine, HTTPConnection, HTTPSConnection
+    )
+    from urllib import addinfourl, urlencode
     from urllib2 import (
-        urlopen, Request, URLError, HTTPError,
-        build_opener, install_opener, HTTPCookieProcessor
+        Request, URLError, HTTPError, build_opener, HTTPCookieProcessor,
+        HTTPHandler, HTTPSHandler
     )
     from urlparse import urlsplit, urlunsplit, parse_qsl
     IS_PYTHON_3 = False
@@ -23,6 +41,377 @@ except ImportError:
 from py3status.exceptions import (
     RequestTimeout, RequestURLError, RequestInvalidJSON
 )
+from py3status.util import LRUCache
+
+# seconds an unused connection is kept open for
+POOL_IDLE_TIMEOUT = 30
+
+# maximum number of connections to a host at the same time
+POOL_MAX_PER_HOST = 4
+
+# maximum number of responses held by the ResponseCache
+RESPONSE_CACHE_SIZE = 50
+
+RE_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+# errors that mean a reused connection was closed by the server
+STALE_CONNECTION_ERRORS = (socket.error, BadStatusLine)
+
+# request headers holding credentials, these are only kept as a hash in keys
+SECRET_HEADERS = ('Authorization', 'Cookie', 'Private-Token', 'Proxy-Authorization')
+
+
+def hash_secret(value):
+    """
+    Return a digest of a credential so that it can be part of a cache key,
+    which may be saved to disk, without keeping the credential itself.
+    """
+    return hashlib.sha256(repr(value).encode('utf-8')).hexdigest()
+
+
+def headers_key(headers):
+    """
+    Return the request headers as part of a cache key.  The user agent is
+    different for each module so is not included.
+    """
+    return tuple(sorted(
+        (k, hash_secret(v) if k.title() in SECRET_HEADERS else v)
+        for k, v in headers.items() if k != 'User-Agent'
+    ))
+
+
+def request_key(url, params, headers, auth):
+    """
+    Return a key identifying a GET request so that identical requests can
+    share a response, or None if there isn't one.
+    """
+    try:
+        key = (
+            url,
+            tuple(sorted((params or {}).items())),
+            headers_key(headers),
+            hash_secret(auth) if auth else None,
+        )
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def request_parts(req):
+    """
+    Return the host, selector and data of a urllib Request.
+    """
+    if hasattr(req, 'get_host'):
+        # python 2
+        return req.get_host(), req.get_selector(), req.get_data()
+    return req.host, req.selector, req.data
+
+
+class ConnectionPool:
+    """
+    Keeps http connections open so that they can be reused by later requests
+    to the same host, saving the connection and TLS setup.
+
+    Connections unused for idle_timeout seconds are closed and at most
+    max_per_host connections to a host are used at the same time.
+    """
+
+    def __init__(self, idle_timeout=POOL_IDLE_TIMEOUT,
+                 max_per_host=POOL_MAX_PER_HOST):
+        self.active = {}
+        self.condition = Condition()
+        self.idle = {}
+        self.idle_timeout = idle_timeout
+        self.max_per_host = max_per_host
+        self.opened = 0
+        self.requests = 0
+        self.reused = 0
+        # the opener is only used for requests without a cookiejar
+        self.opener = build_opener(*self.handlers())
+
+    def handlers(self):
+        return [PooledHTTPHandler(self), PooledHTTPSHandler(self)]
+
+    def get_opener(self, cookiejar=None):
+        if cookiejar is None:
+            return self.opener
+        return build_opener(
+            HTTPCookieProcessor(cookiejar), *self.handlers()
+        )
+
+    def get(self, key, timeout):
+        """
+        Return an idle connection for the key or None, once there is a free
+        slot for the host.  If no slot is freed within timeout seconds then
+        socket.timeout is raised.
+        """
+        now = time()
+        with self.condition:
+            while self.active.get(key, 0) >= self.max_per_host:
+                if timeout is None:
+                    self.condition.wait()
+                    continue
+                wait = now + timeout - time()
+                if wait <= 0:
+                    raise socket.timeout('no free connection to the host')
+                self.condition.wait(wait)
+            now = time()
+            self.active[key] = self.active.get(key, 0) + 1
+            self.requests += 1
+            idle = self.idle.get(key, [])
+            while idle:
+                returned, connection = idle.pop()
+                if now - returned < self.idle_timeout:
+                    self.reused += 1
+                    connection.timeout = timeout
+                    connection.sock.settimeout(timeout)
+                    return connection
+                connection.close()
+            self.opened += 1
+        return None
+
+    def release(self, key, connection=None):
+        """
+        Free the slot for the host, keeping the connection if given.
+        """
+        now = time()
+        with self.condition:
+            self.active[key] -= 1
+            if connection:
+                self.idle.setdefault(key, []).append((now, connection))
+            # close any connections that have been idle too long
+            for idle in self.idle.values():
+                while idle and now - idle[0][0] >= self.idle_timeout:
+                    idle.pop(0)[1].close()
+            self.condition.notify()
+
+    def new_connection(self, connection_class, host, timeout, kw):
+        return connection_class(host, timeout=timeout, **kw)
+
+    def send(self, connection, req, headers):
+        host, selector, data = request_parts(req)
+        connection.request(req.get_method(), selector, data, headers)
+        return connection.getresponse()
+
+    def open(self, connection_class, req, **kw):
+        """
+        Make the request and return the response for urllib.  The body is read
+        straight away so that the connection can be reused.
+        """
+        host = request_parts(req)[0]
+        if not host:
+            raise URLError('no host given')
+        timeout = req.timeout
+        if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+            timeout = socket.getdefaulttimeout()
+
+        headers = dict(req.unredirected_hdrs)
+        headers.update(
+            (k, v) for k, v in req.headers.items() if k not in headers
+        )
+        headers = dict((name.title(), val) for name, val in headers.items())
+
+        key = (connection_class, host)
+        connection = self.get(key, timeout)
+        # the slot for the host must be freed however the request ends
+        keep = False
+        try:
+            try:
+                if connection:
+                    try:
+                        response = self.send(connection, req, headers)
+                    except socket.timeout:
+                        raise
+                    except STALE_CONNECTION_ERRORS:
+                        # the server closed the connection so try a new one
+                        connection.close()
+                        connection = None
+                        with self.condition:
+                            self.opened += 1
+                if not connection:
+                    connection = self.new_connection(
+                        connection_class, host, timeout, kw
+                    )
+                    response = self.send(connection, req, headers)
+                body = response.read()
+                keep = not response.will_close
+            except socket.error as err:
+                raise URLError(err)
+        finally:
+            if connection and not keep:
+                connection.close()
+                connection = None
+            self.release(key, connection)
+
+        result = addinfourl(
+            BytesIO(body), response.msg, req.get_full_url(), response.status
+        )
+        result.msg = response.reason
+        return result
+
+    def stats(self):
+        with self.condition:
+            return {
+                'idle': sum(len(x) for x in self.idle.values()),
+                'opened': self.opened,
+                'requests': self.requests,
+                'reused': self.reused,
+            }
+
+
+class CachedResponse:
+    """
+    A response held by the ResponseCache.
+    """
+
+    def __init__(self, text, headers):
+        self.text = text
+        # keep a plain copy of the headers so that they can be pickled
+        self.headers = Message()
+        for name, value in headers.items():
+            self.headers[name] = value
+        self.update(headers)
+
+    def update(self, headers):
+        """
+        Update the validators and expiry time from the response headers.
+        """
+        self.etag = headers.get('ETag') or self.headers.get('ETag')
+        self.last_modified = (
+            headers.get('Last-Modified') or self.headers.get('Last-Modified')
+        )
+        max_age = RE_MAX_AGE.search(headers.get('Cache-Control') or '')
+        self.expires = time() + int(max_age.group(1)) if max_age else 0
+
+    def validators(self):
+        """
+        Return the headers for a conditional request for the response.
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['headers'] = list(self.headers.items())
+        return state
+
+    def __setstate__(self, state):
+        headers = Message()
+        for name, value in state['headers']:
+            headers[name] = value
+        self.__dict__.update(state)
+        self.headers = headers
+
+
+class ResponseCache:
+    """
+    Keeps successful GET responses that can be revalidated, using their
+    `ETag` or `Last-Modified` headers, or reused for their
+    `Cache-Control: max-age`.
+    """
+
+    def __init__(self, size=RESPONSE_CACHE_SIZE):
+        self.cache = LRUCache(size)
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def key(self, url, headers):
+        return (url, headers_key(headers))
+
+    def get(self, key):
+        entry = self.cache.get(key)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+            elif entry.expires > time():
+                self.hits += 1
+        return entry
+
+    def revalidate(self, entry, headers):
+        """
+        The server has told us that the cached response is still valid.
+        """
+        entry.update(headers)
+        with self.lock:
+            self.revalidated += 1
+
+    def store(self, key, response):
+        headers = response.headers
+        cache_control = headers.get('Cache-Control') or ''
+        if 'no-store' in cache_control:
+            return
+        try:
+            entry = CachedResponse(response.text, headers)
+        except (LookupError, UnicodeDecodeError):
+            return
+        if entry.etag or entry.last_modified or entry.expires:
+            self.cache[key] = entry
+
+    def load(self, path):
+        """
+        Load saved responses, returning False if they could not be read.
+        """
+        try:
+            with open(path, 'rb') as f:
+                items = load(f)
+        except Exception:
+            return False
+        for key, entry in items:
+            self.cache[key] = entry
+        return True
+
+    def save(self, path):
+        """
+        Save the responses to disk.  They may include private data so only
+        the user can read the file.
+        """
+        with NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as f:
+            # we use protocol=2 for python 2/3 compatibility
+            dump(self.cache.items(), f, protocol=2)
+            tmppath = f.name
+        os.rename(tmppath, path)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidated': self.revalidated,
+                'size': len(self.cache),
+            }
+
+
+class PooledHTTPHandler(HTTPHandler):
+
+    def __init__(self, pool):
+        HTTPHandler.__init__(self)
+        self.pool = pool
+
+    def http_open(self, req):
+        return self.pool.open(HTTPConnection, req)
+
+
+class PooledHTTPSHandler(HTTPSHandler):
+
+    def __init__(self, pool):
+        HTTPSHandler.__init__(self)
+        self.pool = pool
+
+    def https_open(self, req):
+        if getattr(req, '_tunnel_host', None):
+            # proxy tunnels are not pooled
+            return HTTPSHandler.https_open(self, req)
+        kw = {}
+        if getattr(self, '_context', None):
+            kw['context'] = self._context
+        return self.pool.open(HTTPSConnection, req, **kw)
 
 
 class HttpResponse:
@@ -32,7 +421,8 @@ class HttpResponse:
     The aim is to support both python 2 and 3 and be a simple as possible
     """
 
-    def __init__(self, url, params, data, headers, timeout, auth, cookiejar):
+    def __init__(self, url, params, data, headers, timeout, auth, cookiejar,
+                 pool=None, cache=None):
         # fix the url if needed
         url_parts = urlsplit(url)
         if url_parts.query or params:
@@ -54,18 +444,37 @@ class HttpResponse:
             data = urlencode(data).encode()
         if cookiejar is not None:
             self._cookiejar = cookiejar
+        if pool:
+            opener = pool.get_opener(cookiejar)
+        elif cookiejar is not None:
             opener = build_opener(HTTPCookieProcessor(cookiejar))
-            install_opener(opener)
+        else:
+            opener = build_opener()
+
+        # only GET requests are cached
+        entry = None
+        if cache is not None and not data:
+            cache_key = cache.key(url, headers)
+            entry = cache.get(cache_key)
+            if entry:
+                if entry.expires > time():
+                    self._set_cached(entry)
+                    return
+                headers = dict(headers, **entry.validators())
 
         request = Request(url, headers=headers)
 
         try:
-            self._response = urlopen(request, data=data, timeout=timeout)
+            self._response = opener.open(request, data=data, timeout=timeout)
             self._error_message = None
         except URLError as e:
             reason = e.reason
             if isinstance(reason, socket.timeout):
                 raise RequestTimeout('request timed out')
+            elif isinstance(e, HTTPError) and e.code == 304 and entry:
+                # not modified so use the cached response
+                cache.revalidate(entry, e.headers)
+                self._set_cached(entry)
             elif isinstance(e, HTTPError):
                 self._status_code = e.code
                 self._error_message = reason
@@ -79,6 +488,35 @@ class HttpResponse:
                 raise RequestURLError(reason)
         except socket.timeout:
             raise RequestTimeout('request timed out')
+        else:
+            if cache is not None and not data and self.status_code == 200:
+                cache.store(cache_key, self)
+
+    def prefetch(self):
+        """
+        Read the response body now so that the response can be shared.
+        """
+        try:
+            self.text
+        except (LookupError, UnicodeDecodeError):
+            pass
+        return self
+
+    def copy(self):
+        """
+        Return a copy of the response for another module.  Parsed json is not
+        shared as modules may change it.
+        """
+        response = copy.copy(self)
+        if getattr(response, '_json', None) is not None:
+            del response._json
+        return response
+
+    def _set_cached(self, entry):
+        self._status_code = 200
+        self._error_message = None
+        self._text = entry.text
+        self._headers = entry.headers
 
     @property
     def status_code(self):
@@ -0,0 +1,195 @@
+import os
+import re
+
+from threading import Lock
+from time import time
+
+# how long a sample can be used for before the file is read again
+SAMPLE_AGE = 0.25
+
+READ_SIZE = 65536
+
+
+def parse_lines(content):
+    """
+    Split into lines of whitespace separated fields.
+    """
+    return [line.split() for line in content.splitlines()]
+
+
+def parse_key_value(content):
+    """
+    Parse `key: value [unit]` lines as found in /proc/meminfo into a dict.
+    Values are converted to numbers if possible.
+    """
+    result = {}
+    for line in content.splitlines():
+        key, _, value = line.partition(':')
+        value = value.split()
+        if not value:
+            continue
+        try:
+            result[key.strip()] = int(value[0])
+        except ValueError:
+            result[key.strip()] = value[0]
+    return result
+
+
+def parse_uevent(content):
+    """
+    Parse `KEY=value` lines as found in /sys uevent files into a dict.
+    Values are converted to ints if possible.
+    """
+    result = {}
+    for line in content.splitlines():
+        key, _, value = line.partition('=')
+        try:
+            result[key] = int(value)
+        except ValueError:
+            result[key] = value
+    return result
+
+
+def parse_mounts(content):
+    """
+    Parse /proc/mounts into a list of (device, mount point, filesystem type).
+    Octal escapes eg `\\040` for a space are decoded.
+    """
+    def unescape(value):
+        return re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), value)
+
+    result = []
+    for line in content.splitlines():
+        fields = line.split()
+        if len(fields) >= 3:
+            result.append((unescape(fields[0]), unescape(fields[1]), fields[2]))
+    return result
+
+
+def parse_wireless(content):
+    """
+    Parse /proc/net/wireless into a dict of interface to a dict of its link
+    quality, signal level and noise level.
+    """
+    result = {}
+    # the first two lines are headings
+    for line in content.splitlines()[2:]:
+        interface, _, values = line.partition(':')
+        values = values.split()
+        if len(values) < 4:
+            continue
+        try:
+            result[interface.strip()] = {
+                'link': float(values[1].rstrip('.')),
+                'level': float(values[2].rstrip('.')),
+                'noise': float(values[3].rstrip('.')),
+            }
+        except ValueError:
+            continue
+    return result
+
+
+PARSERS = {
+    'key_value': parse_key_value,
+    'lines': parse_lines,
+    'mounts': parse_mounts,
+    'uevent': parse_uevent,
+    'wireless': parse_wireless,
+}
+
+
+def pread(fd):
+    """
+    Read the whole file from the start.
+    """
+    data = []
+    offset = 0
+    while True:
+        try:
+            chunk = os.pread(fd, READ_SIZE, offset)
+        except AttributeError:
+            # python 2
+            os.lseek(fd, offset, os.SEEK_SET)
+            chunk = os.read(fd, READ_SIZE)
+        if not chunk:
+            break
+        data.append(chunk)
+        offset += len(chunk)
+    return b''.join(data).decode('utf-8', 'replace')
+
+
+class Sampler:
+    """
+    Reads /proc and /sys files for modules.
+
+    Each file is read at most once per SAMPLE_AGE no matter how many modules
+    use it.  Files are kept open and re-read from the start, and the parsed
+    results are shared too.
+    """
+
+    def __init__(self):
+        self.fds = {}
+        self.lock = Lock()
+        self.samples = {}
+        self.reads = 0
+        self.requests = 0
+
+    def read(self, path, parser=None, max_age=SAMPLE_AGE, timestamp=False):
+        """
+        Return the contents of the file at path, parsed with parser if given.
+        parser can be a function or the name of one of the PARSERS.
+        The parsed result is shared so must not be changed.
+        If timestamp is True a tuple of the time the file was read and the
+        result is returned.
+        An IOError or OSError is raised if the file cannot be read.
+        """
+        parser = PARSERS.get(parser, parser)
+        with self.lock:
+            self.requests += 1
+            now = time()
+            sample = self.samples.get(path)
+            if not sample or now - sample[0] >= max_age:
+                # a sample is the time, contents and any parsed versions
+                sample = (now, self._read(path), {})
+                self.samples[path] = sample
+            if not parser:
+                result = sample[1]
+            elif parser in sample[2]:
+                result = sample[2][parser]
+            else:
+                result = parser(sample[1])
+                sample[2][parser] = result
+        if timestamp:
+            return sample[0], result
+        return result
+
+    def _read(self, path):
+        fd = self.fds.get(path)
+        if fd is None:
+            fd = os.open(path, os.O_RDONLY)
+            self.fds[path] = fd
+        try:
+            content = pread(fd)
+        except (IOError, OSError):
+            # the file may have gone eg a battery was removed
+            self._close(path)
+            raise
+        self.reads += 1
+        return content
+
+    def _close(self, path):
+        """
+        Close the file and forget any samples of it.
+        """
+        fd = self.fds.pop(path, None)
+        if fd is not None:
+            os.close(fd)
+        self.samples.pop(path, None)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'files': len(self.fds),
+                'reads': self.reads,
+                'requests': self.requests,
+            }
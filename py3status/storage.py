@@ -1,18 +1,192 @@
 from __future__ import with_statement
 
+import atexit
 import os
 
 from collections import Iterable, Mapping
-from pickle import dump, load
+from pickle import dump, dumps, load, loads
 from tempfile import NamedTemporaryFile
+from threading import Condition, RLock, Thread
 from time import time
 
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+# default seconds to wait for further changes before saving
+WRITE_DELAY = 5
+
+# default maximum seconds a change can wait before it is saved
+MAX_WRITE_DELAY = 60
+
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+
+def load_pickle(f):
+    try:
+        # python3
+        return load(f, encoding='bytes')
+    except TypeError:
+        # python2
+        return load(f)
+
+
+def loads_pickle(data):
+    try:
+        # python3
+        return loads(data, encoding='bytes')
+    except TypeError:
+        # python2
+        return loads(data)
+
+
+class PickleBackend:
+    """
+    Stores the data of all modules in a single pickled file.  The whole file
+    is rewritten when anything changes.
+
+    An sqlite storage file at the path, eg after changing back from the
+    sqlite backend, has its data imported and is replaced when first saved.
+    """
+
+    name = 'pickle'
+
+    def __init__(self, path):
+        self.path = path
+        self.migrated = False
+        self.data = {}
+        try:
+            with open(path, 'rb') as f:
+                is_sqlite = f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+                if not is_sqlite:
+                    f.seek(0)
+                    self.data = load_pickle(f)
+        except IOError:
+            return
+        if is_sqlite:
+            if sqlite3:
+                backend = SqliteBackend(path)
+                self.data = backend.load_all()
+                backend.connection.close()
+            else:
+                # we cannot read it so keep it rather than overwrite it
+                os.rename(path, path + '.sqlite')
+            self.migrated = True
+
+    def load(self, module_name):
+        return self.data.get(module_name, {})
+
+    def save(self, data, changed):
+        for module_name in set(module for module, key in changed):
+            self.data[module_name] = data[module_name]
+        # We want to always have a valid file.
+        with NamedTemporaryFile(
+            dir=os.path.dirname(self.path), delete=False
+        ) as f:
+            # we use protocol=2 for python 2/3 compatibility
+            dump(self.data, f, protocol=2)
+            f.flush()
+            os.fsync(f.fileno())
+            tmppath = f.name
+        os.rename(tmppath, self.path)
+
+
+class SqliteBackend:
+    """
+    Stores each key of each module as its own row in an sqlite database so
+    that only the changed keys are written.
+
+    An existing pickled storage file at the path is moved to `<path>.bak`
+    and its data imported.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self.migrated = False
+        data = None
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                if f.read(len(SQLITE_HEADER)) != SQLITE_HEADER:
+                    f.seek(0)
+                    data = load_pickle(f)
+            if data is not None:
+                os.rename(path, path + '.bak')
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS storage ('
+            'module TEXT, key TEXT, value BLOB, PRIMARY KEY (module, key))'
+        )
+        self.connection.commit()
+        if data:
+            changed = [(module, key) for module in data for key in data[module]]
+            self.save(data, changed)
+            self.migrated = True
+
+    def load(self, module_name):
+        rows = self.connection.execute(
+            'SELECT key, value FROM storage WHERE module = ?', (module_name,)
+        )
+        return dict((key, loads_pickle(bytes(value))) for key, value in rows)
+
+    def load_all(self):
+        """
+        Return the data of every module.
+        """
+        data = {}
+        rows = self.connection.execute('SELECT module, key, value FROM storage')
+        for module_name, key, value in rows:
+            data.setdefault(module_name, {})[key] = loads_pickle(bytes(value))
+        return data
+
+    def save(self, data, changed):
+        with self.connection:
+            for module_name, key in changed:
+                module_data = data.get(module_name, {})
+                if key in module_data:
+                    # we use protocol=2 for python 2/3 compatibility
+                    value = sqlite3.Binary(dumps(module_data[key], protocol=2))
+                    self.connection.execute(
+                        'INSERT OR REPLACE INTO storage VALUES (?, ?, ?)',
+                        (module_name, key, value)
+                    )
+                else:
+                    self.connection.execute(
+                        'DELETE FROM storage WHERE module = ? AND key = ?',
+                        (module_name, key)
+                    )
+
 
 class Storage:
 
     data = {}
     initialized = False
 
+    def __init__(self):
+        self.lock = RLock()
+        # signals the flush thread that there are unsaved changes
+        self.condition = Condition(self.lock)
+        self.backend = None
+        self.dirty = set()
+        self.changes = 0
+        self.dirty_since = None
+        self.last_change = None
+        self.flush_thread = None
+        self.write_errors = 0
+        self.writes = 0
+        self.set_write_delay(WRITE_DELAY, MAX_WRITE_DELAY)
+
+    def set_write_delay(self, delay, max_delay):
+        """
+        Changes are saved once there have been no more for delay seconds, but
+        never later than max_delay seconds after the first unsaved change.  A
+        delay of 0 saves every change immediately.
+        """
+        self.write_delay = delay
+        self.max_write_delay = max(delay, max_delay)
+
     def init(self, py3_wrapper, is_python_2):
         self.is_python_2 = is_python_2
         self.py3_wrapper = py3_wrapper
@@ -49,20 +223,27 @@ class Storage:
             )
             os.rename(legacy_storage_path, self.storage_path)
 
-        try:
-            with open(self.storage_path, 'rb') as f:
-                try:
-                    # python3
-                    self.data = load(f, encoding='bytes')
-                except TypeError:
-                    # python2
-                    self.data = load(f)
-        except IOError:
-            pass
+        backend = py3_config.get('py3status', {}).get('storage_backend', 'pickle')
+        if backend not in ['pickle', 'sqlite']:
+            self.py3_wrapper.log(
+                'invalid storage_backend {}, using pickle'.format(backend)
+            )
+        if backend == 'sqlite' and sqlite3:
+            self.backend = SqliteBackend(self.storage_path)
+        else:
+            self.backend = PickleBackend(self.storage_path)
+        if self.backend.migrated:
+            self.py3_wrapper.log('migrated storage_path {} to {}'.format(
+                self.storage_path, self.backend.name
+            ))
+        # module data is loaded when first used
+        self.data = {}
 
-        self.py3_wrapper.log('storage_path: {}'.format(self.storage_path))
-        if self.data:
-            self.py3_wrapper.log('storage_data: {}'.format(self.data))
+        self.py3_wrapper.log('storage_path: {} ({})'.format(
+            self.storage_path, self.backend.name
+        ))
+        # make sure that any unsaved changes are not lost
+        atexit.register(self.flush)
         self.initialized = True
 
     def get_legacy_storage_path(self):
@@ -80,17 +261,79 @@ class Storage:
 
     def save(self):
         """
-        Save our data to disk. We want to always have a valid file.
+        Save the changed keys to disk.
         """
-        with NamedTemporaryFile(
-            dir=os.path.dirname(self.storage_path), delete=False
-        ) as f:
-            # we use protocol=2 for python 2/3 compatibility
-            dump(self.data, f, protocol=2)
-            f.flush()
-            os.fsync(f.fileno())
-            tmppath = f.name
-        os.rename(tmppath, self.storage_path)
+        with self.lock:
+            self.backend.save(self.data, self.dirty)
+            self.dirty = set()
+            self.writes += 1
+
+    def changed(self, module_name, *keys):
+        """
+        The keys have changed so schedule them to be saved.
+        """
+        with self.lock:
+            self.changes += 1
+            for key in keys:
+                self.dirty.add((module_name, key))
+            if not self.write_delay:
+                self.save()
+                return
+            self.last_change = time()
+            if self.dirty_since is None:
+                self.dirty_since = self.last_change
+            if not self.flush_thread:
+                self.flush_thread = Thread(target=self.flush_changes)
+                self.flush_thread.daemon = True
+                self.flush_thread.start()
+            self.condition.notify()
+
+    def flush_changes(self):
+        """
+        Runs in its own thread saving changes once they are due.  If saving
+        fails the error is reported and it is tried again later.
+        """
+        with self.lock:
+            while True:
+                if self.dirty_since is None:
+                    self.condition.wait()
+                    continue
+                due = min(
+                    self.last_change + self.write_delay,
+                    self.dirty_since + self.max_write_delay,
+                )
+                wait = due - time()
+                if wait > 0:
+                    self.condition.wait(wait)
+                    continue
+                try:
+                    self.flush()
+                except Exception:
+                    self.write_errors += 1
+                    self.py3_wrapper.report_exception('Storage write failed')
+                    # the changes are still dirty so retry after a delay
+                    self.dirty_since = self.last_change = time()
+
+    def flush(self):
+        """
+        Save any unsaved changes now.
+        """
+        with self.lock:
+            if self.dirty_since is None:
+                return
+            self.save()
+            self.dirty_since = None
+
+    def stats(self):
+        with self.lock:
+            return {
+                'backend': self.backend.name if self.backend else None,
+                'changes': self.changes,
+                'pending': self.dirty_since is not None,
+                'write_errors': self.write_errors,
+                'writes': self.writes,
+                'writes_saved': self.changes - self.writes,
+            }
 
     def fix(self, item):
         """
@@ -115,27 +358,38 @@ class Storage:
 
         key = self.fix(key)
         value = self.fix(value)
-        if self.data.get(module_name, {}).get(key) == value:
-            return
+        with self.lock:
+            data = self.module_data(module_name)
+            if data.get(key) == value:
+                return
 
-        if module_name not in self.data:
-            self.data[module_name] = {}
-        self.data[module_name][key] = value
-        ts = time()
-        if '_ctime' not in self.data[module_name]:
-            self.data[module_name]['_ctime'] = ts
-        self.data[module_name]['_mtime'] = ts
-        self.save()
+            data[key] = value
+            ts = time()
+            if '_ctime' not in data:
+                data['_ctime'] = ts
+            data['_mtime'] = ts
+            self.changed(module_name, key, '_ctime', '_mtime')
+
+    def module_data(self, module_name):
+        """
+        Return the data of the module, loading it if needed.
+        """
+        with self.lock:
+            if module_name not in self.data:
+                self.data[module_name] = self.backend.load(module_name)
+            return self.data[module_name]
 
     def storage_get(self, module_name, key):
         key = self.fix(key)
-        return self.data.get(module_name, {}).get(key, None)
+        return self.module_data(module_name).get(key, None)
 
     def storage_del(self, module_name, key=None):
         key = self.fix(key)
-        if module_name in self.data and key in self.data[module_name]:
-            del self.data[module_name][key]
-            self.save()
+        with self.lock:
+            data = self.module_data(module_name)
+            if key in data:
+                del data[key]
+                self.changed(module_name, key)
 
     def storage_keys(self, module_name):
-        return self.data.get(module_name, {}).keys()
+        return self.module_data(module_name).keys()
@@ -2,8 +2,176 @@
 from __future__ import division
 
 import re
+from collections import OrderedDict
 from colorsys import rgb_to_hsv, hsv_to_rgb
 from math import modf
+from threading import Event, Lock
+
+
+class LRUCache:
+    """
+    A thread safe dict like cache holding at most max_size items.  When full
+    the least recently used item is evicted.
+    """
+
+    def __init__(self, max_size=128):
+        self.lock = Lock()
+        self.data = OrderedDict()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getitem__(self, key):
+        with self.lock:
+            try:
+                value = self.data[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            self.hits += 1
+            # make it the most recently used item
+            try:
+                self.data.move_to_end(key)
+            except AttributeError:
+                # python 2
+                del self.data[key]
+                self.data[key] = value
+            return value
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.data.pop(key, None)
+            self.data[key] = value
+            self._trim()
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def _trim(self):
+        while len(self.data) > self.max_size:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def resize(self, max_size):
+        """
+        Change the maximum size, evicting items if needed.
+        """
+        with self.lock:
+            self.max_size = max_size
+            self._trim()
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def items(self):
+        """
+        Return a list of the items, least recently used first.
+        """
+        with self.lock:
+            return list(self.data.items())
+
+    def stats(self):
+        """
+        Return a dict of the cache statistics.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.data),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0,
+            }
+
+
+class FlightTimeout(Exception):
+    """
+    A call made by SingleFlight did not finish in time.
+    """
+
+
+class InFlight:
+    """
+    A call being made by SingleFlight.
+    """
+
+    def __init__(self):
+        self.done = Event()
+        self.error = None
+        self.result = None
+
+
+class SingleFlight:
+    """
+    Makes sure that a call for a key is only in progress once.  Anyone making
+    the same call while it is in progress waits for and shares its result.
+    """
+
+    def __init__(self):
+        self.in_flight = {}
+        self.lock = Lock()
+        self.calls = 0
+        self.joined = 0
+        self.timeouts = 0
+
+    def run(self, key, function, timeout=None):
+        """
+        Return a tuple of the result of function and whether the result came
+        from a call that was already in progress.  Exceptions raised by the
+        function are raised for everyone waiting for the result.
+
+        A call already in progress is waited for at most timeout seconds,
+        after that FlightTimeout is raised.
+        """
+        with self.lock:
+            flight = self.in_flight.get(key)
+            if flight:
+                self.joined += 1
+            else:
+                self.calls += 1
+                leader = InFlight()
+                self.in_flight[key] = leader
+
+        if flight:
+            if not flight.done.wait(timeout):
+                with self.lock:
+                    self.timeouts += 1
+                raise FlightTimeout()
+            if flight.error:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            leader.result = function()
+        except Exception as e:
+            leader.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            leader.done.set()
+        return leader.result, False
+
+    def stats(self):
+        with self.lock:
+            return {
+                'calls': self.calls,
+                'joined': self.joined,
+                'timeouts': self.timeouts,
+            }
 
 
 class Gradiants:
@@ -0,0 +1,7 @@
+import sys
+
+collect_ignore = []
+
+if sys.version_info < (3, 5):
+    # async def is a syntax error
+    collect_ignore.append('test_async.py')
@@ -0,0 +1,104 @@
+"""
+Run async module tests
+"""
+
+from time import sleep, time
+
+from py3status.module import Module
+from test_module import UpdateCountingWrapper
+
+
+class Py3status:
+
+    def __init__(self):
+        self.clicks = []
+
+    async def first(self):
+        output = await self.py3.command_output_async(['echo', 'async'])
+        return {'full_text': output.strip()}
+
+    def second(self):
+        return {'full_text': 'sync'}
+
+    async def on_click(self, event):
+        await self.py3.command_output_async(['sleep', '0.2'])
+        if event['button'] == 3:
+            raise ValueError('bad click')
+        if event['button'] == 2:
+            self.py3.prevent_refresh()
+        self.clicks.append(event['button'])
+
+
+class QueueingWrapper(UpdateCountingWrapper):
+
+    def __init__(self, config):
+        UpdateCountingWrapper.__init__(self, config)
+        self.queued = []
+
+    def timeout_queue_add(self, module, cache_time=0):
+        self.queued.append(module)
+
+
+def make_module():
+    py3_config = {
+        'general': {},
+        'py3status': {},
+        '.module_groups': {},
+        'test_module': {},
+    }
+    wrapper = QueueingWrapper(py3_config)
+    wrapper.exceptions = []
+    wrapper.report_exception = lambda msg, **kw: wrapper.exceptions.append(msg)
+    module = Module('test_module', {}, wrapper, Py3status())
+    module.prepare_module()
+    return module, wrapper
+
+
+def wait_for(condition, timeout=5):
+    end = time() + timeout
+    while not condition() and time() < end:
+        sleep(0.01)
+    return condition()
+
+
+def test_async_method():
+    module, wrapper = make_module()
+    assert module.methods['first']['is_async']
+    assert not module.methods['second']['is_async']
+
+    # the sync method gives its output straight away while the async one
+    # runs on the loop and asks for the module to be run when done
+    module.run()
+    assert [x['full_text'] for x in module.get_latest()] == ['sync']
+    queued = len(wrapper.queued)
+    assert wait_for(lambda: len(wrapper.queued) == queued + 1)
+    assert module.methods['first']['future'].done()
+
+    module.run()
+    assert [x['full_text'] for x in module.get_latest()] == ['async', 'sync']
+    assert module.methods['first']['future'] is None
+    assert module.stats.stats()['methods']['first']['calls'] == 1
+
+
+def test_async_on_click():
+    module, wrapper = make_module()
+    # the click does not wait for on_click to finish
+    start = time()
+    module.click_event({'button': 1, 'name': 'test_module'})
+    assert time() - start < 0.2
+    assert module.module_class.clicks == []
+    # then the module is refreshed
+    queued = len(wrapper.queued)
+    assert wait_for(lambda: len(wrapper.queued) == queued + 1)
+    assert module.module_class.clicks == [1]
+
+    # unless on_click prevents it
+    module.click_event({'button': 2, 'name': 'test_module'})
+    assert wait_for(lambda: module.module_class.clicks == [1, 2])
+    sleep(0.1)
+    assert len(wrapper.queued) == queued + 1
+
+    # errors are reported
+    module.click_event({'button': 3, 'name': 'test_module'})
+    assert wait_for(lambda: wrapper.exceptions)
+    assert wrapper.exceptions == ['on_click event in `test_module` failed']
@@ -0,0 +1,58 @@
+"""
+Run command tests
+"""
+
+import json
+import socket
+
+from py3status.command import CommandServer, read_reply
+
+
+class MockPy3statusWrapper:
+
+    def __init__(self):
+        self.config = {'debug': False}
+        self.output_modules = {
+            'sysdata': {
+                'type': 'py3status',
+                'module': MockModule('sysdata'),
+            },
+        }
+
+    def get_stats(self, modules=None):
+        return {'modules': {'requested': sorted(modules or [])}}
+
+    def log(self, *arg, **kw):
+        pass
+
+    def report_exception(self, *arg, **kw):
+        pass
+
+
+class MockModule:
+
+    def __init__(self, name):
+        self.module_nice_name = name
+
+
+def send(server, data):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(server.server_address)
+    try:
+        sock.sendall(json.dumps(data).encode('utf-8'))
+        return read_reply(sock)
+    finally:
+        sock.close()
+
+
+def test_stats_reply():
+    server = CommandServer(MockPy3statusWrapper())
+    server.daemon = True
+    server.start()
+    try:
+        reply = send(server, {'command': 'stats', 'module': []})
+        assert reply == {'modules': {'requested': []}}
+        reply = send(server, {'command': 'stats', 'module': ['sysdata']})
+        assert reply == {'modules': {'requested': ['sysdata']}}
+    finally:
+        server.kill()
@@ -0,0 +1,210 @@
+"""
+Run core tests
+"""
+
+from collections import deque
+from threading import Event
+from time import sleep, time
+
+from py3status.core import FrameLimiter, Py3statusWrapper, WorkerPool
+
+
+class MockPy3statusWrapper:
+
+    def __init__(self):
+        self.config = {'debug': False}
+        self.timeout_finished = deque()
+
+    def log(self, *arg, **kw):
+        pass
+
+    def report_exception(self, *arg, **kw):
+        pass
+
+
+def wait_for(condition, timeout=5):
+    end = time() + timeout
+    while not condition() and time() < end:
+        sleep(0.01)
+    return condition()
+
+
+class MockModule:
+
+    def __init__(self, done):
+        self.done = done
+
+    def run(self):
+        self.done.set()
+
+
+def test_worker_pool_reuse():
+    wrapper = MockPy3statusWrapper()
+    pool = WorkerPool(wrapper, 2)
+    for x in range(10):
+        done = Event()
+        pool.add(MockModule(done), 'module {}'.format(x))
+        assert done.wait(5)
+        assert wait_for(lambda: pool.stats()['busy'] == 0)
+    # workers are reused rather than one thread per run
+    assert pool.stats()['workers'] == 1
+    assert pool.stats()['jobs'] == 10
+
+
+def test_worker_pool_bounded():
+    wrapper = MockPy3statusWrapper()
+    pool = WorkerPool(wrapper, 3)
+    release = Event()
+
+    class BlockingModule:
+        def run(self):
+            release.wait(5)
+
+    for x in range(6):
+        pool.add(BlockingModule(), None)
+    assert wait_for(lambda: pool.stats()['busy'] == 3)
+    stats = pool.stats()
+    assert stats['workers'] == 3
+    assert stats['queue_depth'] == 3
+    release.set()
+    assert wait_for(lambda: pool.stats()['jobs'] == 6)
+
+
+class MockWorkerPool:
+
+    def __init__(self):
+        self.run = []
+
+    def add(self, module, module_name):
+        self.run.append(module)
+
+
+class MockTask:
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+def make_wrapper(slack=0):
+    wrapper = Py3statusWrapper(None)
+    wrapper.timeout_slack = slack
+    wrapper.worker_pool = MockWorkerPool()
+    return wrapper
+
+
+def test_timeout_queue_order():
+    wrapper = make_wrapper()
+    now = time()
+    tasks = [MockTask(str(x)) for x in range(5)]
+    for index, task in enumerate(tasks):
+        wrapper.timeout_queue_add(task, now - index)
+    wrapper.timeout_queue_process()
+    assert wrapper.worker_pool.run == list(reversed(tasks))
+    assert wrapper.timeout_due is None
+
+
+def test_timeout_queue_reschedule():
+    wrapper = make_wrapper()
+    task = MockTask('task')
+    later = MockTask('later')
+    wrapper.timeout_queue_add(task, time() + 1000)
+    wrapper.timeout_queue_add(later, time() + 2000)
+    wrapper.timeout_queue_process()
+    assert wrapper.timeout_due == wrapper.timeout_queue_lookup[task][0]
+    # rescheduling cancels the previous entry
+    wrapper.timeout_queue_add(task, time() + 3000)
+    wrapper.timeout_queue_process()
+    assert wrapper.timeout_due == wrapper.timeout_queue_lookup[later][0]
+    assert len(wrapper.timeout_queue) == 2
+    # a cache_time of 0 runs it now
+    wrapper.timeout_queue_add(task)
+    wrapper.timeout_queue_process()
+    assert wrapper.worker_pool.run == [task]
+    assert task not in wrapper.timeout_queue_lookup
+
+
+def test_timeout_queue_slack():
+    wrapper = make_wrapper(slack=0.5)
+    first = MockTask('first')
+    second = MockTask('second')
+    now = time()
+    wrapper.timeout_queue_add(first, now + 1)
+    wrapper.timeout_queue_add(second, now + 1.2)
+    wait = wrapper.timeout_queue_process()
+    # we wake up late enough to process both
+    assert wait > 1.2
+    assert wait <= 1.5
+
+
+class MockClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_frame_limiter():
+    clock = MockClock()
+    limiter = FrameLimiter(0.5, clock=clock)
+    # the first frame is never held back and updates arriving together are
+    # not merged by the limit
+    assert limiter.wait_time() is None
+    assert limiter.ready(updates=2)
+    limiter.written(2)
+
+    # updates arriving within the interval are held back for one frame
+    clock.now += 0.125
+    assert not limiter.ready(updates=1)
+    assert limiter.wait_time() == 0.375
+    clock.now += 0.25
+    assert not limiter.ready(updates=2)
+    assert limiter.wait_time() == 0.125
+
+    # the held back frame is flushed once due
+    clock.now += 0.125
+    assert limiter.wait_time() == 0
+    assert limiter.ready(updates=3)
+    limiter.written(3)
+    assert limiter.wait_time() is None
+
+    # urgent updates are not held back
+    clock.now += 0.125
+    assert limiter.ready(urgent=True)
+    limiter.written(1)
+
+    assert limiter.stats() == {'frames_written': 3, 'updates_merged': 2}
+
+
+def test_frame_limiter_unlimited():
+    clock = MockClock()
+    limiter = FrameLimiter(0, clock=clock)
+    for x in range(3):
+        assert limiter.ready(updates=3)
+        limiter.written(3)
+    assert limiter.wait_time() is None
+    # nothing was held back so nothing was merged
+    assert limiter.stats() == {'frames_written': 3, 'updates_merged': 0}
+
+
+def test_config_number():
+    wrapper = make_wrapper()
+    warnings = []
+    wrapper.notify_user = lambda msg, **kw: warnings.append(msg)
+    wrapper.config['py3_config'] = {'py3status': {
+        'workers': 0, 'timer_slack': 0.5, 'max_fps': 'fast', 'command_limit': 2.5,
+    }}
+    assert wrapper.config_number('workers', 4, 1, integer=True) == 4
+    assert wrapper.config_number('timer_slack', 0) == 0.5
+    assert wrapper.config_number('max_fps', 30) == 30
+    assert wrapper.config_number('command_limit', 8, 1, integer=True) == 8
+    # options that are not set use the default without a warning
+    assert wrapper.config_number('command_timeout', 10) == 10
+    assert warnings == [
+        'Invalid `workers` setting, using default of 4.',
+        'Invalid `max_fps` setting, using default of 30.',
+        'Invalid `command_limit` setting, using default of 8.',
+    ]
@@ -0,0 +1,155 @@
+"""
+Test the shared D-Bus service against a private session bus
+"""
+
+from distutils.spawn import find_executable
+from subprocess import Popen, PIPE
+from time import sleep, time
+
+import pytest
+
+pydbus = pytest.importorskip('pydbus')
+
+from pydbus.generic import signal  # noqa e402
+
+from py3status.dbus_service import DBusService, PROPERTIES  # noqa e402
+from py3status.exceptions import DBusError  # noqa e402
+
+if not find_executable('dbus-daemon'):
+    pytest.skip('dbus-daemon is not installed', allow_module_level=True)
+
+BUS_NAME = 'org.py3status.Test'
+PATH = '/org/py3status/Test'
+
+
+class Player(object):
+    dbus = """
+    <node>
+        <interface name='org.py3status.Test'>
+            <property name='Status' type='s' access='read'/>
+            <method name='Play'/>
+        </interface>
+    </node>
+    """
+
+    PropertiesChanged = signal()
+
+    def __init__(self):
+        self._status = 'Stopped'
+        self.gets = 0
+
+    @property
+    def Status(self):
+        self.gets += 1
+        return self._status
+
+    def Play(self):
+        self._status = 'Playing'
+        self.PropertiesChanged(BUS_NAME, {'Status': 'Playing'}, [])
+
+
+def wait_for(condition, timeout=5):
+    end = time() + timeout
+    while not condition() and time() < end:
+        sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def service():
+    daemon = Popen(
+        ['dbus-daemon', '--session', '--nofork', '--print-address'],
+        stdout=PIPE
+    )
+    address = daemon.stdout.readline().decode('utf-8').strip()
+    service = DBusService(address)
+    yield service
+    service.stop()
+    daemon.terminate()
+    daemon.wait()
+
+
+def test_properties_and_signals(service):
+    player = Player()
+    publication = pydbus.connect(service.address).publish(BUS_NAME, player)
+
+    assert service.get_property(BUS_NAME, PATH, BUS_NAME, 'Status') == 'Stopped'
+    assert service.get_property(BUS_NAME, PATH, BUS_NAME, 'Status') == 'Stopped'
+    assert player.gets == 1
+    assert service.stats()['property_hits'] == 1
+
+    received = []
+    service.subscribe(
+        lambda *args: received.append(args),
+        sender=BUS_NAME,
+        interface=PROPERTIES,
+        member='PropertiesChanged',
+    )
+    service.get(BUS_NAME).Play()
+    assert wait_for(lambda: received)
+    sender, path, interface, member, args = received[0]
+    assert (path, member) == (PATH, 'PropertiesChanged')
+    assert args == (BUS_NAME, {'Status': 'Playing'}, [])
+
+    # the cache was updated by the signal so nothing is fetched
+    assert service.get_property(BUS_NAME, PATH, BUS_NAME, 'Status') == 'Playing'
+    assert player.gets == 1
+    assert service.get_property(
+        BUS_NAME, PATH, BUS_NAME, 'Status', cache=False) == 'Playing'
+    assert player.gets == 2
+
+    # the cache is dropped when the service goes away
+    publication.unpublish()
+    assert wait_for(lambda: not service.stats()['cached_objects'])
+
+
+def test_service_starts_after_first_read(service):
+    # eg a module polling for a player that has not been started yet
+    with pytest.raises(DBusError):
+        service.get_property(BUS_NAME, PATH, BUS_NAME, 'Status')
+    assert not service.stats()['cached_objects']
+
+    player = Player()
+    pydbus.connect(service.address).publish(BUS_NAME, player)
+    assert service.get_property(BUS_NAME, PATH, BUS_NAME, 'Status') == 'Stopped'
+
+    # changes from the new owner keep the cache up to date
+    service.get(BUS_NAME).Play()
+    assert wait_for(
+        lambda: service.get_property(BUS_NAME, PATH, BUS_NAME, 'Status') == 'Playing'
+    )
+    assert player.gets == 1
+
+
+def test_subscription_follows_restarts(service):
+    received = []
+
+    def start_service():
+        connection = pydbus.connect(service.address)
+        publication = connection.publish(BUS_NAME, Player())
+        return connection, publication, service.get_name_owner(BUS_NAME)
+
+    def played(owner):
+        # the subscription follows the new owner once D-Bus tells us of it
+        service.get(BUS_NAME).Play()
+        sleep(0.05)
+        return owner in received
+
+    connection, publication, owner = start_service()
+    subscription = service.subscribe(
+        lambda *args: received.append(args[0]),
+        sender=BUS_NAME,
+        interface=PROPERTIES,
+        member='PropertiesChanged',
+    )
+    assert wait_for(lambda: played(owner))
+
+    # restarting the service gives it a new unique name
+    publication.unpublish()
+    connection.con.close_sync(None)
+    connection, publication, new_owner = start_service()
+    assert new_owner != owner
+    assert wait_for(lambda: played(new_owner))
+
+    service.unsubscribe(subscription)
+    assert not service.stats()['subscriptions']
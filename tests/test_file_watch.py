@@ -0,0 +1,142 @@
+"""
+Run file watch tests
+"""
+
+import mailbox
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from threading import Event
+from time import sleep
+
+import pytest
+
+from py3status import file_watch
+
+
+@pytest.fixture
+def directory():
+    path = tempfile.mkdtemp()
+    yield path
+    shutil.rmtree(path)
+
+
+def write_file(path, content):
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def check_watcher(watcher, directory):
+    path = os.path.join(directory, 'watched')
+    write_file(path, 'one')
+    changed = Event()
+    assert watcher.watch(path, changed.set)
+    write_file(os.path.join(directory, 'other'), 'one')
+    write_file(path, 'two')
+    assert changed.wait(5)
+
+    # new files in a watched directory are seen
+    changed.clear()
+    assert watcher.watch(directory, changed.set)
+    write_file(os.path.join(directory, 'new'), 'one')
+    assert changed.wait(5)
+
+
+def check_reading_is_not_a_change(watcher, directory, wait):
+    mbox = os.path.join(directory, 'mbox')
+    write_file(mbox, '')
+    database = os.path.join(directory, 'local.sqlite')
+    connection = sqlite3.connect(database)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('CREATE TABLE todos (title TEXT)')
+    connection.commit()
+    connection.close()
+
+    changed = Event()
+    assert watcher.watch(mbox, changed.set)
+    assert watcher.watch(directory, changed.set)
+    # modules read what they watch, which must not cause another update
+    for x in range(3):
+        len(mailbox.mbox(mbox, create=False))
+        with open(mbox, 'rb+') as f:
+            f.read()
+        connection = sqlite3.connect(database)
+        connection.execute('SELECT * FROM todos').fetchall()
+        connection.close()
+        sleep(wait)
+    assert not changed.is_set()
+
+    write_file(mbox, 'From me\n')
+    assert changed.wait(5)
+
+
+def test_watch(directory):
+    watcher = file_watch.FileWatcher()
+    check_watcher(watcher, directory)
+    assert watcher.stats()['paths'] == 2
+    assert not watcher.watch(os.path.join(directory, 'missing'), None)
+
+
+def test_reading_is_not_a_change(directory):
+    watcher = file_watch.FileWatcher()
+    check_reading_is_not_a_change(watcher, directory, 0.2)
+
+
+def test_directory_removed(directory, monkeypatch):
+    monkeypatch.setattr(file_watch, 'POLL_INTERVAL', 0.05)
+    subdirectory = os.path.join(directory, 'sub')
+    os.mkdir(subdirectory)
+    path = os.path.join(subdirectory, 'watched')
+    write_file(path, 'one')
+    changed = Event()
+    watcher = file_watch.FileWatcher()
+    assert watcher.watch(path, changed.set)
+
+    shutil.rmtree(subdirectory)
+    assert changed.wait(5)
+    # the path is polled until it is back
+    changed.clear()
+    os.mkdir(subdirectory)
+    write_file(path, 'two')
+    assert changed.wait(5)
+
+
+def test_restart(directory, monkeypatch):
+    def broken_poll():
+        raise ValueError('broken')
+
+    monkeypatch.setattr(file_watch, 'POLL_INTERVAL', 0.05)
+    path = os.path.join(directory, 'watched')
+    write_file(path, 'one')
+    changed = Event()
+    watcher = file_watch.FileWatcher()
+    watcher.poll = broken_poll
+    assert watcher.watch(path, changed.set)
+    watcher.thread.join(5)
+    assert not watcher.thread.is_alive()
+
+    # watching again starts a new thread
+    del watcher.poll
+    assert watcher.watch(path, changed.set)
+    write_file(path, 'two')
+    assert changed.wait(5)
+
+
+def test_watch_polling(directory, monkeypatch):
+    def no_inotify():
+        raise OSError()
+
+    monkeypatch.setattr(file_watch, 'Inotify', no_inotify)
+    monkeypatch.setattr(file_watch, 'POLL_INTERVAL', 0.05)
+    watcher = file_watch.FileWatcher()
+    check_watcher(watcher, directory)
+    assert watcher.stats()['backend'] == 'polling'
+
+
+def test_reading_is_not_a_change_polling(directory, monkeypatch):
+    monkeypatch.setattr(file_watch, 'Inotify', None)
+    monkeypatch.setattr(file_watch, 'POLL_INTERVAL', 0.05)
+    watcher = file_watch.FileWatcher()
+    check_reading_is_not_a_change(watcher, directory, 0.1)
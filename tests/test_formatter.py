@@ -1512,6 +1512,32 @@ def test_update_placeholders_5():
     })
 
 
+def test_cache_bounded():
+    f = Formatter()
+    stats = Formatter.cache_stats()['blocks']
+    Formatter.set_cache_size(5)
+    try:
+        for x in range(20):
+            f.format('cache test {}'.format(x))
+        # the most recent format strings are still cached
+        f.format('cache test 19')
+        stats_after = Formatter.cache_stats()['blocks']
+        assert stats_after['size'] == 5
+        assert stats_after['evictions'] >= stats['evictions'] + 15
+        assert stats_after['hits'] == stats['hits'] + 1
+        assert len(Formatter.format_string_cache) == 5
+    finally:
+        Formatter.set_cache_size(stats['max_size'])
+
+
+def test_prepare():
+    f = Formatter()
+    assert f.prepare('prepared {placeholder}')
+    assert 'prepared {placeholder}' in Formatter.block_cache
+    assert not f.prepare('[not closed')
+    assert '[not closed' not in Formatter.block_cache
+
+
 if __name__ == '__main__':
     # run tests
     import sys
@@ -0,0 +1,206 @@
+"""
+Test the i3 IPC client against a fake i3
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+
+from threading import Event, Lock, Thread
+from time import sleep, time
+
+import pytest
+
+from py3status import i3_ipc
+from py3status.exceptions import I3IPCError
+from py3status.i3_ipc import I3IPC, MESSAGE_TYPES, send
+
+TREE = {
+    'name': 'root',
+    'focused': False,
+    'nodes': [{'name': 'window', 'focused': True, 'nodes': []}],
+}
+
+
+class FakeI3(Thread):
+    """
+    Answers i3 IPC messages on a unix socket and sends events to the
+    connections that have subscribed.
+    """
+
+    def __init__(self, path):
+        Thread.__init__(self)
+        self.daemon = True
+        self.path = path
+        self.lock = Lock()
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen(5)
+        self.commands = []
+        self.connections = []
+        self.subscribers = []
+
+    def run(self):
+        while True:
+            try:
+                conn = self.server.accept()[0]
+            except (IOError, OSError):
+                break
+            with self.lock:
+                self.connections.append(conn)
+            thread = Thread(target=self.handle, args=(conn,))
+            thread.daemon = True
+            thread.start()
+
+    def handle(self, conn):
+        while True:
+            try:
+                msg_type, payload = receive_raw(conn)
+            except Exception:
+                break
+            if msg_type == MESSAGE_TYPES['command']:
+                self.commands.append(payload)
+                if payload == 'hang':
+                    # never reply
+                    continue
+                reply = [{'success': True}]
+            elif msg_type == MESSAGE_TYPES['get_tree']:
+                reply = TREE
+            elif msg_type == MESSAGE_TYPES['subscribe']:
+                with self.lock:
+                    self.subscribers.append((conn, json.loads(payload)))
+                reply = {'success': True}
+            with self.lock:
+                send(conn, msg_type, json.dumps(reply))
+
+    def event(self, event, data):
+        msg_type = i3_ipc.EVENT_BIT | i3_ipc.EVENT_TYPES.index(event)
+        with self.lock:
+            for conn, events in self.subscribers:
+                if event in events:
+                    send(conn, msg_type, json.dumps(data))
+
+    def drop_connections(self):
+        """
+        Close all connections like i3 restarting.
+        """
+        with self.lock:
+            for conn in self.connections:
+                conn.shutdown(socket.SHUT_RDWR)
+                conn.close()
+            self.connections = []
+            self.subscribers = []
+
+    def stop(self):
+        self.drop_connections()
+        self.server.close()
+
+
+def receive_raw(sock):
+    header = i3_ipc.receive_exactly(sock, i3_ipc.HEADER.size)
+    magic, length, msg_type = i3_ipc.HEADER.unpack(header)
+    payload = i3_ipc.receive_exactly(sock, length)
+    return msg_type, payload.decode('utf-8')
+
+
+def wait_for(condition, timeout=5):
+    end = time() + timeout
+    while not condition() and time() < end:
+        sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def i3():
+    directory = tempfile.mkdtemp()
+    server = FakeI3(os.path.join(directory, 'ipc.sock'))
+    server.start()
+    yield server
+    server.stop()
+    shutil.rmtree(directory)
+
+
+def test_message(i3):
+    client = I3IPC(i3.path)
+    assert client.message('get_tree') == TREE
+    assert client.message('command', 'workspace 2') == [{'success': True}]
+    assert i3.commands == ['workspace 2']
+    # the connection is reused
+    assert len(i3.connections) == 1
+    assert client.stats()['messages'] == 2
+
+    with pytest.raises(I3IPCError):
+        client.message('not_a_type')
+    client.stop()
+
+
+def test_message_reconnects(i3):
+    client = I3IPC(i3.path)
+    client.message('command', 'one')
+    i3.drop_connections()
+    client.message('command', 'two')
+    assert i3.commands == ['one', 'two']
+    client.stop()
+
+
+def test_message_not_repeated(i3, monkeypatch):
+    monkeypatch.setattr(i3_ipc, 'MESSAGE_TIMEOUT', 0.1)
+    client = I3IPC(i3.path)
+    # i3 may have run the command so it must not be sent again
+    with pytest.raises(I3IPCError):
+        client.message('command', 'hang')
+    assert i3.commands == ['hang']
+    client.message('command', 'next')
+    assert i3.commands == ['hang', 'next']
+    client.stop()
+
+
+def test_no_socket():
+    client = I3IPC('/nonexistent/i3.sock')
+    with pytest.raises(I3IPCError):
+        client.message('get_tree')
+
+
+def test_subscribe(i3, monkeypatch):
+    monkeypatch.setattr(i3_ipc, 'RECONNECT_DELAY', 0.01)
+    client = I3IPC(i3.path)
+    received = []
+    done = Event()
+
+    def callback(event, data):
+        received.append((event, data))
+        done.set()
+
+    changes = []
+    assert not client.subscribed
+    client.subscribe(['window'], callback, lambda: changes.append(client.subscribed))
+    assert wait_for(lambda: client.subscribed)
+    assert len(i3.subscribers) == 1
+    assert client.stats()['connected']
+    assert changes == [True]
+    i3.event('window', {'change': 'focus'})
+    assert done.wait(5)
+    assert received == [('window', {'change': 'focus'})]
+
+    # new event types are subscribed to on the open connection
+    client.subscribe(['workspace'], callback)
+    assert wait_for(lambda: len(i3.subscribers) == 2)
+    done.clear()
+    i3.event('workspace', {'change': 'init'})
+    assert done.wait(5)
+    assert received[-1] == ('workspace', {'change': 'init'})
+
+    # after i3 restarts we subscribe to everything again
+    i3.drop_connections()
+    assert wait_for(lambda: len(i3.subscribers) == 1)
+    assert wait_for(lambda: len(changes) == 3)
+    assert changes == [True, False, True]
+    assert sorted(i3.subscribers[0][1]) == ['window', 'workspace']
+    done.clear()
+    i3.event('window', {'change': 'close'})
+    assert done.wait(5)
+    assert received[-1] == ('window', {'change': 'close'})
+    assert client.stats()['reconnects'] == 1
+    client.stop()
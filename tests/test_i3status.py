@@ -0,0 +1,62 @@
+"""
+Run i3status tests
+"""
+
+from threading import Event
+
+from py3status.i3status import I3status
+
+
+class MockPy3statusWrapper:
+
+    def __init__(self):
+        self.config = {
+            'py3_config': {
+                'general': {'color_good': '#00FF00'},
+                'i3s_modules': ['load', 'disk /'],
+                'load': {},
+                'disk /': {'color_good': '#0000FF'},
+            },
+            'standalone': False,
+        }
+        self.lock = Event()
+        self.updates = []
+
+    def get_config_attribute(self, name, attribute):
+        return 5
+
+    def notify_update(self, update, urgent=False):
+        self.updates.append(update)
+
+
+def make_output(load):
+    return [
+        {'name': 'load', 'full_text': load},
+        {'name': 'disk_info', 'instance': '/', 'full_text': '10G',
+         'color': '#00FF00'},
+    ]
+
+
+def test_json_list():
+    wrapper = MockPy3statusWrapper()
+    i3status = I3status(wrapper)
+    assert i3status.json_list is None
+
+    i3status.set_responses(make_output('0.5'))
+    assert wrapper.updates == [['load', 'disk /']]
+    json_list = i3status.json_list
+    assert [x['full_text'] for x in json_list] == ['0.5', '10G']
+    # the output is corrected for the module config
+    assert json_list[1]['name'] == 'disk'
+    assert json_list[1]['color'] == '#0000FF'
+    # the same copy is used until there is new output
+    assert i3status.json_list is json_list
+
+    # changes by modules do not alter the output
+    json_list[0]['full_text'] = 'changed'
+    assert i3status.i3modules['load'].get_latest()[0]['full_text'] == '0.5'
+
+    i3status.set_responses(make_output('0.7'))
+    assert wrapper.updates[1:] == [['load']]
+    assert i3status.json_list is not json_list
+    assert i3status.json_list[0]['full_text'] == '0.7'
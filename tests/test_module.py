@@ -0,0 +1,96 @@
+"""
+Run module tests
+"""
+
+from time import time
+
+from py3status.module import Module
+from py3status.module_test import MockPy3statusWrapper
+
+
+class UpdateCountingWrapper(MockPy3statusWrapper):
+
+    def __init__(self, config):
+        MockPy3statusWrapper.__init__(self, config)
+        self.config['testing'] = False
+        self.updates = []
+
+    def notify_update(self, update, urgent=False):
+        self.updates.append((update, urgent))
+
+
+class Py3status:
+
+    def __init__(self):
+        self.text = 'one'
+        self.urgent = False
+
+    def first(self):
+        return {'full_text': self.text, 'urgent': self.urgent}
+
+    def second(self):
+        return {'full_text': 'constant'}
+
+
+def make_module():
+    py3_config = {
+        'general': {},
+        'py3status': {},
+        '.module_groups': {},
+        'test_module': {},
+    }
+    wrapper = UpdateCountingWrapper(py3_config)
+    module = Module('test_module', {}, wrapper, Py3status())
+    module.prepare_module()
+    return module, wrapper
+
+
+def run_module(module):
+    for method in module.methods.values():
+        method['cached_until'] = time()
+    module.run()
+
+
+def test_set_updated_only_on_change():
+    module, wrapper = make_module()
+    run_module(module)
+    # each method's first output is an update
+    assert wrapper.updates == [('test_module', False)] * 2
+    assert [x['full_text'] for x in module.get_latest()] == ['one', 'constant']
+
+    # nothing changed so no update
+    run_module(module)
+    assert len(wrapper.updates) == 2
+
+    module.module_class.text = 'two'
+    run_module(module)
+    assert len(wrapper.updates) == 3
+    assert [x['full_text'] for x in module.get_latest()] == ['two', 'constant']
+
+    # urgent is only signalled when it starts
+    module.module_class.urgent = True
+    run_module(module)
+    run_module(module)
+    module.module_class.text = 'three'
+    run_module(module)
+    assert wrapper.updates[3:] == [
+        ('test_module', True), ('test_module', False)
+    ]
+
+
+def test_module_stats():
+    module, wrapper = make_module()
+    for x in range(3):
+        run_module(module)
+    module.module_class.text = 'two'
+    run_module(module)
+
+    stats = module.stats.stats()
+    assert stats['runs'] == 4
+    first = stats['methods']['first']
+    assert first['calls'] == 4
+    assert first['changed'] == 2
+    assert first['unchanged'] == 2
+    assert first['errors'] == 0
+    assert first['time']['max'] >= first['time']['p95'] >= first['time']['p50']
+    assert stats['methods']['second']['changed'] == 1
@@ -0,0 +1,133 @@
+"""
+Test the wifi and diskdata modules reading the kernel directly
+"""
+
+import ctypes
+import errno
+import struct
+
+from collections import namedtuple
+
+from py3status.modules import diskdata, wifi
+from py3status.py3 import Py3
+
+StatVFS = namedtuple('StatVFS', 'f_blocks f_bfree f_bavail f_frsize')
+
+MOUNTS = [
+    ('/dev/sda1', '/', 'ext4'),
+    ('/dev/sda1', '/home', 'ext4'),
+    ('/dev/sdb1', '/run/media/other/usb', 'vfat'),
+    ('tmpfs', '/tmp', 'tmpfs'),
+]
+
+
+class FakePy3:
+    CACHE_FOREVER = -1
+    COLOR_BAD = 'bad'
+    COLOR_DEGRADED = 'degraded'
+    COLOR_ERROR = None
+    COLOR_GOOD = 'good'
+    CommandError = Py3.CommandError
+
+    def __init__(self, files):
+        self.files = files
+        self.commands = []
+
+    def sample_file(self, path, parser=None):
+        if path not in self.files:
+            raise IOError(errno.ENOENT, 'No such file')
+        return self.files[path]
+
+    def check_commands(self, commands):
+        return commands[0]
+
+    def command_output(self, command):
+        self.commands.append(command)
+        raise self.CommandError('not found', error_code=1)
+
+    def format_contains(self, format_string, name):
+        return '{%s}' % name in format_string
+
+    def safe_format(self, format_string, param_dict=None):
+        return param_dict
+
+    def time_in(self, seconds):
+        return seconds
+
+
+def test_diskdata_free_space(monkeypatch):
+    def statvfs(path):
+        if path == '/run/media/other/usb':
+            raise OSError(errno.EACCES, 'Permission denied')
+        return StatVFS(8 * 1024 ** 2, 6 * 1024 ** 2, 5 * 1024 ** 2, 1024)
+
+    monkeypatch.setattr(diskdata.os, 'statvfs', statvfs)
+    module = diskdata.Py3status()
+    module.py3 = FakePy3({'/proc/self/mounts': MOUNTS})
+    # each device is counted once, unreadable mounts are skipped and df is
+    # not needed
+    assert module._get_free_space(None) == (5, 2, 25, 8)
+    assert module._get_free_space('sdb1') == (0, 0, 'err', 0)
+    assert module.py3.commands == []
+
+
+def get_wifi(ioctl):
+    module = wifi.Py3status()
+    module.py3 = FakePy3({
+        '/proc/net/wireless': {'wlan0': {'link': 54.0, 'level': -56.0, 'noise': -256.0}}
+    })
+    module.post_config_hook()
+    module.device = 'wlan0'
+    module.format = '{ssid} {bitrate} {signal_dbm} {ip}'
+    module._ioctl = ioctl
+    return module
+
+
+def test_wifi_native():
+    def ioctl(request, data):
+        if request == wifi.SIOCGIWESSID:
+            name, address, length, flags = struct.unpack_from(wifi.IWREQ_POINT, data)
+            assert name.rstrip(b'\0') == b'wlan0'
+            assert length == wifi.IW_ESSID_MAX_SIZE + 1
+            # the kernel writes the SSID to the buffer at address
+            ssid = u'caf\xe9'.encode('utf-8')
+            ctypes.memmove(address, ssid, len(ssid))
+            return struct.pack(wifi.IWREQ_POINT, name, address, len(ssid), 1).ljust(
+                wifi.IWREQ_SIZE, b'\0')
+        if request == wifi.SIOCGIWRATE:
+            return data[:16] + struct.pack('i', 54000000) + data[20:]
+        if request == wifi.SIOCGIFADDR:
+            return data[:20] + b'\xc0\xa8\x01\x02' + data[24:]
+
+    module = get_wifi(ioctl)
+    result = module.wifi()
+    assert result['full_text'] == {
+        'bitrate': '54 MBit/s',
+        'device': 'wlan0',
+        'icon': module.blocks[-1],
+        'ip': '192.168.1.2',
+        'signal_dbm': '-56 dBm',
+        'signal_percent': '88%',
+        'ssid': u'caf\xe9',
+    }
+    assert module.py3.commands == []
+
+
+def test_wifi_native_errors():
+    def ioctl(request, data):
+        raise IOError(error, 'error')
+
+    module = get_wifi(ioctl)
+    # an unplugged device is shown as down and the kernel is still used
+    error = errno.ENODEV
+    result = module.wifi()
+    assert result['full_text'] is None
+    assert module._native
+    assert module.py3.commands == []
+
+    # without wireless extensions iw is used from then on
+    error = errno.EOPNOTSUPP
+    result = module.wifi()
+    assert result['full_text'] == wifi.STRING_ERROR
+    assert not module._native
+    assert len(module.py3.commands) == 1
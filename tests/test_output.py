@@ -0,0 +1,81 @@
+"""
+Run output assembler and json cache tests
+"""
+
+from json import dumps, loads
+from random import choice, randint, seed
+
+from py3status.output import JsonCache, OutputAssembler, OutputLine
+
+
+def check_assembler(size, chunk_size=None, output_class=OutputAssembler):
+    seed(size)
+    values = [None, '', '{"full_text": "a"}', '{"full_text": "b"}']
+    expected = [None] * size
+    if output_class is OutputAssembler:
+        output = OutputAssembler(size, chunk_size=chunk_size)
+    else:
+        output = output_class(size)
+    assert output.get_line() == ''
+    for x in range(500):
+        index = randint(0, size - 1)
+        value = choice(values)
+        expected[index] = value
+        output.set(index, value)
+        if x % 3 == 0:
+            assert output.get_line() == ','.join([x for x in expected if x])
+    assert output.get_line() == ','.join([x for x in expected if x])
+
+
+def test_output_assembler_small():
+    check_assembler(1)
+    check_assembler(10)
+
+
+def test_output_assembler_chunked():
+    check_assembler(200)
+    check_assembler(37)
+    check_assembler(50, chunk_size=7)
+
+
+def test_output_assembler_empty():
+    assert OutputAssembler(0).get_line() == ''
+    assert OutputLine(0).get_line() == ''
+
+
+def test_output_line():
+    check_assembler(1, output_class=OutputLine)
+    check_assembler(10, output_class=OutputLine)
+
+
+def test_json_cache():
+    cache = JsonCache()
+    outputs = [
+        {'full_text': 'one', 'urgent': True},
+        {'full_text': 'two', 'separator': False},
+    ]
+    assert loads('[{}]'.format(cache.dumps(outputs))) == outputs
+    assert cache.misses == 2
+
+    outputs[1]['full_text'] = 'three'
+    assert loads('[{}]'.format(cache.dumps(outputs))) == outputs
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    # only the current output is kept
+    assert len(cache.cache) == 2
+
+
+def test_json_cache_types():
+    cache = JsonCache()
+    # these compare equal but their json does not
+    for value in [True, 1, 1.0, u'caf\xe9/x']:
+        outputs = [{'full_text': 'x', 'value': value}, {'full_text': 'y'}]
+        assert cache.dumps(outputs) == ','.join(dumps(x) for x in outputs)
+
+
+def test_json_cache_unhashable():
+    cache = JsonCache()
+    outputs = [{'full_text': 'one', 'list': [1, 2]}, {'full_text': 'two'}]
+    for x in range(2):
+        assert loads('[{}]'.format(cache.dumps(outputs))) == outputs
+    assert len(cache.cache) == 1
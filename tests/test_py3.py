@@ -1,4 +1,6 @@
 from pprint import pformat
+from threading import Thread
+from time import time
 
 from py3status.py3 import Py3
 
@@ -232,3 +234,80 @@ def test_flatten_dict_parent_key():
     print('returned data')
     print(pformat(returned))
     assert returned == expected
+
+
+def test_command_output():
+    assert py3.command_output(['echo', 'hello']) == 'hello\n'
+    assert py3.command_run('true') == 0
+    assert py3.command_run('false') == 1
+    stats = py3._executor.stats()
+    assert stats['echo']['calls'] >= 1
+    assert stats['false']['failed'] >= 1
+
+
+def test_command_timeout():
+    start = time()
+    try:
+        # the shell starts a child that also has to be killed
+        py3.command_output('sleep 10; echo done', shell=True, timeout=0.2)
+    except py3.CommandTimeout as e:
+        assert 'timed out' in str(e)
+    else:
+        assert False, 'command did not time out'
+    assert time() - start < 5
+    assert py3._executor.stats()['sleep']['timeouts'] == 1
+
+    # timeouts are also CommandErrors
+    try:
+        py3.command_run(['sleep', '10'], timeout=0.2)
+    except py3.CommandError:
+        pass
+    else:
+        assert False, 'command did not time out'
+
+
+def test_command_limit():
+    executor = py3._executor
+    timeout, limit = executor.timeout, executor.limit
+    executor.set_limits(timeout, 1)
+    try:
+        # commands without a timeout eg started from on_click do not use up
+        # the limit
+        thread = Thread(target=py3.command_run, args=(['sleep', '1'],))
+        thread.start()
+        start = time()
+        assert py3.command_output(['echo', 'hello']) == 'hello\n'
+        assert time() - start < 0.5
+        thread.join()
+    finally:
+        executor.set_limits(timeout, limit)
+
+
+def test_command_output_max_age():
+    cache = py3._command_cache
+    hits = cache.hits
+    command = ['date', '+%N']
+    first = py3.command_output(command, max_age=5)
+    assert py3.command_output(command, max_age=5) == first
+    assert cache.hits == hits + 1
+    # not using the cache always runs the command
+    assert py3.command_output(command) != first
+
+
+def test_command_output_coalesced():
+    cache = py3._command_cache
+    joined = cache.stats()['joined']
+    command = 'sleep 0.5; date +%N'
+    results = []
+
+    def run():
+        results.append(py3.command_output(command, shell=True, max_age=0.1))
+
+    threads = [Thread(target=run) for x in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # only one command was run
+    assert len(set(results)) == 1
+    assert cache.stats()['joined'] == joined + 2
@@ -0,0 +1,362 @@
+"""
+Run request tests against a local http server
+"""
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from threading import Lock, Thread
+from time import sleep, time
+
+try:
+    from http.cookiejar import CookieJar
+except ImportError:
+    from cookielib import CookieJar
+
+import os
+import tempfile
+
+import pytest
+
+from py3status.py3 import Py3
+from py3status.request import (
+    POOL_MAX_PER_HOST, ConnectionPool, HttpResponse, ResponseCache
+)
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, code, body, headers=None):
+        body = body.encode('utf-8')
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path == '/etag':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.server.not_modified += 1
+                self.reply(304, '', {'ETag': '"v1"'})
+            else:
+                self.reply(200, 'etag body', {'ETag': '"v1"', 'X-Test': 'yes'})
+        elif self.path.startswith('/slow'):
+            with self.server.lock:
+                self.server.active += 1
+                self.server.max_active = max(
+                    self.server.max_active, self.server.active
+                )
+            sleep(0.5)
+            with self.server.lock:
+                self.server.active -= 1
+            self.reply(200, '{"slow": true}')
+        elif self.path == '/max_age':
+            self.reply(200, 'fresh', {'Cache-Control': 'max-age=60'})
+        elif self.path == '/missing':
+            self.reply(404, 'not found')
+        elif self.path == '/close':
+            # close the connection without telling the client
+            self.reply(200, 'closed')
+            self.close_connection = True
+        elif self.path == '/set_cookie':
+            self.reply(200, 'set', {'Set-Cookie': 'name=value; Path=/'})
+        elif self.path == '/cookie':
+            self.reply(200, self.headers.get('Cookie', ''))
+        else:
+            self.reply(200, '{"path": "%s"}' % self.path)
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        self.reply(200, self.rfile.read(length).decode('utf-8'))
+
+
+@pytest.fixture
+def server():
+    server = ThreadingServer(('127.0.0.1', 0), Handler)
+    server.connections = 0
+    server.not_modified = 0
+    server.requests = []
+    server.lock = Lock()
+    server.active = 0
+    server.max_active = 0
+    thread = Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05})
+    thread.daemon = True
+    thread.start()
+    server.url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(url, pool, data=None, cookiejar=None, cache=None, headers=None,
+            auth=None, timeout=5):
+    return HttpResponse(url, params=None, data=data, headers=headers or {},
+                        timeout=timeout, auth=auth, cookiejar=cookiejar,
+                        pool=pool, cache=cache)
+
+
+def test_keep_alive(server):
+    pool = ConnectionPool()
+    for x in range(3):
+        response = request(server.url + '/test', pool)
+        assert response.status_code == 200
+        assert response.json() == {'path': '/test'}
+    assert request(server.url, pool, data={'a': 'b'}).text == 'a=b'
+    assert request(server.url + '/missing', pool).status_code == 404
+    assert server.connections == 1
+    stats = pool.stats()
+    assert stats['requests'] == 5
+    assert stats['opened'] == 1
+    assert stats['reused'] == 4
+    assert stats['idle'] == 1
+
+
+def test_idle_timeout(server):
+    pool = ConnectionPool(idle_timeout=0)
+    for x in range(2):
+        assert request(server.url, pool).status_code == 200
+    assert server.connections == 2
+    assert pool.stats()['idle'] == 0
+
+
+def test_stale_connection(server):
+    pool = ConnectionPool()
+    assert request(server.url + '/close', pool).text == 'closed'
+    # the pooled connection has been closed by the server
+    assert request(server.url, pool).status_code == 200
+    assert server.connections == 2
+
+
+def test_cookiejar(server):
+    pool = ConnectionPool()
+    cookiejar = CookieJar()
+    request(server.url + '/set_cookie', pool, cookiejar=cookiejar)
+    assert request(server.url + '/cookie', pool, cookiejar=cookiejar).text == (
+        'name=value'
+    )
+    # the cookies are not used by other requests
+    assert request(server.url + '/cookie', pool).text == ''
+    assert server.connections == 1
+
+
+def test_max_per_host(server):
+    pool = ConnectionPool(max_per_host=2)
+    threads = [
+        Thread(target=request, args=(server.url, pool)) for x in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert pool.stats()['requests'] == 10
+    assert server.connections <= 2
+
+
+def test_failed_send(server):
+    pool = ConnectionPool()
+    # the header cannot be sent so every request fails before the response
+    for x in range(POOL_MAX_PER_HOST + 1):
+        with pytest.raises(UnicodeEncodeError):
+            request(server.url, pool, headers={'X': u'\u20ac'})
+    # the slots for the host have all been freed
+    assert request(server.url + '/test', pool, timeout=1).json() == {
+        'path': '/test'
+    }
+
+
+def test_pool_wait_timeout(server):
+    pool = ConnectionPool(max_per_host=1)
+    Thread(target=request, args=(server.url + '/slow', pool)).start()
+    while not pool.stats()['requests']:
+        sleep(0.01)
+    # waiting for a free slot is limited by the timeout of the request
+    start = time()
+    with pytest.raises(Py3.RequestTimeout):
+        request(server.url, pool, timeout=0.1)
+    assert time() - start < 0.4
+
+
+def test_no_pool(server):
+    assert request(server.url + '/test', None).json() == {'path': '/test'}
+
+
+def test_cache_etag(server):
+    pool = ConnectionPool()
+    cache = ResponseCache()
+    for x in range(3):
+        response = request(server.url + '/etag', pool, cache=cache)
+        assert response.status_code == 200
+        assert response.text == 'etag body'
+        assert response.headers.get('x-test') == 'yes'
+    assert server.requests == ['/etag'] * 3
+    assert server.not_modified == 2
+    assert cache.stats()['revalidated'] == 2
+
+    # uncached requests are unconditional
+    assert request(server.url + '/etag', pool).text == 'etag body'
+    assert server.not_modified == 2
+
+
+def test_cache_max_age(server):
+    pool = ConnectionPool()
+    cache = ResponseCache()
+    for x in range(3):
+        assert request(server.url + '/max_age', pool, cache=cache).text == 'fresh'
+    assert server.requests == ['/max_age']
+    assert cache.stats()['hits'] == 2
+
+    # responses without validators or max-age are not kept
+    request(server.url + '/test', pool, cache=cache)
+    assert cache.stats()['size'] == 1
+
+
+def test_cache_persist(server):
+    pool = ConnectionPool()
+    cache = ResponseCache()
+    request(server.url + '/etag', pool, cache=cache)
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        cache.save(path)
+        cache = ResponseCache()
+        assert cache.load(path)
+    finally:
+        os.remove(path)
+    response = request(server.url + '/etag', pool, cache=cache)
+    assert response.text == 'etag body'
+    assert response.headers.get('X-Test') == 'yes'
+    assert server.not_modified == 1
+
+
+def test_cache_persist_credentials(server):
+    pool = ConnectionPool()
+    cache = ResponseCache()
+    request(server.url + '/etag', pool, cache=cache, auth=('user', 'secret-token'))
+    request(server.url + '/etag', pool, cache=cache,
+            headers={'Private-Token': 'private-secret'})
+    assert cache.stats()['size'] == 2
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        cache.save(path)
+        with open(path, 'rb') as f:
+            saved = f.read()
+        cache = ResponseCache()
+        assert cache.load(path)
+    finally:
+        os.remove(path)
+    # credentials are not saved but the responses can still be found
+    assert b'secret' not in saved
+    assert b'dXNlcjpzZWNyZXQtdG9rZW4' not in saved
+    request(server.url + '/etag', pool, cache=cache, auth=('user', 'secret-token'))
+    assert server.not_modified == 1
+
+
+def test_coalesce(server):
+    flights = Py3._request_flights
+    joined = flights.stats()['joined']
+    results = []
+
+    def run():
+        # each module has its own Py3
+        results.append(Py3().request(server.url + '/slow', timeout=5))
+
+    threads = [Thread(target=run) for x in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.requests == ['/slow']
+    assert flights.stats()['joined'] == joined + 2
+    assert [x.json() for x in results] == [{'slow': True}] * 3
+    # each module gets its own json
+    assert len(set(id(x.json()) for x in results)) == 3
+
+    # posts are never shared
+    Py3().request(server.url, data={'a': 'b'})
+    assert flights.stats()['joined'] == joined + 2
+
+
+def test_coalesce_timeout(server):
+    flights = Py3._request_flights
+    timeouts = flights.stats()['timeouts']
+    results = []
+
+    def run():
+        results.append(Py3().request(server.url + '/slow', timeout=5))
+
+    leader = Thread(target=run)
+    leader.start()
+    while not flights.in_flight:
+        sleep(0.01)
+    # a module waiting for the request does so only for its own timeout
+    start = time()
+    with pytest.raises(Py3.RequestTimeout):
+        Py3().request(server.url + '/slow', timeout=0.1)
+    assert time() - start < 0.4
+    assert flights.stats()['timeouts'] == timeouts + 1
+    leader.join()
+    assert results[0].json() == {'slow': True}
+    assert server.requests == ['/slow']
+
+
+def test_request_many(server):
+    py3 = Py3()
+    # find a port that nothing is listening on
+    closed = ThreadingServer(('127.0.0.1', 0), Handler)
+    closed.server_close()
+    bad_url = 'http://127.0.0.1:{}/'.format(closed.server_address[1])
+
+    start = time()
+    results = py3.request_many([
+        server.url + '/slow?n=1',
+        {'url': server.url + '/slow?n=2', 'params': {'a': 'b'}},
+        bad_url,
+        server.url + '/slow?n=3',
+    ])
+    # the requests are made at the same time
+    assert time() - start < 1.2
+    assert results[0].json() == {'slow': True}
+    assert results[1].json() == {'slow': True}
+    assert isinstance(results[2], py3.RequestURLError)
+    assert results[3].status_code == 200
+    assert '/slow?n=2&a=b' in server.requests
+
+    start = time()
+    results = py3.request_many(
+        [server.url + '/slow?n=4', server.url + '/test'], timeout=0.2
+    )
+    assert time() - start < 0.45
+    assert isinstance(results[0], py3.RequestTimeout)
+    assert results[1].json() == {'path': '/test'}
+
+
+def test_request_many_workers(server):
+    py3 = Py3()
+    urls = [server.url + '/slow?n={}'.format(x) for x in range(4)]
+    results = py3.request_many(urls, max_workers=2)
+    assert [x.json() for x in results] == [{'slow': True}] * 4
+    assert server.max_active == 2
+
+    # requests not made within the timeout are timed out too
+    server.max_active = 0
+    start = time()
+    results = py3.request_many(urls, timeout=0.7, max_workers=1)
+    assert time() - start < 0.95
+    assert results[0].json() == {'slow': True}
+    assert [type(x) for x in results[1:]] == [py3.RequestTimeout] * 3
+    assert server.max_active == 1
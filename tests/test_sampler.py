@@ -0,0 +1,89 @@
+"""
+Run sampler tests
+"""
+
+import os
+import tempfile
+
+import pytest
+
+from py3status.sampler import (
+    Sampler, parse_key_value, parse_mounts, parse_uevent, parse_wireless
+)
+
+MOUNTS = '''proc /proc proc rw,nosuid,nodev,noexec,relatime 0 0
+/dev/sda2 / ext4 rw,relatime 0 0
+/dev/sdb1 /media/usb\\040disk vfat rw,relatime 0 0
+'''
+
+WIRELESS = '''Inter-| sta-|   Quality        |   Discarded packets               | Missed | WE
+ face | tus | link level noise |  nwid  crypt   frag  retry   misc | beacon | 22
+wlp3s0: 0000   54.  -56.  -256        0      0      0      0     12        0
+'''
+
+
+def write_file(path, content):
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def test_read_once_per_sample():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        write_file(path, 'MemTotal:  100 kB\nMemFree:  40 kB\n')
+        sampler = Sampler()
+        first = sampler.read(path, 'key_value')
+        assert first == {'MemTotal': 100, 'MemFree': 40}
+        # the file is only read once and the parsed result is shared
+        assert sampler.read(path, 'key_value') is first
+        assert sampler.read(path).startswith('MemTotal')
+        assert sampler.stats() == {'files': 1, 'reads': 1, 'requests': 3}
+
+        # new contents are read from the same file descriptor
+        write_file(path, 'MemTotal:  100 kB\nMemFree:  20 kB\n')
+        assert sampler.read(path, 'key_value', max_age=-1)['MemFree'] == 20
+        assert sampler.stats()['files'] == 1
+        assert sampler.stats()['reads'] == 2
+    finally:
+        os.remove(path)
+
+
+def test_timestamp():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        sampler = Sampler()
+        write_file(path, 'one')
+        first, content = sampler.read(path, timestamp=True)
+        assert content == 'one'
+        # a shared read gives the time that the file was actually read
+        write_file(path, 'two')
+        assert sampler.read(path, timestamp=True) == (first, 'one')
+        second, content = sampler.read(path, max_age=0, timestamp=True)
+        assert content == 'two'
+        assert second > first
+    finally:
+        os.remove(path)
+
+
+def test_missing_file():
+    sampler = Sampler()
+    with pytest.raises((IOError, OSError)):
+        sampler.read('/this/does/not/exist')
+    assert sampler.stats()['files'] == 0
+
+
+def test_parsers():
+    assert parse_key_value('Name: init\nPid:\t1\n') == {'Name': 'init', 'Pid': 1}
+    assert parse_uevent('POWER_SUPPLY_STATUS=Full\nPOWER_SUPPLY_CAPACITY=98') == {
+        'POWER_SUPPLY_STATUS': 'Full', 'POWER_SUPPLY_CAPACITY': 98
+    }
+    assert parse_mounts(MOUNTS) == [
+        ('proc', '/proc', 'proc'),
+        ('/dev/sda2', '/', 'ext4'),
+        ('/dev/sdb1', '/media/usb disk', 'vfat'),
+    ]
+    assert parse_wireless(WIRELESS) == {
+        'wlp3s0': {'link': 54.0, 'level': -56.0, 'noise': -256.0}
+    }
@@ -0,0 +1,181 @@
+"""
+Run storage tests
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+
+import pytest
+
+from py3status.storage import Storage
+
+
+class MockPy3statusWrapper:
+
+    def __init__(self, path, backend):
+        self.config = {
+            'py3_config': {
+                'py3status': {'storage': path, 'storage_backend': backend}
+            }
+        }
+
+        self.exceptions = []
+
+    def log(self, *arg, **kw):
+        pass
+
+    def report_exception(self, msg, **kw):
+        self.exceptions.append(msg)
+
+
+@pytest.fixture
+def directory():
+    path = tempfile.mkdtemp()
+    yield path
+    shutil.rmtree(path)
+
+
+def make_storage(path, backend):
+    storage = Storage()
+    storage.init(MockPy3statusWrapper(path, backend), False)
+    return storage
+
+
+@pytest.fixture(params=['pickle', 'sqlite'])
+def storage(request, directory):
+    storage = make_storage(os.path.join(directory, 'test.data'), request.param)
+    yield storage
+    storage.flush()
+
+
+def saved(storage):
+    """
+    Return what has been saved to disk for the module.
+    """
+    data = type(storage.backend)(storage.storage_path).load('module')
+    return data or None
+
+
+def test_write_immediately(storage):
+    storage.set_write_delay(0, 0)
+    storage.storage_set('module', 'key', 1)
+    assert saved(storage)['key'] == 1
+    storage.storage_del('module', 'key')
+    assert 'key' not in saved(storage)
+    assert storage.stats()['writes'] == 2
+
+
+def test_write_behind(storage):
+    storage.set_write_delay(60, 600)
+    for x in range(5):
+        storage.storage_set('module', 'key', x)
+    # setting the same value is not a change
+    storage.storage_set('module', 'key', 4)
+    assert saved(storage) is None
+    stats = storage.stats()
+    assert stats['changes'] == 5
+    assert stats['pending'] is True
+    assert stats['writes'] == 0
+    assert stats['writes_saved'] == 5
+
+    storage.flush()
+    assert saved(storage)['key'] == 4
+    assert storage.stats()['writes'] == 1
+    assert storage.stats()['pending'] is False
+
+
+def test_max_write_delay(storage):
+    storage.set_write_delay(0.2, 0.5)
+    start = time.time()
+    # keep changing so that only the maximum delay causes a save
+    while saved(storage) is None and time.time() - start < 5:
+        storage.storage_set('module', 'key', time.time())
+        time.sleep(0.05)
+    assert 0.5 <= time.time() - start < 1.5
+    assert storage.stats()['writes'] == 1
+
+
+def test_write_error(storage):
+    storage.set_write_delay(0.1, 0.5)
+    save = storage.backend.save
+    failures = []
+
+    def failing_save(data, changed):
+        if not failures:
+            failures.append(changed)
+            raise IOError(28, 'No space left on device')
+        save(data, changed)
+
+    storage.backend.save = failing_save
+    threads = threading.active_count()
+    for x in range(5):
+        storage.storage_set('module', 'key', x)
+    # one thread does all the writing
+    assert threading.active_count() == threads + 1
+
+    start = time.time()
+    while saved(storage) is None and time.time() - start < 5:
+        time.sleep(0.05)
+    # the error is reported and the changes are saved when retried
+    assert storage.py3_wrapper.exceptions == ['Storage write failed']
+    assert saved(storage)['key'] == 4
+    stats = storage.stats()
+    assert stats['write_errors'] == 1
+    assert stats['writes'] == 1
+    assert stats['pending'] is False
+
+
+def test_migrate_pickle(directory):
+    path = os.path.join(directory, 'test.data')
+    storage = make_storage(path, 'pickle')
+    storage.set_write_delay(0, 0)
+    storage.storage_set('module', 'key', [1, 2])
+    storage.storage_set('other', 'key', 'value')
+
+    storage = make_storage(path, 'sqlite')
+    assert storage.backend.migrated
+    assert storage.storage_get('module', 'key') == [1, 2]
+    assert storage.storage_get('other', 'key') == 'value'
+    assert sorted(storage.storage_keys('other')) == ['_ctime', '_mtime', 'key']
+    # the pickle file is kept as a backup
+    with open(path + '.bak', 'rb') as f:
+        assert pickle.load(f)['other']['key'] == 'value'
+
+    # only the first start migrates
+    storage = make_storage(path, 'sqlite')
+    assert not storage.backend.migrated
+    assert storage.storage_get('module', 'key') == [1, 2]
+
+
+def test_migrate_back_to_pickle(directory):
+    path = os.path.join(directory, 'test.data')
+    storage = make_storage(path, 'pickle')
+    storage.set_write_delay(0, 0)
+    storage.storage_set('module', 'key', 'old')
+
+    storage = make_storage(path, 'sqlite')
+    storage.set_write_delay(0, 0)
+    storage.storage_set('module', 'key', 'new')
+
+    # nothing saved while using sqlite is lost when changing back
+    storage = make_storage(path, 'pickle')
+    assert storage.backend.migrated
+    assert storage.storage_get('module', 'key') == 'new'
+    storage.set_write_delay(0, 0)
+    storage.storage_set('other', 'key', 'value')
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    assert data['module']['key'] == 'new'
+    assert data['other']['key'] == 'value'
+
+
+def test_default_backend(directory):
+    storage = Storage()
+    wrapper = MockPy3statusWrapper(os.path.join(directory, 'test.data'), None)
+    del wrapper.config['py3_config']['py3status']['storage_backend']
+    storage.init(wrapper, False)
+    assert storage.backend.name == 'pickle'
@@ -0,0 +1,102 @@
+"""
+Test the volume_status module following pactl subscribe
+"""
+
+from io import BytesIO
+from time import time
+
+import pytest
+
+from py3status.modules import volume_status
+
+PACTL_OUTPUT = {
+    ('pactl', 'info'): 'Default Sink: alsa_output.pci\n',
+    ('pactl', 'list', 'short', 'sinks'): '1\talsa_output.pci\tmodule-alsa\n',
+    ('pactl', 'list', 'sinks'): (
+        'Sink #1\n\tState: RUNNING\n\tMute: no\n'
+        '\tVolume: front-left: 32768 /  50% / -18.06 dB\n'
+    ),
+}
+
+
+class FakePy3:
+    def __init__(self):
+        self.updates = 0
+
+    def command_output(self, command, max_age=0):
+        return PACTL_OUTPUT[tuple(command)]
+
+    def update(self):
+        self.updates += 1
+
+
+class FakeParent:
+    cache_timeout = 10
+    card = None
+    channel = None
+    is_input = False
+    max_volume = 120
+
+    def __init__(self, device):
+        self.device = device
+        self.py3 = FakePy3()
+
+
+class FakeProcess:
+    def __init__(self, lines):
+        self.stdout = BytesIO(b''.join(lines))
+
+    def wait(self):
+        return 0
+
+
+@pytest.fixture
+def popen(monkeypatch):
+    calls = []
+
+    def fake_popen(command, **kw):
+        # pactl subscribe cannot be started
+        calls.append(kw)
+        raise OSError(2, 'No such file or directory')
+
+    monkeypatch.setattr(volume_status, 'Popen', fake_popen)
+    return calls
+
+
+@pytest.mark.parametrize('device', [1, '1'])
+def test_events(popen, device):
+    backend = volume_status.PactlBackend(FakeParent(device))
+    py3 = backend.parent.py3
+    backend.subscription_started = time() - volume_status.SUBSCRIBE_MIN_RUN
+    backend.read_events(FakeProcess([
+        b"Event 'change' on sink #1\n",
+        b"Event 'change' on sink #2\n",
+        b"Event 'new' on client #7\n",
+    ]))
+    # only changes to our sink update the module, then the update after pactl
+    # exited
+    assert backend.changes == 1
+    assert py3.updates == 2
+    backend.stop()
+
+
+def test_restart_backoff(popen):
+    backend = volume_status.PactlBackend(FakeParent(None))
+    py3 = backend.parent.py3
+    assert backend.device == '1'
+    assert len(popen) == 1
+
+    # pactl exiting straight away does not update the module or restart it
+    # until cache_timeout has passed
+    backend.subscription_started = time()
+    backend.read_events(FakeProcess([]))
+    assert py3.updates == 0
+    assert backend.get_volume() == ('50', False)
+    assert len(popen) == 1
+
+    backend.subscription_retry = 0
+    backend.get_volume()
+    assert len(popen) == 2
+    # the same stderr is used each time
+    assert popen[0]['stderr'] is popen[1]['stderr']
+    backend.stop()